@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+比较不同Excel读取引擎的性能
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.services.file_reader import EXCEL_ENGINES, iter_file_chunks, resolve_excel_engine
+
+
+def create_sample_workbook(file_path, rows):
+    """创建测试用的工作簿"""
+    print(f"生成测试工作簿: {rows} 行 -> {file_path}")
+    data = pd.DataFrame({
+        '编号': range(rows),
+        '姓名': [f'员工{i}' for i in range(rows)],
+        '城市': [['北京', '上海', '广州', '深圳'][i % 4] for i in range(rows)],
+        '薪资': [5000 + (i % 100) * 100 for i in range(rows)],
+        '入职日期': pd.date_range('2020-01-01', periods=rows, freq='h'),
+    })
+    data.to_excel(file_path, index=False)
+
+
+def read_with_pandas(file_path, engine):
+    """使用pandas整体读取"""
+    return len(pd.read_excel(file_path, engine=engine))
+
+
+def read_streaming(file_path):
+    """使用openpyxl只读模式分块读取"""
+    return sum(len(chunk) for chunk in iter_file_chunks(file_path))
+
+
+def get_backends(file_path):
+    """列出当前环境可用的读取方式"""
+    backends = {}
+    for engine in EXCEL_ENGINES:
+        if engine == 'auto':
+            continue
+        if resolve_excel_engine(file_path, engine) == engine:
+            backends[engine] = lambda engine=engine: read_with_pandas(file_path, engine)
+        else:
+            print(f"⚠️ 引擎 {engine} 不可用，跳过")
+    if file_path.lower().endswith('.xlsx'):
+        backends['openpyxl只读流式'] = lambda: read_streaming(file_path)
+    return backends
+
+
+def run_benchmark(file_path, repeat):
+    """运行基准测试并打印结果"""
+    print(f"📁 工作簿: {file_path}")
+    print(f"📊 文件大小: {os.path.getsize(file_path) / (1024*1024):.1f} MB")
+    print(f"auto模式选择的引擎: {resolve_excel_engine(file_path) or 'pandas默认'}")
+    print()
+
+    results = []
+    for name, reader in get_backends(file_path).items():
+        timings = []
+        rows = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = reader()
+            timings.append(time.perf_counter() - start)
+        results.append((name, rows, statistics.median(timings), min(timings)))
+
+    print(f"{'引擎':<20}{'行数':>10}{'中位数(秒)':>14}{'最快(秒)':>12}")
+    for name, rows, median, best in sorted(results, key=lambda r: r[2]):
+        print(f"{name:<20}{rows:>10}{median:>14.3f}{best:>12.3f}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="比较不同Excel读取引擎的性能")
+    parser.add_argument('workbook', nargs='?', help="要测试的工作簿，不指定时生成测试数据")
+    parser.add_argument('--rows', type=int, default=100000, help="生成测试数据的行数")
+    parser.add_argument('--repeat', type=int, default=3, help="每个引擎重复读取的次数")
+    args = parser.parse_args()
+
+    if args.workbook:
+        run_benchmark(args.workbook, args.repeat)
+        return 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'benchmark.xlsx')
+        create_sample_workbook(file_path, args.rows)
+        run_benchmark(file_path, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+测量应用程序的启动耗时，并与基线比较
+
+使用offscreen平台启动应用程序，记录从启动进程到窗口显示（first_window）
+和到可以导入文件（interactive）的时间，同时统计 -X importtime 中最耗时的模块导入。
+"""
+import argparse
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 应用程序输出的启动阶段
+STAGES = ('first_window', 'interactive')
+
+# 与 src/main.py 中的环境变量一致
+STARTUP_TIMING_ENV = 'EXCEL_DATA_PROCESSOR_STARTUP_TIMING'
+STARTUP_EXIT_ENV = 'EXCEL_DATA_PROCESSOR_EXIT_AFTER_STARTUP'
+
+
+def get_command(exe_path):
+    """启动应用程序的命令，指定可执行文件时测量打包后的程序"""
+    if exe_path:
+        return [os.path.abspath(exe_path)]
+    return [sys.executable, '-m', 'src.main']
+
+
+def get_mode(exe_path):
+    """
+    测量方式：exe为打包后的可执行文件，source为 python -m src.main
+
+    单文件打包的程序启动前需要解压，两种方式的耗时不能相互比较。
+    """
+    return 'exe' if exe_path else 'source'
+
+
+def get_environment(platform):
+    """启动应用程序使用的环境变量"""
+    env = dict(os.environ)
+    env['QT_QPA_PLATFORM'] = platform
+    env[STARTUP_TIMING_ENV] = '1'
+    env[STARTUP_EXIT_ENV] = '1'
+    return env
+
+
+def measure_once(command, env, timeout):
+    """
+    启动一次应用程序，记录各启动阶段的耗时
+
+    以外部观察到输出的时间为准，包含解释器启动和打包程序解压的时间。
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               text=True, encoding='utf-8', errors='replace')
+    # 在单独的线程中读取输出，应用程序没有输出就卡住时也能按超时结束
+    lines = queue.Queue()
+    reader = threading.Thread(target=_read_lines, args=(process.stderr, lines), daemon=True)
+    reader.start()
+
+    timings = {}
+    timed_out = False
+    try:
+        while True:
+            try:
+                item = lines.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                timed_out = True
+                break
+            if item is None:
+                break
+            line, elapsed = item[0], item[1] - start
+            if line.startswith('startup '):
+                stage = line.split()[1].split('=')[0]
+                timings[stage] = elapsed
+        if not timed_out:
+            process.wait(timeout=max(deadline - time.perf_counter(), 1))
+    except subprocess.TimeoutExpired:
+        pass
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        reader.join(timeout=1)
+
+    missing = [stage for stage in STAGES if stage not in timings]
+    if missing:
+        reason = f"在 {timeout:g} 秒内" if timed_out else ""
+        raise RuntimeError(f"应用程序{reason}没有报告启动阶段: {', '.join(missing)}")
+    return timings
+
+
+def _read_lines(stream, lines):
+    """逐行读取输出并记录读到的时间，读完后放入None"""
+    for line in stream:
+        lines.put((line, time.perf_counter()))
+    lines.put(None)
+
+
+def measure_startup(command, env, repeat, timeout):
+    """多次启动应用程序，返回各阶段耗时的中位数"""
+    runs = []
+    for i in range(repeat):
+        timings = measure_once(command, env, timeout)
+        runs.append(timings)
+        print(f"第 {i + 1} 次: " + ", ".join(f"{stage}={timings[stage]:.3f}s" for stage in STAGES))
+    return {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+
+
+def profile_imports(top):
+    """使用 -X importtime 统计导入应用程序入口时累计耗时最多的模块"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import src.main'],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # 格式: "import time:  自身(us) | 累计(us) | 缩进的模块名"
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        entries.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    print(f"\n导入耗时最多的 {top} 个模块（-X importtime，累计/自身，毫秒）:")
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}{self_us / 1000:>10.1f}  {name}")
+
+
+def compare_with_baseline(results, baseline, tolerance, mode):
+    """
+    与基线比较，任一阶段超过基线的(1 + tolerance)倍视为性能退化
+
+    基线的测量方式与本次不同时不比较；没有记录测量方式的旧基线按source处理。
+
+    Returns:
+        bool: 是否没有性能退化
+    """
+    baseline_mode = baseline.get('mode', 'source')
+    if baseline_mode != mode:
+        print(f"\n❌ 基线的测量方式为 {baseline_mode}，本次为 {mode}，不能比较。"
+              f"请用相同的方式重新生成基线（--save-baseline）")
+        return False
+
+    passed = True
+    print(f"\n与基线比较（允许 {tolerance:.0%} 波动）:")
+    for stage in STAGES:
+        if stage not in baseline:
+            continue
+        limit = baseline[stage] * (1 + tolerance)
+        regressed = results[stage] > limit
+        passed = passed and not regressed
+        status = "❌ 退化" if regressed else "✅"
+        print(f"{stage:<14}{results[stage]:>8.3f}s  基线 {baseline[stage]:.3f}s  {status}")
+    return passed
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="测量应用程序的启动耗时")
+    parser.add_argument('--exe', help="测量打包后的可执行文件，不指定时运行 python -m src.main")
+    parser.add_argument('--repeat', type=int, default=5, help="启动次数，结果取中位数")
+    parser.add_argument('--timeout', type=float, default=60, help="单次启动的超时时间（秒）")
+    parser.add_argument('--platform', default='offscreen', help="Qt平台插件")
+    parser.add_argument('--baseline', help="基线JSON文件，超过基线时退出码为1")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="相对基线允许的波动比例")
+    parser.add_argument('--save-baseline', help="将本次结果保存为基线JSON文件")
+    parser.add_argument('--import-top', type=int, default=15,
+                        help="列出导入最耗时的模块数量，0表示不统计")
+    args = parser.parse_args()
+
+    command = get_command(args.exe)
+    print(f"🚀 启动命令: {' '.join(command)}")
+    try:
+        results = measure_startup(command, get_environment(args.platform),
+                                  args.repeat, args.timeout)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("\n中位数: " + ", ".join(f"{stage}={results[stage]:.3f}s" for stage in STAGES))
+
+    if args.import_top > 0 and not args.exe:
+        profile_imports(args.import_top)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(dict(results, mode=get_mode(args.exe)), f, indent=2)
+        print(f"\n基线已保存: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare_with_baseline(results, baseline, args.tolerance, get_mode(args.exe)):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
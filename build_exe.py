@@ -117,6 +117,28 @@ def verify_build():
         print("❌ 构建失败，未找到输出文件")
         return False
 
+def check_startup_time():
+    """与启动耗时基线比较，基线文件不存在时跳过"""
+    import platform
+    exe_name = 'ExcelDataProcessor.exe' if platform.system() == 'Windows' else 'ExcelDataProcessor'
+    exe_path = os.path.join('dist', exe_name)
+    
+    baseline = 'startup_baseline.json'
+    if not os.path.exists(baseline):
+        print(f"未找到 {baseline}，跳过启动耗时检查")
+        # 基线需要与检查一样测量打包后的程序
+        print(f"可以运行 python benchmark_startup.py --exe {exe_path} --save-baseline {baseline} 生成基线")
+        return True
+    
+    print("检查启动耗时...")
+    result = subprocess.run([sys.executable, 'benchmark_startup.py',
+                             '--exe', exe_path,
+                             '--baseline', baseline])
+    if result.returncode != 0:
+        print("❌ 启动耗时超过基线或无法与基线比较，请检查上面的输出")
+        return False
+    return True
+
 def main():
     """主函数"""
     print("=== Excel Data Processor 打包工具 ===")
@@ -149,6 +171,10 @@ def main():
     if not verify_build():
         return 1
     
+    # 检查启动耗时是否退化
+    if not check_startup_time():
+        return 1
+    
     print(f"\n使用说明:")
     print(f"1. 可执行文件位于 dist/ 目录中")
     print(f"2. 可以将 ExcelDataProcessor.exe 复制到任何位置运行")
@@ -2,6 +2,7 @@
 """
 Excel Data Processor 启动脚本
 """
+import multiprocessing
 import sys
 import os
 
@@ -11,4 +12,6 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from main import main
 
 if __name__ == "__main__":
+    # PyInstaller打包后，spawn方式启动的工作进程会重新运行本程序，需要在这里转入工作进程
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
@@ -17,6 +17,7 @@ setup(
     entry_points={
         "console_scripts": [
             "excel-data-processor=src.main:main",
+            "excel-data-processor-cli=src.cli:main",
         ],
     },
     classifiers=[
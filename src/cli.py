@@ -0,0 +1,96 @@
+"""
+Excel Data Processor 命令行入口
+
+将保存的数据配置应用到一个或多个输入文件，不创建QApplication，也不导入PySide6：
+
+    python -m src.cli -c config.json -o output/ "branches/*.xlsx"
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+from typing import List, Optional
+
+from .models.data_model import DataConfiguration, ProcessingResult
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description='按保存的数据配置批量处理Excel/CSV/Parquet/Feather文件'
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help='输入文件路径或通配符模式，例如 "data/**/*.xlsx"')
+    parser.add_argument('-c', '--config', required=True,
+                        help='数据配置JSON文件（DataConfiguration.save 保存的格式）')
+    parser.add_argument('-o', '--output-dir', required=True, help='输出目录')
+    parser.add_argument('-f', '--format', choices=['csv', 'xlsx', 'parquet', 'feather', 'arrow'],
+                        help='输出格式，默认与输入格式相同')
+    parser.add_argument('--compression',
+                        help='Parquet/Feather/Arrow输出的压缩算法，例如 snappy、zstd、lz4、none，'
+                             '默认Parquet为snappy、Feather/Arrow为lz4')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='并行工作进程数，默认为CPU核心数，1表示顺序处理')
+    parser.add_argument('--json', action='store_true',
+                        help='以JSON格式输出处理结果')
+    return parser
+
+
+def _print_progress(done: int, total: int, result: ProcessingResult) -> None:
+    """输出单个文件的处理结果"""
+    if result.success:
+        status = f"{result.processed_rows} 行, {result.elapsed_seconds:.2f} 秒"
+    else:
+        status = f"失败: {result.error_message}"
+    print(f"[{done}/{total}] {result.input_file_path} -> {status}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行主函数
+
+    Args:
+        argv: 命令行参数，None表示使用sys.argv
+
+    Returns:
+        int: 退出码，全部成功为0，有文件失败为1，配置或参数错误为2
+    """
+    args = build_parser().parse_args(argv)
+
+    try:
+        configuration = DataConfiguration.load(args.config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"无法加载数据配置: {e}", file=sys.stderr)
+        return 2
+
+    # 处理服务依赖pandas，解析参数之后再导入，使 --help 和参数错误立即返回
+    from .services.batch_processor import BatchProcessor
+
+    processor = BatchProcessor(
+        configuration,
+        max_workers=args.jobs,
+        output_format=f'.{args.format}' if args.format else None,
+        compression=args.compression
+    )
+    result = processor.run(args.inputs, args.output_dir,
+                           progress_callback=None if args.json else _print_progress)
+
+    if not result.results:
+        print("没有找到输入文件", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(f"完成: 成功 {result.succeeded} 个, 失败 {result.failed} 个, "
+              f"共 {result.total_rows} 行, 耗时 {result.elapsed_seconds:.2f} 秒 "
+              f"({result.rows_per_second:.0f} 行/秒)")
+
+    return 0 if result.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    # PyInstaller打包后，spawn方式启动的工作进程会重新运行本程序，需要在这里转入工作进程
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,18 +1,61 @@
 """
 数据控制器，管理数据处理逻辑
 """
+import os
+import time
 import pandas as pd
-from pathlib import Path
-from typing import List, Dict, Any, Optional
-from PySide6.QtCore import QObject, Signal
+from typing import Callable, List, Dict, Any, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
 
+from ..services.data_cache import DataCache
 from ..services.data_service import DataService, DataValidationError, FileReadError
+from ..services.export_service import (
+    CancelCheck, ExportCancelledError, ExportProgressCallback, ExportService
+)
+from ..services.file_reader import SHEET_COLUMN, LoadCancelledError
+from ..services.formula import FormulaError, compile_formula
+from ..services.processing import apply_configuration, copy_on_write, get_required_columns
 from ..models.data_model import (
     DataConfiguration, CustomField, FieldSelection, 
     FieldType, ProcessingResult
 )
 
 
+class ExportSignals(QObject):
+    """后台导出任务的信号，在主线程创建，跨线程发出时自动排队到主线程"""
+    
+    progress = Signal(int, int)  # 导出ID，已写入的行数
+    finished = Signal(int, object)  # 导出ID，ProcessingResult
+
+
+class ExportWorker(QRunnable):
+    """在线程池中执行导出的后台任务"""
+    
+    def __init__(self, export_id: int,
+                 task: Callable[[ExportProgressCallback, CancelCheck], ProcessingResult]):
+        super().__init__()
+        self.export_id = export_id
+        self.task = task
+        self.signals = ExportSignals()
+        self._cancelled = False
+    
+    def cancel(self) -> None:
+        """请求取消导出"""
+        self._cancelled = True
+    
+    def is_cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._cancelled
+    
+    def run(self) -> None:
+        """执行导出并通过信号返回结果，导出任务自身负责捕获错误"""
+        result = self.task(
+            lambda rows: self.signals.progress.emit(self.export_id, rows),
+            self.is_cancelled
+        )
+        self.signals.finished.emit(self.export_id, result)
+
+
 class DataController(QObject):
     """数据控制器，协调数据服务和数据模型"""
     
@@ -23,13 +66,44 @@ class DataController(QObject):
     preview_updated = Signal(object)  # 预览数据更新，传递DataFrame
     processing_completed = Signal(object)  # 处理完成，传递ProcessingResult
     error_occurred = Signal(str)  # 错误发生
+    load_progress = Signal(int)  # 后台加载进度
+    load_cancelled = Signal(str)  # 后台加载取消
+    export_progress = Signal(int, int)  # 后台导出进度：已写入的行数，预计总行数（未知时为0）
+    
+    # 源文件超过该大小时自动使用流式导出
+    STREAMING_THRESHOLD_BYTES = 100 * 1024 * 1024
+    # 流式导出时每块的行数
+    STREAMING_CHUNK_SIZE = 50000
+    # 合并配置变更的时间窗口（毫秒），窗口内的多次变更只刷新一次
+    UPDATE_DEBOUNCE_MS = 30
     
     def __init__(self):
         super().__init__()
         
-        # 初始化服务和模型
-        self.data_service = DataService()
+        # 初始化服务和模型，完整数据加载后缩小列类型以减少内存占用
+        self.data_service = DataService(data_cache=DataCache(), optimize_dtypes=True)
         self.configuration = DataConfiguration()
+        self.export_service = ExportService()
+        
+        # 打开文件时是否推迟完整数据的加载；为False时读取表头后在后台加载完整数据，
+        # 以便优化列类型、显示内存占用，并在加载过程中显示进度和取消
+        self.defer_full_load = False
+        
+        # 预览的行数，None表示预览所有已读取的数据
+        self.preview_rows: Optional[int] = None
+        
+        # 合并短时间内的配置变更，只发出一次configuration_changed并只刷新一次预览
+        self._pending_configuration_changed = False
+        self._pending_preview = False
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(self.UPDATE_DEBOUNCE_MS)
+        self._update_timer.timeout.connect(self.flush_pending_updates)
+        
+        # 正在进行的后台导出
+        self._export_worker: Optional[ExportWorker] = None
+        self._export_counter = 0
+        self._export_total_rows = 0
         
         # 连接数据服务的信号
         self._connect_data_service_signals()
@@ -39,6 +113,8 @@ class DataController(QObject):
         self.data_service.file_loaded.connect(self._on_file_loaded)
         self.data_service.headers_parsed.connect(self._on_headers_parsed)
         self.data_service.error_occurred.connect(self.error_occurred)
+        self.data_service.load_progress.connect(self.load_progress)
+        self.data_service.load_cancelled.connect(self.load_cancelled)
     
     def load_file(self, file_path: str) -> bool:
         """
@@ -51,37 +127,108 @@ class DataController(QObject):
             bool: 是否加载成功
         """
         try:
-            success = self.data_service.load_file(file_path)
-            if success:
-                # 更新配置中的文件路径
-                self.configuration.file_path = file_path
-            return success
+            return self.data_service.load_file(file_path)
         except Exception as e:
             self.error_occurred.emit(f"加载文件失败: {str(e)}")
             return False
     
+    def open_file(self, file_path: str) -> bool:
+        """
+        打开文件：先只读取表头和预览行，再在后台加载完整数据
+        
+        源文件达到流式导出的大小或defer_full_load为True时不加载完整数据，
+        导出时从源文件读取。
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            bool: 表头是否读取成功
+        """
+        if not self.data_service.peek_headers(file_path):
+            return False
+        
+        self._start_full_load()
+        return True
+    
+    def select_sheets(self, sheet_names: List[str]) -> bool:
+        """
+        切换当前工作簿使用的工作表，选择多个工作表时合并为一个数据集
+        
+        切换后重新读取表头并重置字段选择，再与open_file相同地在后台加载完整数据。
+        
+        Args:
+            sheet_names: 工作表名称
+            
+        Returns:
+            bool: 切换是否成功
+        """
+        if not self.data_service.select_sheets(sheet_names):
+            return False
+        
+        self._start_full_load()
+        return True
+    
+    def _start_full_load(self) -> None:
+        """读取表头后在后台加载完整数据；流式导出的大文件不加载，避免占用大量内存"""
+        if self.defer_full_load or self._should_stream():
+            return
+        self.data_service.load_file_async(self.data_service.get_file_path())
+    
+    def get_sheet_names(self) -> List[str]:
+        """获取当前工作簿中的工作表"""
+        return self.data_service.get_sheet_names()
+    
+    def get_selected_sheets(self) -> List[str]:
+        """获取当前选择的工作表"""
+        return self.data_service.get_selected_sheets()
+    
+    def load_file_async(self, file_path: str) -> None:
+        """
+        在后台线程中加载文件，完成后发出file_loaded和headers_updated信号
+        
+        Args:
+            file_path: 文件路径
+        """
+        self.data_service.load_file_async(file_path)
+    
+    def cancel_load(self) -> None:
+        """取消正在进行的后台加载"""
+        self.data_service.cancel_load()
+    
+    def is_loading(self) -> bool:
+        """检查是否正在后台加载文件"""
+        return self.data_service.is_loading()
+    
     def _on_file_loaded(self, file_path: str) -> None:
         """处理文件加载完成事件"""
+        # 已预览的文件加载完整数据后表头不变，只需刷新预览
+        refresh_preview = (
+            file_path == self.configuration.file_path and bool(self.configuration.field_selections)
+        )
+        
+        # 更新配置中的文件路径
+        self.configuration.file_path = file_path
         self.file_loaded.emit(file_path)
+        
+        if refresh_preview:
+            self._schedule_update(configuration_changed=False)
     
     def _on_headers_parsed(self, headers: List[str]) -> None:
         """处理表头解析完成事件"""
         # 更新配置中的原始表头
-        self.configuration.original_headers = headers.copy()
+        self.configuration.set_original_headers(headers)
         
         # 清除之前的字段选择，重新初始化
-        self.configuration.field_selections.clear()
+        self.configuration.clear_field_selections()
         
         # 为每个原始字段创建选择项（默认全选）
         for header in headers:
             self.configuration.add_original_field(header, selected=True)
         
-        # 发出信号
+        # 发出信号，配置变更和预览合并刷新
         self.headers_updated.emit(headers)
-        self.configuration_changed.emit()
-        
-        # 更新预览
-        self._update_preview()
+        self._schedule_update()
     
     def get_headers(self) -> List[str]:
         """获取当前表头"""
@@ -104,10 +251,24 @@ class DataController(QObject):
         """
         success = self.configuration.set_field_selection(field_name, selected)
         if success:
-            self.configuration_changed.emit()
-            self._update_preview()
+            self._schedule_update()
         return success
     
+    def set_field_selections(self, selections: Dict[str, bool]) -> int:
+        """
+        批量设置字段选择状态，只发出一次配置变更
+        
+        Args:
+            selections: 字段名称到是否选中的映射
+            
+        Returns:
+            int: 找到并设置的字段数量
+        """
+        applied = self.configuration.set_field_selections(selections)
+        if applied:
+            self._schedule_update()
+        return applied
+    
     def add_custom_field(self, custom_field: CustomField) -> bool:
         """
         添加自定义字段
@@ -119,14 +280,28 @@ class DataController(QObject):
             bool: 添加是否成功
         """
         try:
+            if custom_field.field_type == 'formula':
+                self._validate_formula(custom_field)
             self.configuration.add_custom_field(custom_field, selected=True)
-            self.configuration_changed.emit()
-            self._update_preview()
+            self._schedule_update()
             return True
         except ValueError as e:
             self.error_occurred.emit(str(e))
             return False
     
+    def _validate_formula(self, custom_field: CustomField) -> None:
+        """
+        检查公式字段能否编译，且只引用已有的原始字段
+        
+        Raises:
+            FormulaError: 公式无效或引用了不存在的字段
+        """
+        formula = compile_formula(custom_field.default_value)
+        original_headers = set(self.configuration.original_headers)
+        missing = [col for col in formula.columns if col not in original_headers]
+        if missing:
+            raise FormulaError(f"公式引用的字段不存在: {', '.join(missing)}")
+    
     def remove_custom_field(self, field_name: str) -> bool:
         """
         移除自定义字段
@@ -139,8 +314,7 @@ class DataController(QObject):
         """
         success = self.configuration.remove_custom_field(field_name)
         if success:
-            self.configuration_changed.emit()
-            self._update_preview()
+            self._schedule_update()
         return success
     
     def get_field_selections(self) -> List[FieldSelection]:
@@ -151,20 +325,55 @@ class DataController(QObject):
         """获取选中的字段名称列表"""
         return self.configuration.get_all_selected_field_names()
     
+    def _schedule_update(self, configuration_changed: bool = True) -> None:
+        """
+        安排在合并窗口结束后发出配置变更信号并刷新预览
+        
+        Args:
+            configuration_changed: 是否需要发出configuration_changed信号
+        """
+        self._pending_configuration_changed |= configuration_changed
+        self._pending_preview = True
+        # 重新开始计时，连续的变更合并为一次刷新
+        self._update_timer.start()
+    
+    def flush_pending_updates(self) -> None:
+        """立即执行等待中的配置变更通知和预览刷新"""
+        self._update_timer.stop()
+        configuration_changed = self._pending_configuration_changed
+        preview = self._pending_preview
+        self._pending_configuration_changed = False
+        self._pending_preview = False
+        
+        if configuration_changed:
+            self.configuration_changed.emit()
+        if preview:
+            self._update_preview()
+    
+    def has_pending_updates(self) -> bool:
+        """检查是否有等待中的刷新"""
+        return self._pending_configuration_changed or self._pending_preview
+    
+    def _cancel_pending_updates(self) -> None:
+        """取消等待中的刷新"""
+        self._update_timer.stop()
+        self._pending_configuration_changed = False
+        self._pending_preview = False
+    
     def _update_preview(self) -> None:
         """更新预览数据"""
         try:
-            preview_data = self.generate_preview_data()
+            preview_data = self.generate_preview_data(self.preview_rows)
             self.preview_updated.emit(preview_data)
         except Exception as e:
             self.error_occurred.emit(f"更新预览失败: {str(e)}")
     
-    def generate_preview_data(self, rows: int = 5) -> Optional[pd.DataFrame]:
+    def generate_preview_data(self, rows: Optional[int] = 5) -> Optional[pd.DataFrame]:
         """
         生成预览数据
         
         Args:
-            rows: 预览行数
+            rows: 预览行数，None表示所有已读取的数据
             
         Returns:
             Optional[pd.DataFrame]: 预览数据
@@ -177,37 +386,30 @@ class DataController(QObject):
         if original_data is None:
             return None
         
-        # 获取选中的原始字段
-        selected_original_fields = self.configuration.get_selected_original_fields()
+        return apply_configuration(original_data, self.configuration)
+    
+    def process_data(self, output_file_path: str,
+                     streaming: Optional[bool] = None) -> ProcessingResult:
+        """
+        处理数据并输出到文件，在当前线程中同步执行
         
-        # 创建结果DataFrame
-        if selected_original_fields:
-            # 过滤选中的原始字段
-            result_data = original_data[selected_original_fields].copy()
-        else:
-            # 如果没有选中原始字段，创建空DataFrame
-            result_data = pd.DataFrame(index=original_data.index)
-        
-        # 添加自定义字段
-        selected_custom_fields = self.configuration.get_selected_custom_fields()
-        for custom_field in selected_custom_fields:
-            # 根据字段类型生成默认值
-            if custom_field.field_type == "number":
-                try:
-                    default_value = float(custom_field.default_value) if custom_field.default_value else 0.0
-                except ValueError:
-                    default_value = 0.0
-            else:
-                default_value = custom_field.default_value
+        Args:
+            output_file_path: 输出文件路径
+            streaming: 是否从源文件分块流式导出，None时根据源文件大小自动选择
             
-            # 添加列
-            result_data[custom_field.name] = default_value
-        
-        return result_data
+        Returns:
+            ProcessingResult: 处理结果
+        """
+        result = self._export_data(output_file_path, self.configuration, streaming)
+        self.processing_completed.emit(result)
+        return result
     
-    def process_data(self, output_file_path: str) -> ProcessingResult:
+    def process_data_per_sheet(self, output_file_path: str) -> ProcessingResult:
         """
-        处理数据并输出到文件
+        按配置分别处理各工作表并导出，在当前线程中同步执行
+        
+        选择了多个工作表时导出这些工作表，否则导出工作簿中的所有工作表。
+        Excel输出中每个工作表对应一个工作表，CSV输出中每个工作表对应一个文件。
         
         Args:
             output_file_path: 输出文件路径
@@ -215,6 +417,97 @@ class DataController(QObject):
         Returns:
             ProcessingResult: 处理结果
         """
+        result = self._export_sheets(output_file_path, self.configuration)
+        self.processing_completed.emit(result)
+        return result
+    
+    def export_async(self, output_file_path: str, per_sheet: bool = False,
+                     streaming: Optional[bool] = None) -> bool:
+        """
+        在后台线程中处理数据并导出
+        
+        导出过程中发出export_progress信号，完成、失败或取消后在主线程中
+        发出processing_completed信号。导出使用开始时的配置快照，
+        之后对配置的修改不影响本次导出。
+        
+        Args:
+            output_file_path: 输出文件路径
+            per_sheet: 是否按工作表分别导出
+            streaming: 是否从源文件分块流式导出，None时根据源文件大小自动选择
+            
+        Returns:
+            bool: 是否开始导出，已有导出正在进行时返回False
+        """
+        if self._export_worker is not None:
+            self.error_occurred.emit("已有导出正在进行")
+            return False
+        
+        self.flush_pending_updates()
+        configuration = DataConfiguration.from_dict(self.configuration.to_dict())
+        if per_sheet:
+            def task(progress_callback, is_cancelled):
+                return self._export_sheets(output_file_path, configuration,
+                                           progress_callback, is_cancelled)
+            self._export_total_rows = 0
+        else:
+            def task(progress_callback, is_cancelled):
+                return self._export_data(output_file_path, configuration, streaming,
+                                         progress_callback, is_cancelled)
+            self._export_total_rows = self.data_service.get_data_info().get('rows') or 0
+        
+        self._export_counter += 1
+        worker = ExportWorker(self._export_counter, task)
+        worker.signals.progress.connect(self._on_export_progress)
+        worker.signals.finished.connect(self._on_export_finished)
+        self._export_worker = worker
+        
+        QThreadPool.globalInstance().start(worker)
+        return True
+    
+    def cancel_export(self) -> None:
+        """取消正在进行的后台导出，已写入的临时文件会被删除"""
+        if self._export_worker is not None:
+            self._export_worker.cancel()
+    
+    def is_exporting(self) -> bool:
+        """检查是否有正在进行的后台导出"""
+        return self._export_worker is not None
+    
+    def _is_current_export(self, export_id: int) -> bool:
+        """检查信号是否来自当前的导出任务"""
+        return self._export_worker is not None and self._export_worker.export_id == export_id
+    
+    def _on_export_progress(self, export_id: int, rows: int) -> None:
+        """处理后台导出进度"""
+        if self._is_current_export(export_id):
+            self.export_progress.emit(rows, self._export_total_rows)
+    
+    def _on_export_finished(self, export_id: int, result: ProcessingResult) -> None:
+        """处理后台导出结束"""
+        if not self._is_current_export(export_id):
+            return
+        self._export_worker = None
+        self.processing_completed.emit(result)
+    
+    def _export_data(self, output_file_path: str, configuration: DataConfiguration,
+                     streaming: Optional[bool] = None,
+                     progress_callback: Optional[ExportProgressCallback] = None,
+                     is_cancelled: Optional[CancelCheck] = None) -> ProcessingResult:
+        """
+        处理数据并写入文件，不发出信号，可以在后台线程中执行
+        
+        Args:
+            output_file_path: 输出文件路径
+            configuration: 使用的数据配置
+            streaming: 是否从源文件分块流式导出，None时根据源文件大小自动选择
+            progress_callback: 进度回调，参数为已写入的行数
+            is_cancelled: 取消检查函数
+            
+        Returns:
+            ProcessingResult: 处理结果，错误和取消也记录在结果中
+        """
+        start = time.perf_counter()
+        warnings = []
         try:
             # 检查是否有数据
             if not self.data_service.has_data():
@@ -223,75 +516,191 @@ class DataController(QObject):
                     error_message="没有可处理的数据"
                 )
             
-            # 获取完整数据
-            full_data = self.data_service.get_full_data()
-            if full_data is None:
-                return ProcessingResult(
-                    success=False,
-                    error_message="无法获取数据"
-                )
-            
-            # 获取选中的原始字段
-            selected_original_fields = self.configuration.get_selected_original_fields()
+            if streaming is None:
+                streaming = self._should_stream()
             
-            # 创建结果DataFrame
-            if selected_original_fields:
-                result_data = full_data[selected_original_fields].copy()
+            if streaming:
+                processed_rows = self._export_streaming(output_file_path, configuration, warnings,
+                                                        progress_callback, is_cancelled)
             else:
-                result_data = pd.DataFrame(index=full_data.index)
-            
-            # 添加自定义字段
-            selected_custom_fields = self.configuration.get_selected_custom_fields()
-            warnings = []
+                # 只解析选中的原始字段；完整数据已在内存中时直接选择列，
+                # 写时复制模式下不会复制底层列缓冲区
+                with copy_on_write():
+                    source_data = self.data_service.read_columns(
+                        get_required_columns(configuration)
+                    )
+                    result_data = apply_configuration(source_data, configuration, warnings)
+                    processed_rows = self.export_service.write_data(
+                        result_data, output_file_path, progress_callback, is_cancelled
+                    )
             
-            for custom_field in selected_custom_fields:
-                try:
-                    # 根据字段类型处理默认值
-                    if custom_field.field_type == "number":
-                        try:
-                            default_value = float(custom_field.default_value) if custom_field.default_value else 0.0
-                        except ValueError:
-                            default_value = 0.0
-                            warnings.append(f"自定义字段 '{custom_field.name}' 的默认值无法转换为数字，使用0")
-                    else:
-                        default_value = custom_field.default_value
-                    
-                    # 添加列
-                    result_data[custom_field.name] = default_value
-                    
-                except Exception as e:
-                    warnings.append(f"处理自定义字段 '{custom_field.name}' 时出错: {str(e)}")
-            
-            # 保存到文件
-            output_path = Path(output_file_path)
-            if output_path.suffix.lower() == '.csv':
-                result_data.to_csv(output_file_path, index=False, encoding='utf-8-sig')
-            else:
-                result_data.to_excel(output_file_path, index=False)
+            split_warning = self.export_service.row_limit_warning(output_file_path, processed_rows)
+            if split_warning:
+                warnings.append(split_warning)
             
             # 创建处理结果
-            result = ProcessingResult(
+            return ProcessingResult(
                 success=True,
                 output_file_path=output_file_path,
-                processed_rows=len(result_data),
-                warnings=warnings
+                processed_rows=processed_rows,
+                warnings=warnings,
+                elapsed_seconds=time.perf_counter() - start
+            )
+            
+        except (ExportCancelledError, LoadCancelledError):
+            return self._cancelled_result(output_file_path, warnings, start)
+        except Exception as e:
+            return ProcessingResult(
+                success=False,
+                error_message=f"处理数据时发生错误: {str(e)}",
+                warnings=warnings,
+                elapsed_seconds=time.perf_counter() - start
+            )
+    
+    def _should_stream(self) -> bool:
+        """源文件较大时使用流式导出"""
+        file_path = self.data_service.get_file_path()
+        if not file_path:
+            return False
+        try:
+            return os.path.getsize(file_path) >= self.STREAMING_THRESHOLD_BYTES
+        except OSError:
+            return False
+    
+    def _export_streaming(self, output_file_path: str, configuration: DataConfiguration,
+                          warnings: List[str],
+                          progress_callback: Optional[ExportProgressCallback] = None,
+                          is_cancelled: Optional[CancelCheck] = None) -> int:
+        """
+        从源文件分块读取、处理并追加写入输出文件
+        
+        Args:
+            output_file_path: 输出文件路径
+            configuration: 使用的数据配置
+            warnings: 用于收集警告信息的列表
+            progress_callback: 进度回调，参数为已写入的行数
+            is_cancelled: 取消检查函数
+            
+        Returns:
+            int: 导出的行数
+        """
+        # 只读取需要的原始字段；未选中任何原始字段时仍需读取行以确定行数
+        required_columns = get_required_columns(configuration)
+        chunks = self.data_service.iter_chunks(
+            columns=required_columns or None,
+            chunksize=self.STREAMING_CHUNK_SIZE
+        )
+        
+        def processed_chunks():
+            for index, chunk in enumerate(chunks):
+                # 警告只在第一块收集，避免重复
+                yield apply_configuration(
+                    chunk, configuration, warnings if index == 0 else None
+                )
+        
+        return self.export_service.write_chunks(processed_chunks(), output_file_path,
+                                                progress_callback, is_cancelled)
+    
+    def _export_sheets(self, output_file_path: str, configuration: DataConfiguration,
+                       progress_callback: Optional[ExportProgressCallback] = None,
+                       is_cancelled: Optional[CancelCheck] = None) -> ProcessingResult:
+        """
+        分别处理各工作表并写入文件，不发出信号，可以在后台线程中执行
+        
+        Args:
+            output_file_path: 输出文件路径
+            configuration: 使用的数据配置
+            progress_callback: 进度回调，参数为已写入的行数
+            is_cancelled: 取消检查函数
+            
+        Returns:
+            ProcessingResult: 处理结果，错误和取消也记录在结果中
+        """
+        start = time.perf_counter()
+        warnings = []
+        try:
+            if not self.data_service.has_data() or not self.data_service.get_sheet_names():
+                return ProcessingResult(
+                    success=False,
+                    error_message="没有可按工作表导出的Excel数据"
+                )
+            
+            selected_sheets = self.data_service.get_selected_sheets()
+            sheets = self.data_service.read_sheets(
+                selected_sheets if len(selected_sheets) > 1 else None,
+                is_cancelled=is_cancelled
             )
             
-            self.processing_completed.emit(result)
-            return result
+            required_columns = get_required_columns(configuration)
+            processed_sheets = {}
+            with copy_on_write():
+                for index, (sheet_name, data) in enumerate(sheets.items()):
+                    data = self._align_sheet_columns(sheet_name, data, required_columns, warnings)
+                    # 配置相关的警告只在第一个工作表收集，避免重复
+                    processed_sheets[sheet_name] = apply_configuration(
+                        data, configuration, warnings if index == 0 else None
+                    )
+                output_paths = self.export_service.write_sheets(
+                    processed_sheets, output_file_path, progress_callback, is_cancelled
+                )
+            
+            for sheet_name, data in processed_sheets.items():
+                split_warning = self.export_service.row_limit_warning(
+                    output_file_path, len(data), f"工作表 '{sheet_name}' "
+                )
+                if split_warning:
+                    warnings.append(split_warning)
+            
+            return ProcessingResult(
+                success=True,
+                output_file_path=', '.join(output_paths),
+                processed_rows=sum(len(data) for data in processed_sheets.values()),
+                warnings=warnings,
+                elapsed_seconds=time.perf_counter() - start
+            )
             
+        except (ExportCancelledError, LoadCancelledError):
+            return self._cancelled_result(output_file_path, warnings, start)
         except Exception as e:
-            result = ProcessingResult(
+            return ProcessingResult(
                 success=False,
-                error_message=f"处理数据时发生错误: {str(e)}"
+                error_message=f"处理数据时发生错误: {str(e)}",
+                warnings=warnings,
+                elapsed_seconds=time.perf_counter() - start
             )
-            self.processing_completed.emit(result)
-            return result
+    
+    @staticmethod
+    def _cancelled_result(output_file_path: str, warnings: List[str],
+                          start: float) -> ProcessingResult:
+        """导出被取消时的处理结果"""
+        return ProcessingResult(
+            success=False,
+            output_file_path=output_file_path,
+            error_message="导出已取消",
+            warnings=warnings,
+            elapsed_seconds=time.perf_counter() - start,
+            cancelled=True
+        )
+    
+    @staticmethod
+    def _align_sheet_columns(sheet_name: str, data: pd.DataFrame,
+                             required_columns: List[str], warnings: List[str]) -> pd.DataFrame:
+        """补齐工作表中缺少的字段：来源工作表列填入工作表名称，其他字段留空"""
+        missing = [col for col in required_columns if col not in data.columns]
+        if not missing:
+            return data
+        
+        fill_values = {col: (sheet_name if col == SHEET_COLUMN else None) for col in missing}
+        other_missing = [col for col in missing if col != SHEET_COLUMN]
+        if other_missing:
+            warnings.append(f"工作表 '{sheet_name}' 缺少字段，已留空: {', '.join(other_missing)}")
+        return data.assign(**fill_values)
     
     def clear_data(self) -> None:
         """清除所有数据"""
         self.data_service.clear_data()
         self.configuration.clear()
+        self._cancel_pending_updates()
         self.configuration_changed.emit()
         self.preview_updated.emit(None)
     
@@ -306,5 +715,4 @@ class DataController(QObject):
     def set_configuration(self, config: DataConfiguration) -> None:
         """设置配置"""
         self.configuration = config
-        self.configuration_changed.emit()
-        self._update_preview()
\ No newline at end of file
+        self._schedule_update()
\ No newline at end of file
@@ -1,54 +1,118 @@
 """
 主控制器，协调各个子系统
 """
-from PySide6.QtCore import QObject, Signal
+import importlib
+from typing import TYPE_CHECKING, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 
+from ..models.data_model import CustomField
 from ..views.main_window import MainWindow
-from .data_controller import DataController
+
+if TYPE_CHECKING:
+    from .data_controller import DataController
+
+
+# 窗口显示后在后台线程中预先导入的模块，数据控制器依赖pandas等较重的库
+WARMUP_MODULES = (
+    'pandas',
+    'openpyxl',
+    'python_calamine',
+    f'{__package__}.data_controller',
+)
+
+
+class ImportWarmupSignals(QObject):
+    """预导入任务的信号"""
+    finished = Signal()
+
+
+class ImportWarmupWorker(QRunnable):
+    """在线程池中预先导入数据处理相关的模块"""
+    
+    def __init__(self, module_names=WARMUP_MODULES):
+        super().__init__()
+        self.module_names = module_names
+        self.signals = ImportWarmupSignals()
+    
+    def run(self) -> None:
+        """依次导入模块，未安装的可选依赖直接跳过"""
+        for module_name in self.module_names:
+            try:
+                importlib.import_module(module_name)
+            except Exception:
+                # 预导入失败不影响功能，创建数据控制器时会再次导入并报告错误
+                pass
+        self.signals.finished.emit()
 
 
 class MainController(QObject):
     """主控制器，协调各个子系统"""
     
     # 信号定义
-    application_ready = Signal()
+    application_ready = Signal()  # 数据控制器创建完成，可以导入文件
     
     def __init__(self, main_window: MainWindow):
         super().__init__()
         self.main_window = main_window
         
-        # 创建子控制器
-        self.data_controller = DataController()
+        # 子控制器；数据控制器依赖pandas，在后台预导入完成或首次导入文件时创建
+        self.data_controller: Optional['DataController'] = None
         self.template_controller = None  # 将在后续任务中创建
         self.field_controller = None     # 将在后续任务中创建
         
         # 连接信号槽
         self._connect_signals()
         
-        # 发出应用程序就绪信号
-        self.application_ready.emit()
+        # 在后台导入数据处理模块，不阻塞窗口显示
+        self._warmup_worker = ImportWarmupWorker()
+        self._warmup_worker.signals.finished.connect(self._ensure_data_controller)
+        QThreadPool.globalInstance().start(self._warmup_worker)
+    
+    def _ensure_data_controller(self) -> 'DataController':
+        """
+        获取数据控制器，尚未创建时导入并创建
+        
+        Returns:
+            DataController: 数据控制器实例
+        """
+        if self.data_controller is None:
+            from .data_controller import DataController
+            
+            self.data_controller = DataController()
+            self._connect_data_controller_signals()
+            
+            # 发出应用程序就绪信号
+            self.application_ready.emit()
+        return self.data_controller
+    
+    def _connect_data_controller_signals(self) -> None:
+        """连接数据控制器的信号"""
+        self.data_controller.error_occurred.connect(self._on_error_occurred)
+        self.data_controller.file_loaded.connect(self._on_file_loaded)
+        self.data_controller.headers_updated.connect(self._on_headers_updated)
+        self.data_controller.configuration_changed.connect(self._on_configuration_changed)
+        self.data_controller.preview_updated.connect(self._on_preview_updated)
+        self.data_controller.processing_completed.connect(self._on_processing_completed)
+        self.data_controller.export_progress.connect(self._on_export_progress)
+        self.data_controller.load_progress.connect(self._on_load_progress)
+        self.data_controller.load_cancelled.connect(self._on_load_cancelled)
     
     def _connect_signals(self) -> None:
         """连接各组件的信号槽"""
         # 连接主窗口的视图切换信号
         self.main_window.view_changed.connect(self._on_view_changed)
         
-        # 连接数据控制器的信号
-        if self.data_controller:
-            self.data_controller.error_occurred.connect(self._on_error_occurred)
-            self.data_controller.file_loaded.connect(self._on_file_loaded)
-            self.data_controller.headers_updated.connect(self._on_headers_updated)
-            self.data_controller.configuration_changed.connect(self._on_configuration_changed)
-            self.data_controller.preview_updated.connect(self._on_preview_updated)
-            self.data_controller.processing_completed.connect(self._on_processing_completed)
-        
         # 连接数据处理视图的信号
         data_view = self.main_window.get_data_processing_view()
         if data_view:
             data_view.file_import_requested.connect(self._on_file_import_requested)
+            data_view.load_cancel_requested.connect(self._on_load_cancel_requested)
+            data_view.sheet_selection_changed.connect(self._on_sheet_selection_changed)
             data_view.field_selection_changed.connect(self._on_field_selection_changed)
+            data_view.field_selections_changed.connect(self._on_field_selections_changed)
             data_view.custom_field_added.connect(self._on_custom_field_added)
             data_view.generate_requested.connect(self._on_generate_requested)
+            data_view.export_cancel_requested.connect(self._on_export_cancel_requested)
     
     def _on_view_changed(self, view_name: str) -> None:
         """处理视图切换事件"""
@@ -63,6 +127,7 @@ class MainController(QObject):
         # 显示错误消息给用户
         data_view = self.main_window.get_data_processing_view()
         if data_view:
+            data_view.set_loading(False)
             data_view.show_error_message("错误", error_message)
     
     def _on_file_loaded(self, file_path: str) -> None:
@@ -72,6 +137,8 @@ class MainController(QObject):
         if data_view and self.data_controller:
             data_info = self.data_controller.get_data_info()
             data_view.update_file_info(file_path, data_info)
+            data_view.update_sheet_list(data_info.get('sheets', []),
+                                        data_info.get('selected_sheets', []))
     
     def _on_headers_updated(self, headers: list) -> None:
         """处理表头更新事件"""
@@ -94,7 +161,10 @@ class MainController(QObject):
         """处理数据处理完成事件"""
         data_view = self.main_window.get_data_processing_view()
         if data_view:
-            if result.success:
+            data_view.set_exporting(False)
+            if result.cancelled:
+                print(f"导出已取消: {result.output_file_path}")
+            elif result.success:
                 message = f"文件已成功生成！\n路径: {result.output_file_path}\n处理行数: {result.processed_rows}"
                 if result.warnings:
                     message += f"\n\n警告:\n" + "\n".join(result.warnings)
@@ -108,13 +178,46 @@ class MainController(QObject):
         
         file_path, _ = QFileDialog.getOpenFileName(
             self.main_window,
-            "选择Excel或CSV文件",
+            "选择数据文件",
             "",
-            "Excel文件 (*.xlsx *.xls);;CSV文件 (*.csv);;所有支持的文件 (*.xlsx *.xls *.csv)"
+            "所有支持的文件 (*.xlsx *.xls *.csv *.parquet *.feather *.arrow);;"
+            "Excel文件 (*.xlsx *.xls);;CSV文件 (*.csv);;"
+            "Parquet文件 (*.parquet);;Feather/Arrow文件 (*.feather *.arrow)"
         )
         
-        if file_path and self.data_controller:
-            self.data_controller.load_file(file_path)
+        if file_path:
+            # 后台预导入尚未完成时在此完成导入
+            data_controller = self._ensure_data_controller()
+            # 先快速读取表头，完整数据在需要时再加载
+            loaded = data_controller.open_file(file_path)
+            data_view = self.main_window.get_data_processing_view()
+            if loaded and data_view and data_controller.is_loading():
+                data_view.set_loading(True)
+    
+    def _on_load_progress(self, percent: int) -> None:
+        """处理文件加载进度"""
+        data_view = self.main_window.get_data_processing_view()
+        if data_view:
+            data_view.update_load_progress(percent)
+    
+    def _on_load_cancel_requested(self) -> None:
+        """处理取消加载请求"""
+        if self.data_controller:
+            self.data_controller.cancel_load()
+    
+    def _on_load_cancelled(self, file_path: str) -> None:
+        """处理文件加载取消事件"""
+        print(f"文件加载已取消: {file_path}")
+        data_view = self.main_window.get_data_processing_view()
+        if data_view:
+            data_view.show_load_cancelled()
+    
+    def _on_sheet_selection_changed(self, sheet_names: list) -> None:
+        """处理工作表选择变更"""
+        if self.data_controller and self.data_controller.select_sheets(sheet_names):
+            data_view = self.main_window.get_data_processing_view()
+            if data_view and self.data_controller.is_loading():
+                data_view.set_loading(True)
     
     def _on_field_selection_changed(self, field_data: list) -> None:
         """处理字段选择变更"""
@@ -122,11 +225,14 @@ class MainController(QObject):
             field_name, is_selected = field_data[0], field_data[1]
             self.data_controller.set_field_selection(field_name, is_selected)
     
-    def _on_custom_field_added(self, field_name: str, default_value: str) -> None:
+    def _on_field_selections_changed(self, selections: dict) -> None:
+        """处理批量字段选择变更"""
+        if self.data_controller:
+            self.data_controller.set_field_selections(selections)
+    
+    def _on_custom_field_added(self, custom_field: CustomField) -> None:
         """处理自定义字段添加"""
         if self.data_controller:
-            from ..models.data_model import CustomField
-            custom_field = CustomField(name=field_name, default_value=default_value)
             self.data_controller.add_custom_field(custom_field)
     
     def _on_generate_requested(self) -> None:
@@ -134,8 +240,20 @@ class MainController(QObject):
         data_view = self.main_window.get_data_processing_view()
         if data_view and self.data_controller:
             output_path = data_view.get_output_file_path()
-            if output_path:
-                self.data_controller.process_data(output_path)
+            if output_path and self.data_controller.export_async(
+                    output_path, per_sheet=data_view.is_export_per_sheet()):
+                data_view.set_exporting(True)
+    
+    def _on_export_progress(self, rows: int, total_rows: int) -> None:
+        """处理导出进度"""
+        data_view = self.main_window.get_data_processing_view()
+        if data_view:
+            data_view.update_export_progress(rows, total_rows)
+    
+    def _on_export_cancel_requested(self) -> None:
+        """处理取消导出请求"""
+        if self.data_controller:
+            self.data_controller.cancel_export()
     
     def _update_fields_list(self) -> None:
         """更新字段列表显示"""
@@ -149,6 +267,6 @@ class MainController(QObject):
         """获取主窗口实例"""
         return self.main_window
     
-    def get_data_controller(self) -> DataController:
+    def get_data_controller(self) -> 'DataController':
         """获取数据控制器实例"""
-        return self.data_controller
\ No newline at end of file
+        return self._ensure_data_controller()
\ No newline at end of file
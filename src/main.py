@@ -1,14 +1,33 @@
 """
 Excel Data Processor 应用程序入口
 """
+import multiprocessing
+import os
 import sys
+import time
+
+# 启动计时的起点，在导入Qt和界面模块之前记录
+_START_TIME = time.perf_counter()
+
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 
 from .views.main_window import MainWindow
 from .controllers.main_controller import MainController
 
 
+# 设置该环境变量后，在标准错误输出启动耗时
+STARTUP_TIMING_ENV = 'EXCEL_DATA_PROCESSOR_STARTUP_TIMING'
+
+# 设置该环境变量后，启动完成即退出，用于启动性能基准测试
+STARTUP_EXIT_ENV = 'EXCEL_DATA_PROCESSOR_EXIT_AFTER_STARTUP'
+
+
+def _report_startup_time(stage: str) -> None:
+    """输出从启动到指定阶段的耗时"""
+    print(f"startup {stage}={time.perf_counter() - _START_TIME:.3f}s", file=sys.stderr, flush=True)
+
+
 def main():
     """应用程序主函数"""
     # 创建应用程序实例
@@ -33,6 +52,14 @@ def main():
         # 显示主窗口
         main_window.show()
         
+        if os.environ.get(STARTUP_TIMING_ENV):
+            # 事件循环开始处理时窗口已显示；数据控制器就绪后才能导入文件
+            QTimer.singleShot(0, lambda: _report_startup_time('first_window'))
+            main_controller.application_ready.connect(
+                lambda: _report_startup_time('interactive'))
+        if os.environ.get(STARTUP_EXIT_ENV):
+            main_controller.application_ready.connect(app.quit)
+        
         # 运行应用程序
         return app.exec()
         
@@ -42,4 +69,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # PyInstaller打包后，spawn方式启动的工作进程会重新运行本程序，需要在这里转入工作进程
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
@@ -1,8 +1,9 @@
 """
 数据模型，定义数据结构和状态
 """
+import json
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from enum import Enum
 
 
@@ -16,7 +17,7 @@ class FieldType(Enum):
 class CustomField:
     """自定义字段模型"""
     name: str
-    default_value: str = ""
+    default_value: str = ""  # 公式字段为公式表达式，例如 "[薪资] * 1.1"
     field_type: str = "text"  # text, number, date, formula
     description: str = ""
     
@@ -76,12 +77,53 @@ class FieldSelection:
 
 @dataclass
 class DataConfiguration:
-    """数据配置模型，包含字段选择和自定义字段"""
+    """数据配置模型，包含字段选择和自定义字段
+    
+    内部维护字段名称到字段选择、自定义字段的索引，查找均为O(1)。
+    直接修改original_headers、field_selections或custom_fields列表后，
+    需要调用rebuild_index()保持索引一致。
+    """
     file_path: Optional[str] = None
     original_headers: List[str] = field(default_factory=list)
     field_selections: List[FieldSelection] = field(default_factory=list)
     custom_fields: List[CustomField] = field(default_factory=list)
     
+    # 名称索引，同名字段以第一个为准
+    _field_index: Dict[str, FieldSelection] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _custom_field_index: Dict[str, CustomField] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _original_header_set: Set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self) -> None:
+        self.rebuild_index()
+    
+    def rebuild_index(self) -> None:
+        """根据字段列表重建名称索引"""
+        self._original_header_set = set(self.original_headers)
+        
+        self._field_index = {}
+        for fs in self.field_selections:
+            self._field_index.setdefault(fs.field_name, fs)
+        
+        self._custom_field_index = {}
+        for cf in self.custom_fields:
+            self._custom_field_index.setdefault(cf.name, cf)
+    
+    def set_original_headers(self, headers: List[str]) -> None:
+        """设置原始表头"""
+        self.original_headers = list(headers)
+        self._original_header_set = set(self.original_headers)
+    
+    def clear_field_selections(self) -> None:
+        """清除所有字段选择"""
+        self.field_selections.clear()
+        self._field_index.clear()
+    
     def get_selected_original_fields(self) -> List[str]:
         """获取选中的原始字段"""
         return [
@@ -107,16 +149,20 @@ class DataConfiguration:
                     field_names.append(fs.custom_field.name)
         return field_names
     
+    def get_field_selection(self, field_name: str) -> Optional[FieldSelection]:
+        """按名称获取字段选择"""
+        return self._field_index.get(field_name)
+    
     def add_original_field(self, field_name: str, selected: bool = True) -> None:
         """添加原始字段"""
         # 检查是否已存在
-        for fs in self.field_selections:
-            if fs.field_name == field_name and fs.field_type == FieldType.ORIGINAL:
-                fs.is_selected = selected
-                return
+        fs = self._field_index.get(field_name)
+        if fs is not None and fs.field_type == FieldType.ORIGINAL:
+            fs.is_selected = selected
+            return
         
         # 添加新字段
-        self.field_selections.append(
+        self._append_field_selection(
             FieldSelection(
                 field_name=field_name,
                 is_selected=selected,
@@ -132,9 +178,10 @@ class DataConfiguration:
         
         # 添加到自定义字段列表
         self.custom_fields.append(custom_field)
+        self._custom_field_index[custom_field.name] = custom_field
         
         # 添加到字段选择列表
-        self.field_selections.append(
+        self._append_field_selection(
             FieldSelection(
                 field_name=custom_field.name,
                 is_selected=selected,
@@ -146,37 +193,54 @@ class DataConfiguration:
     def remove_custom_field(self, field_name: str) -> bool:
         """移除自定义字段"""
         # 从自定义字段列表中移除
-        self.custom_fields = [cf for cf in self.custom_fields if cf.name != field_name]
+        custom_field = self._custom_field_index.pop(field_name, None)
+        if custom_field is not None:
+            self.custom_fields.remove(custom_field)
         
         # 从字段选择列表中移除
-        original_count = len(self.field_selections)
-        self.field_selections = [
-            fs for fs in self.field_selections
-            if not (fs.field_name == field_name and fs.field_type == FieldType.CUSTOM)
-        ]
+        fs = self._field_index.get(field_name)
+        if fs is None or fs.field_type != FieldType.CUSTOM:
+            return False
         
-        return len(self.field_selections) < original_count
+        self.field_selections.remove(fs)
+        del self._field_index[field_name]
+        return True
     
     def is_field_name_exists(self, field_name: str) -> bool:
         """检查字段名称是否已存在"""
-        # 检查原始字段
-        if field_name in self.original_headers:
-            return True
-        
-        # 检查自定义字段
-        for cf in self.custom_fields:
-            if cf.name == field_name:
-                return True
-        
-        return False
+        # 检查原始字段和自定义字段
+        return field_name in self._original_header_set or field_name in self._custom_field_index
     
     def set_field_selection(self, field_name: str, selected: bool) -> bool:
         """设置字段选择状态"""
-        for fs in self.field_selections:
-            if fs.field_name == field_name:
+        fs = self._field_index.get(field_name)
+        if fs is None:
+            return False
+        fs.is_selected = selected
+        return True
+    
+    def set_field_selections(self, selections: Dict[str, bool]) -> int:
+        """
+        批量设置字段选择状态
+        
+        Args:
+            selections: 字段名称到是否选中的映射
+            
+        Returns:
+            int: 找到并设置的字段数量
+        """
+        applied = 0
+        for field_name, selected in selections.items():
+            fs = self._field_index.get(field_name)
+            if fs is not None:
                 fs.is_selected = selected
-                return True
-        return False
+                applied += 1
+        return applied
+    
+    def _append_field_selection(self, fs: FieldSelection) -> None:
+        """添加字段选择并更新索引"""
+        self.field_selections.append(fs)
+        self._field_index.setdefault(fs.field_name, fs)
     
     def clear(self) -> None:
         """清除所有配置"""
@@ -184,6 +248,7 @@ class DataConfiguration:
         self.original_headers.clear()
         self.field_selections.clear()
         self.custom_fields.clear()
+        self.rebuild_index()
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典，用于序列化"""
@@ -210,7 +275,19 @@ class DataConfiguration:
         for fs_data in data.get('field_selections', []):
             config.field_selections.append(FieldSelection.from_dict(fs_data))
         
+        config.rebuild_index()
         return config
+    
+    def save(self, file_path: str) -> None:
+        """将配置保存为JSON文件"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+    
+    @classmethod
+    def load(cls, file_path: str) -> 'DataConfiguration':
+        """从JSON文件加载配置"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
 
 
 @dataclass
@@ -221,6 +298,9 @@ class ProcessingResult:
     processed_rows: int = 0
     error_message: Optional[str] = None
     warnings: List[str] = field(default_factory=list)
+    input_file_path: Optional[str] = None
+    elapsed_seconds: float = 0.0
+    cancelled: bool = False
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -229,5 +309,56 @@ class ProcessingResult:
             'output_file_path': self.output_file_path,
             'processed_rows': self.processed_rows,
             'error_message': self.error_message,
-            'warnings': self.warnings.copy()
+            'warnings': self.warnings.copy(),
+            'input_file_path': self.input_file_path,
+            'elapsed_seconds': self.elapsed_seconds,
+            'cancelled': self.cancelled
+        }
+
+
+@dataclass
+class BatchResult:
+    """批量处理结果模型"""
+    results: List[ProcessingResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def succeeded(self) -> int:
+        """成功处理的文件数"""
+        return sum(1 for result in self.results if result.success)
+    
+    @property
+    def failed(self) -> int:
+        """处理失败的文件数"""
+        return len(self.results) - self.succeeded
+    
+    @property
+    def total_rows(self) -> int:
+        """所有文件导出的总行数"""
+        return sum(result.processed_rows for result in self.results)
+    
+    @property
+    def rows_per_second(self) -> float:
+        """整体吞吐量，每秒导出的行数"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.total_rows / self.elapsed_seconds
+    
+    @property
+    def files_per_second(self) -> float:
+        """整体吞吐量，每秒处理的文件数"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return len(self.results) / self.elapsed_seconds
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'results': [result.to_dict() for result in self.results],
+            'elapsed_seconds': self.elapsed_seconds,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'total_rows': self.total_rows,
+            'rows_per_second': self.rows_per_second,
+            'files_per_second': self.files_per_second
         }
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+批量处理服务，将同一份数据配置应用到多个输入文件
+
+每个文件在独立的进程中完成读取、字段选择和导出，
+不依赖Qt，可以在命令行或后台任务中使用。
+"""
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..models.data_model import BatchResult, DataConfiguration, ProcessingResult
+from .export_service import OUTPUT_FORMATS, ExportService
+from .file_reader import (DEFAULT_CHUNK_SIZE, SUPPORTED_FORMATS, iter_file_chunks,
+                          read_columns, validate_file_path)
+from .processing import apply_configuration, copy_on_write, get_required_columns
+
+
+# 源文件达到该大小时分块流式处理
+DEFAULT_STREAMING_THRESHOLD = 100 * 1024 * 1024
+
+# 批量进度回调：已完成文件数, 文件总数, 刚完成的文件结果
+BatchProgressCallback = Callable[[int, int, ProcessingResult], None]
+
+
+def expand_input_paths(inputs: Iterable[str]) -> List[str]:
+    """
+    展开输入路径，支持通配符
+
+    Args:
+        inputs: 文件路径或通配符模式，例如 "branches/**/*.xlsx"
+
+    Returns:
+        List[str]: 去重后的文件路径，保持输入顺序；通配符只匹配支持的文件格式
+    """
+    paths: List[str] = []
+    seen = set()
+    for pattern in inputs:
+        if glob.has_magic(pattern):
+            matches = sorted(
+                path for path in glob.glob(pattern, recursive=True)
+                if Path(path).suffix.lower() in SUPPORTED_FORMATS and os.path.isfile(path)
+            )
+        else:
+            matches = [pattern]
+
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def make_output_paths(input_paths: List[str], output_dir: str,
+                      output_format: Optional[str] = None) -> Dict[str, str]:
+    """
+    为每个输入文件计算输出路径
+
+    Args:
+        input_paths: 输入文件路径
+        output_dir: 输出目录
+        output_format: 输出格式，见OUTPUT_FORMATS，None表示与输入格式相同
+
+    Returns:
+        Dict[str, str]: 输入路径到输出路径的映射，不同目录下的同名文件会加序号区分，
+            与任一输入文件相同的输出路径（例如输出目录即输入目录）也会加序号，避免覆盖输入；
+            不支持写出的输入格式（例如.xls）默认输出为.xlsx
+    """
+    output_paths = {}
+    # 按解析后的绝对路径比较，相对路径、符号链接和大小写不同的写法都视为同一文件
+    used = {_path_key(path) for path in input_paths}
+    for input_path in input_paths:
+        source = Path(input_path)
+        suffix = output_format or source.suffix.lower()
+        if suffix not in OUTPUT_FORMATS:
+            suffix = '.xlsx'
+
+        output_path = Path(output_dir) / f"{source.stem}{suffix}"
+        counter = 1
+        while _path_key(output_path) in used:
+            output_path = Path(output_dir) / f"{source.stem}_{counter}{suffix}"
+            counter += 1
+
+        used.add(_path_key(output_path))
+        output_paths[input_path] = str(output_path)
+    return output_paths
+
+
+def _path_key(path) -> str:
+    """用于比较是否为同一文件的路径"""
+    return os.path.normcase(str(Path(path).resolve()))
+
+
+def process_file(input_path: str,
+                 output_path: str,
+                 configuration: DataConfiguration,
+                 streaming_threshold: int = DEFAULT_STREAMING_THRESHOLD,
+                 chunksize: int = DEFAULT_CHUNK_SIZE,
+                 compression: Optional[str] = None) -> ProcessingResult:
+    """
+    按配置处理单个文件：读取需要的列、选择字段并导出
+
+    在工作进程中执行，任何错误都记录在返回结果中而不抛出。
+
+    Args:
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        configuration: 数据配置
+        streaming_threshold: 源文件达到该字节数时分块流式处理
+        chunksize: 流式处理时每块的行数
+        compression: Parquet/Feather/Arrow输出的压缩算法，None表示默认算法
+
+    Returns:
+        ProcessingResult: 处理结果
+    """
+    start = time.perf_counter()
+    warnings: List[str] = []
+    try:
+        validate_file_path(input_path)
+        required_columns = get_required_columns(configuration)
+        export_service = ExportService(compression=compression)
+
+        if os.path.getsize(input_path) >= streaming_threshold:
+            # 未选中任何原始字段时仍需读取行以确定行数
+            chunks = iter_file_chunks(input_path, columns=required_columns or None,
+                                      chunksize=chunksize)
+            processed = (
+                apply_configuration(chunk, configuration, warnings if index == 0 else None)
+                for index, chunk in enumerate(chunks)
+            )
+            processed_rows = export_service.write_chunks(processed, output_path)
+        else:
+            with copy_on_write():
+                source_data = read_columns(input_path, required_columns)
+                result_data = apply_configuration(source_data, configuration, warnings)
+                processed_rows = export_service.write_data(result_data, output_path)
+
+        split_warning = export_service.row_limit_warning(output_path, processed_rows)
+        if split_warning:
+            warnings.append(split_warning)
+
+        return ProcessingResult(
+            success=True,
+            output_file_path=output_path,
+            processed_rows=processed_rows,
+            warnings=warnings,
+            input_file_path=input_path,
+            elapsed_seconds=time.perf_counter() - start
+        )
+    except Exception as e:
+        return ProcessingResult(
+            success=False,
+            error_message=f"处理文件时发生错误: {str(e)}",
+            warnings=warnings,
+            input_file_path=input_path,
+            elapsed_seconds=time.perf_counter() - start
+        )
+
+
+class BatchProcessor:
+    """
+    批量处理器
+
+    使用进程池并行处理多个文件，每个文件的读取、字段选择和导出
+    都在工作进程中完成，主进程只汇总结果。
+    工作进程使用spawn方式启动，不会继承调用方（例如Qt界面）的线程状态。
+    """
+
+    def __init__(self, configuration: DataConfiguration,
+                 max_workers: Optional[int] = None,
+                 output_format: Optional[str] = None,
+                 streaming_threshold: int = DEFAULT_STREAMING_THRESHOLD,
+                 compression: Optional[str] = None):
+        """
+        Args:
+            configuration: 应用到所有文件的数据配置
+            max_workers: 最大工作进程数，None表示CPU核心数，1表示在当前进程中顺序处理
+            output_format: 输出格式，见OUTPUT_FORMATS，None表示与输入格式相同
+            streaming_threshold: 源文件达到该字节数时分块流式处理
+            compression: Parquet/Feather/Arrow输出的压缩算法，None表示默认算法
+        """
+        if output_format is not None and output_format.lower() not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {output_format}")
+
+        self.configuration = configuration
+        self.max_workers = max_workers
+        self.output_format = output_format.lower() if output_format else None
+        self.streaming_threshold = streaming_threshold
+        self.compression = compression
+
+    def run(self, inputs: Iterable[str], output_dir: str,
+            progress_callback: Optional[BatchProgressCallback] = None) -> BatchResult:
+        """
+        处理所有输入文件
+
+        Args:
+            inputs: 文件路径或通配符模式
+            output_dir: 输出目录，不存在时自动创建
+            progress_callback: 每个文件完成时的回调
+
+        Returns:
+            BatchResult: 各文件的处理结果（按输入顺序）和整体耗时
+        """
+        start = time.perf_counter()
+        input_paths = expand_input_paths(inputs)
+        output_paths = make_output_paths(input_paths, output_dir, self.output_format)
+        os.makedirs(output_dir, exist_ok=True)
+
+        if self._worker_count(len(input_paths)) <= 1:
+            results = self._run_sequential(input_paths, output_paths, progress_callback)
+        else:
+            results = self._run_parallel(input_paths, output_paths, progress_callback)
+
+        return BatchResult(
+            results=[results[path] for path in input_paths],
+            elapsed_seconds=time.perf_counter() - start
+        )
+
+    def _worker_count(self, file_count: int) -> int:
+        """实际使用的工作进程数，不超过文件数"""
+        max_workers = self.max_workers or os.cpu_count() or 1
+        return min(max_workers, file_count)
+
+    def _run_sequential(self, input_paths: List[str], output_paths: Dict[str, str],
+                        progress_callback: Optional[BatchProgressCallback]
+                        ) -> Dict[str, ProcessingResult]:
+        """在当前进程中依次处理文件"""
+        results = {}
+        for input_path in input_paths:
+            result = process_file(input_path, output_paths[input_path],
+                                  self.configuration, self.streaming_threshold,
+                                  compression=self.compression)
+            results[input_path] = result
+            if progress_callback:
+                progress_callback(len(results), len(input_paths), result)
+        return results
+
+    def _run_parallel(self, input_paths: List[str], output_paths: Dict[str, str],
+                      progress_callback: Optional[BatchProgressCallback]
+                      ) -> Dict[str, ProcessingResult]:
+        """使用进程池并行处理文件"""
+        results = {}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self._worker_count(len(input_paths)),
+                                 mp_context=context) as executor:
+            futures = {
+                executor.submit(process_file, input_path, output_paths[input_path],
+                                self.configuration, self.streaming_threshold,
+                                compression=self.compression): input_path
+                for input_path in input_paths
+            }
+            for future in as_completed(futures):
+                input_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 工作进程异常退出等进程池层面的错误
+                    result = ProcessingResult(
+                        success=False,
+                        error_message=f"处理文件时发生错误: {str(e)}",
+                        input_file_path=input_path
+                    )
+                results[input_path] = result
+                if progress_callback:
+                    progress_callback(len(results), len(input_paths), result)
+        return results
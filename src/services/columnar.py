@@ -0,0 +1,403 @@
+"""
+Parquet、Feather和Arrow IPC文件的读写
+
+这些格式按列存储，读取时只解码需要的列，并可以按行组（Parquet）或
+记录批次（Feather/Arrow IPC）逐块读取。依赖pyarrow，在首次使用时才导入。
+"""
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+
+# 列式存储格式，Feather v2与Arrow IPC文件格式相同
+PARQUET_FORMATS = {'.parquet'}
+IPC_FORMATS = {'.feather', '.arrow'}
+COLUMNAR_FORMATS = PARQUET_FORMATS | IPC_FORMATS
+
+# 各格式支持的压缩算法，第一个为默认值；none表示不压缩
+PARQUET_COMPRESSIONS = ('snappy', 'zstd', 'gzip', 'brotli', 'lz4', 'none')
+IPC_COMPRESSIONS = ('lz4', 'zstd', 'none')
+
+# Parquet文件每个行组的默认行数
+DEFAULT_ROW_GROUP_SIZE = 100000
+
+
+def is_columnar_format(file_path: str) -> bool:
+    """检查文件扩展名是否为列式存储格式"""
+    return Path(file_path).suffix.lower() in COLUMNAR_FORMATS
+
+
+def _import_pyarrow():
+    """导入pyarrow，未安装时给出安装提示"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("读写Parquet/Feather/Arrow文件需要安装pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def _is_parquet(file_path: str) -> bool:
+    return Path(file_path).suffix.lower() in PARQUET_FORMATS
+
+
+def _open_ipc(file_path: str):
+    """以内存映射方式打开Arrow IPC文件，读取时不复制未使用的列"""
+    pa = _import_pyarrow()
+    return pa.ipc.open_file(pa.memory_map(file_path, 'r'))
+
+
+def read_schema(file_path: str) -> Tuple[List[str], int]:
+    """
+    只读取文件元数据，获取列名和总行数
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        Tuple[List[str], int]: 列名和总行数
+    """
+    _import_pyarrow()
+    if _is_parquet(file_path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        return list(parquet_file.schema_arrow.names), parquet_file.metadata.num_rows
+
+    reader = _open_ipc(file_path)
+    row_count = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    return list(reader.schema.names), row_count
+
+
+def iter_batches(file_path: str, columns: Optional[List[str]] = None,
+                 batch_size: int = DEFAULT_ROW_GROUP_SIZE) -> Iterator[Any]:
+    """
+    逐块读取文件，只解码指定的列
+
+    Parquet文件按行组读取，Feather/Arrow文件按记录批次读取，每块最多batch_size行。
+
+    Args:
+        file_path: 文件路径
+        columns: 需要读取的列，None表示全部列
+        batch_size: 每块的最大行数
+
+    Yields:
+        pyarrow.RecordBatch: 数据块，列按columns顺序排列
+
+    Raises:
+        KeyError: 指定的列不存在时抛出
+    """
+    _import_pyarrow()
+    if _is_parquet(file_path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        _check_columns(parquet_file.schema_arrow.names, columns)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.select(columns) if columns is not None else batch
+        return
+
+    reader = _open_ipc(file_path)
+    _check_columns(reader.schema.names, columns)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns is not None:
+            batch = batch.select(columns)
+        for offset in range(0, batch.num_rows, batch_size):
+            yield batch.slice(offset, batch_size)
+
+
+def _check_columns(names: List[str], columns: Optional[List[str]]) -> None:
+    """检查需要读取的列是否存在"""
+    if columns is None:
+        return
+    missing = [col for col in columns if col not in names]
+    if missing:
+        raise KeyError(f"文件中不存在列: {', '.join(missing)}")
+
+
+def read_table(file_path: str, columns: Optional[List[str]] = None,
+               nrows: Optional[int] = None,
+               on_batch: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+    """
+    读取文件为DataFrame
+
+    Args:
+        file_path: 文件路径
+        columns: 需要读取的列，None表示全部列；空列表时只保留行数
+        nrows: 最多读取的行数，None表示全部
+        on_batch: 每读取一块后的回调，参数为已读取的行数和总行数，可以抛出异常中止读取
+
+    Returns:
+        pd.DataFrame: 按columns顺序排列的数据
+
+    Raises:
+        KeyError: 指定的列不存在时抛出
+    """
+    pa = _import_pyarrow()
+    if nrows is None and on_batch is None:
+        if _is_parquet(file_path):
+            import pyarrow.parquet as pq
+
+            _check_columns(pq.ParquetFile(file_path).schema_arrow.names, columns)
+            return table_to_frame(pq.read_table(file_path, columns=columns))
+
+        table = _open_ipc(file_path).read_all()
+        _check_columns(table.schema.names, columns)
+        return table_to_frame(table.select(columns) if columns is not None else table)
+
+    total_rows = read_schema(file_path)[1] if on_batch is not None else 0
+    batch_size = max(nrows, 1) if nrows is not None else DEFAULT_ROW_GROUP_SIZE
+    batches = []
+    rows = 0
+    for batch in iter_batches(file_path, columns, batch_size):
+        if nrows is not None:
+            batch = batch.slice(0, nrows - rows)
+        batches.append(batch)
+        rows += batch.num_rows
+        if on_batch is not None:
+            on_batch(rows, total_rows)
+        if nrows is not None and rows >= nrows:
+            break
+
+    if not batches:
+        names, _ = read_schema(file_path)
+        return pd.DataFrame(columns=columns if columns is not None else names)
+    return table_to_frame(pa.Table.from_batches(batches))
+
+
+def table_to_frame(table: Any) -> pd.DataFrame:
+    """
+    将Arrow表或记录批次转换为DataFrame
+
+    Args:
+        table: pyarrow.Table或pyarrow.RecordBatch
+
+    Returns:
+        pd.DataFrame: 转换后的数据，没有列时仍保留行数
+    """
+    if table.num_columns == 0:
+        return pd.DataFrame(index=pd.RangeIndex(table.num_rows))
+    return table.to_pandas()
+
+
+def resolve_compression(file_path: str, compression: Optional[str] = None) -> Optional[str]:
+    """
+    确定写入时使用的压缩算法
+
+    Args:
+        file_path: 输出文件路径，根据扩展名确定支持的算法
+        compression: 请求的压缩算法，None表示该格式的默认算法
+
+    Returns:
+        Optional[str]: 传给pyarrow的压缩算法，None表示不压缩
+
+    Raises:
+        ValueError: 该格式不支持请求的压缩算法时抛出
+    """
+    choices = PARQUET_COMPRESSIONS if _is_parquet(file_path) else IPC_COMPRESSIONS
+    if compression is None:
+        compression = choices[0]
+    compression = compression.lower()
+    if compression not in choices:
+        raise ValueError(
+            f"{Path(file_path).suffix}文件不支持的压缩算法: {compression}。"
+            f"支持的算法: {', '.join(choices)}"
+        )
+    return None if compression == 'none' else compression
+
+
+def promote_type(current: Any, incoming: Any) -> Any:
+    """
+    计算能同时容纳两种Arrow类型的类型
+
+    空类型提升为另一种类型，整数与浮点数提升为较宽的数值类型，
+    无法统一的类型（例如数值与文本）提升为文本。
+
+    Args:
+        current: 文件中已有的类型
+        incoming: 新数据块的类型
+
+    Returns:
+        pyarrow.DataType: 提升后的类型
+    """
+    pa = _import_pyarrow()
+    if current.equals(incoming):
+        return current
+    if pa.types.is_null(current):
+        return incoming
+    if pa.types.is_null(incoming):
+        return current
+    try:
+        unified = pa.unify_schemas(
+            [pa.schema([('value', current)]), pa.schema([('value', incoming)])],
+            promote_options='permissive'
+        )
+        return unified.field('value').type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pa.string()
+
+
+def _frame_to_table(data: pd.DataFrame) -> Any:
+    """转换为Arrow表，混合了文本和其他类型的object列转换为文本"""
+    pa = _import_pyarrow()
+    try:
+        return pa.Table.from_pandas(data, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    data = data.copy(deep=False)
+    for position in range(len(data.columns)):
+        column = data.iloc[:, position]
+        if column.dtype == object and pd.api.types.infer_dtype(column).startswith('mixed'):
+            data.isetitem(position, column.where(column.isna(), column.astype(str)))
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def _promote_schema(current: Any, incoming: Any) -> Any:
+    """逐列提升文件的结构，提升后去掉第一块数据的pandas元数据"""
+    pa = _import_pyarrow()
+    if current.names != incoming.names:
+        raise ValueError(f"数据块的列与文件不一致: {incoming.names}")
+    fields = [
+        field.with_type(promote_type(field.type, incoming.field(i).type))
+        for i, field in enumerate(current)
+    ]
+    promoted = pa.schema(fields)
+    if all(a.type.equals(b.type) for a, b in zip(current, promoted)):
+        return current
+    return promoted
+
+
+def _read_batches(file_path: str) -> Iterator[Any]:
+    """逐块读取已写入的文件，读取完毕后关闭文件"""
+    pa = _import_pyarrow()
+    if _is_parquet(file_path):
+        import pyarrow.parquet as pq
+
+        with pq.ParquetFile(file_path) as parquet_file:
+            yield from parquet_file.iter_batches(batch_size=DEFAULT_ROW_GROUP_SIZE)
+        return
+
+    with pa.memory_map(file_path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+class ColumnarWriter:
+    """
+    逐块写入Parquet、Feather或Arrow IPC文件
+
+    第一块数据确定文件的列和类型。之后的数据块类型不同时（例如第一块中全为空的列、
+    整数与浮点数交替的列）按promote_type提升文件的类型，并按新类型重写已写入的数据。
+    每块数据按DEFAULT_ROW_GROUP_SIZE行写为一个或多个行组（Parquet）或记录批次（Feather/Arrow）。
+    """
+
+    def __init__(self, output_file_path: str, compression: Optional[str] = None):
+        """
+        Args:
+            output_file_path: 输出文件路径，根据扩展名确定文件格式
+            compression: 压缩算法，见PARQUET_COMPRESSIONS和IPC_COMPRESSIONS，None表示默认算法
+
+        Raises:
+            ImportError: 未安装pyarrow时抛出
+            ValueError: 压缩算法不受支持时抛出
+        """
+        _import_pyarrow()
+        self.output_file_path = output_file_path
+        self.compression = resolve_compression(output_file_path, compression)
+        self._schema = None
+        self._writer = None
+        self._sink = None
+
+    def write_frame(self, data: pd.DataFrame) -> int:
+        """
+        写入一块数据
+
+        Args:
+            data: 数据块，列应与第一块一致
+
+        Returns:
+            int: 写入的行数
+        """
+        table = _frame_to_table(data)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open(table.schema)
+        elif not table.schema.equals(self._schema):
+            schema = _promote_schema(self._schema, table.schema)
+            if not schema.equals(self._schema):
+                self._rewrite(schema)
+            table = table.cast(self._schema)
+        self._write_table(table)
+        return len(data)
+
+    def _write_table(self, table) -> None:
+        """写入结构与文件一致的Arrow表"""
+        if _is_parquet(self.output_file_path):
+            self._writer.write_table(table, row_group_size=DEFAULT_ROW_GROUP_SIZE)
+        else:
+            self._writer.write_table(table, max_chunksize=DEFAULT_ROW_GROUP_SIZE)
+
+    def _rewrite(self, schema) -> None:
+        """按提升后的类型重新打开文件，并逐块转换写入已写入的数据"""
+        pa = _import_pyarrow()
+        self._close_writer()
+        # 保留扩展名，按同一格式读取
+        output = Path(self.output_file_path)
+        previous_path = str(output.with_name(f".{output.stem}.{uuid.uuid4().hex[:8]}{output.suffix}"))
+        os.replace(self.output_file_path, previous_path)
+        try:
+            self._schema = schema
+            self._writer = self._open(schema)
+            for batch in _read_batches(previous_path):
+                self._write_table(pa.Table.from_batches([batch]).cast(schema))
+        finally:
+            os.remove(previous_path)
+
+    def _open(self, schema):
+        """按文件格式创建写入器"""
+        pa = _import_pyarrow()
+        if _is_parquet(self.output_file_path):
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.output_file_path, schema,
+                                    compression=self.compression or 'none')
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        # 显式打开输出文件，关闭写入器后随即关闭文件，保证数据已写入磁盘
+        self._sink = pa.OSFile(self.output_file_path, 'wb')
+        return pa.ipc.new_file(self._sink, schema, options=options)
+
+    def _close_writer(self) -> None:
+        """关闭写入器和输出文件"""
+        try:
+            self._writer.close()
+        finally:
+            if self._sink is not None:
+                self._sink.close()
+                self._sink = None
+
+    def close(self) -> None:
+        """完成写入，没有写入任何数据时写出一个空文件"""
+        if self._writer is None:
+            self.write_frame(pd.DataFrame())
+        self._close_writer()
+
+    def discard(self) -> None:
+        """放弃写入，关闭已打开的文件"""
+        if self._writer is not None:
+            try:
+                self._close_writer()
+            except Exception:
+                pass
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,206 @@
+"""
+已解析数据的磁盘缓存，以Arrow IPC（Feather）列式格式保存，读取时使用内存映射
+"""
+import hashlib
+import json
+import os
+import uuid
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .file_reader import is_module_available
+
+
+# 默认缓存目录和大小上限
+DEFAULT_CACHE_DIR = Path.home() / '.excel_data_processor' / 'cache'
+DEFAULT_MAX_CACHE_SIZE = 2 * 1024 * 1024 * 1024
+
+# 缓存文件扩展名
+CACHE_SUFFIX = '.arrow'
+
+# 计算文件内容哈希时每次读取的字节数
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# 保存在Arrow元数据中的CSV编码，以及数据是否全部为Arrow类型的列
+_ENCODING_METADATA_KEY = b'excel_data_processor.encoding'
+_ARROW_DTYPES_METADATA_KEY = b'excel_data_processor.arrow_dtypes'
+
+
+class DataCache:
+    """
+    已解析数据的磁盘缓存
+
+    缓存键由文件路径、大小、修改时间、内容哈希和读取选项组成，
+    文件变化后自动失效。缓存总大小超过上限时按最近使用时间淘汰。
+    未安装pyarrow时缓存不可用，所有操作均为空操作。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_size: int = DEFAULT_MAX_CACHE_SIZE):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_size = max_size
+
+    def is_available(self) -> bool:
+        """
+        检查缓存是否可用
+
+        Returns:
+            bool: 是否安装了pyarrow
+        """
+        return is_module_available('pyarrow')
+
+    def get(self, key: str,
+            columns: Optional[List[str]] = None) -> Optional[Tuple[pd.DataFrame, Optional[str]]]:
+        """
+        从缓存读取文件的解析结果
+
+        Args:
+            key: make_key计算的缓存键
+            columns: 只读取这些列，None表示全部列
+
+        Returns:
+            Optional[Tuple[pd.DataFrame, Optional[str]]]: 数据和CSV编码，未命中时返回None
+        """
+        if not self.is_available():
+            return None
+
+        cache_path = self._cache_path(key)
+        if not cache_path.exists():
+            return None
+
+        from pyarrow import feather
+
+        try:
+            table = feather.read_table(str(cache_path), columns=columns, memory_map=True)
+        except Exception:
+            # 缓存文件损坏或缺少列时视为未命中
+            return None
+
+        # 更新修改时间，作为淘汰时的最近使用时间
+        os.utime(cache_path)
+
+        metadata = table.schema.metadata or {}
+        encoding = metadata.get(_ENCODING_METADATA_KEY)
+        if metadata.get(_ARROW_DTYPES_METADATA_KEY):
+            # Arrow类型的列直接引用内存映射的缓冲区，不复制数据
+            data = table.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            data = table.to_pandas()
+        return data, encoding.decode('utf-8') if encoding else None
+
+    def put(self, key: str, data: pd.DataFrame, encoding: Optional[str] = None) -> bool:
+        """
+        将解析结果写入缓存
+
+        Args:
+            key: make_key计算的缓存键
+            data: 解析得到的数据
+            encoding: CSV文件编码
+
+        Returns:
+            bool: 是否写入成功，无法转换为Arrow格式的数据不会缓存
+        """
+        if not self.is_available():
+            return False
+
+        # Arrow要求列名为字符串
+        if not all(isinstance(col, str) for col in data.columns):
+            return False
+
+        import pyarrow as pa
+        from pyarrow import feather
+
+        try:
+            table = pa.Table.from_pandas(data, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            return False
+
+        metadata = dict(table.schema.metadata or {})
+        if encoding:
+            metadata[_ENCODING_METADATA_KEY] = encoding.encode('utf-8')
+        if len(data.columns) > 0 and all(isinstance(dtype, pd.ArrowDtype) for dtype in data.dtypes):
+            metadata[_ARROW_DTYPES_METADATA_KEY] = b'1'
+        table = table.replace_schema_metadata(metadata)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_path = self._cache_path(key)
+        # 每次写入使用不同的临时文件，多个进程或线程同时写入同一缓存键时互不干扰
+        temp_path = cache_path.with_name(f'{key}.{uuid.uuid4().hex}.tmp')
+        try:
+            # 不压缩，以便读取时直接内存映射
+            feather.write_feather(table, str(temp_path), compression='uncompressed')
+            os.replace(temp_path, cache_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            return False
+
+        self._evict()
+        return True
+
+    def clear(self) -> None:
+        """清除所有缓存文件"""
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def get_size(self) -> int:
+        """
+        获取缓存占用的总字节数
+
+        Returns:
+            int: 缓存总大小
+        """
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> List[Path]:
+        """列出所有缓存文件"""
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob(f'*{CACHE_SUFFIX}'))
+
+    def _evict(self) -> None:
+        """超过大小上限时，从最久未使用的缓存开始删除"""
+        entries = []
+        for entry in self._entries():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+    def _cache_path(self, key: str) -> Path:
+        """计算缓存键对应的缓存文件路径"""
+        return self.cache_dir / f'{key}{CACHE_SUFFIX}'
+
+    @staticmethod
+    def make_key(file_path: str, read_options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        计算缓存键
+
+        Args:
+            file_path: 源文件路径
+            read_options: 影响解析结果的读取选项
+
+        Returns:
+            str: 由路径、大小、修改时间、内容哈希和读取选项得到的十六进制键
+        """
+        path = Path(file_path).resolve()
+        stat = path.stat()
+
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+                content_hash.update(block)
+
+        key_data = json.dumps({
+            'path': str(path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'content': content_hash.hexdigest(),
+            'options': read_options or {},
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(key_data.encode('utf-8'), digest_size=16).hexdigest()
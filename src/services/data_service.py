@@ -2,9 +2,17 @@
 数据服务层，负责文件读取、数据验证和处理
 """
 import pandas as pd
-from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from PySide6.QtCore import QObject, Signal
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from .file_reader import (
+    FileReadError, LoadCancelledError, SUPPORTED_FORMATS, DEFAULT_CHUNK_SIZE,
+    DEFAULT_PREVIEW_ROWS, EXCEL_ENGINES, read_file, read_preview, read_columns, iter_file_chunks,
+    resolve_csv_engine, list_sheets, read_sheets, SheetSelection, CancelCheck
+)
+from .data_cache import DataCache
+from .dtype_optimizer import memory_usage, optimize_dtypes
+from .processing import copy_on_write
 
 
 class DataValidationError(Exception):
@@ -12,9 +20,73 @@ class DataValidationError(Exception):
     pass
 
 
-class FileReadError(Exception):
-    """文件读取错误"""
-    pass
+def _prepare_loaded_data(data: pd.DataFrame,
+                        optimize: bool) -> Tuple[pd.DataFrame, Tuple[int, int]]:
+    """
+    读取完成后的处理：按需优化列类型，并统计优化前后的内存占用
+
+    Args:
+        data: 读取的数据
+        optimize: 是否优化列类型
+
+    Returns:
+        Tuple[pd.DataFrame, Tuple[int, int]]: 处理后的数据，以及优化前和优化后占用的字节数
+    """
+    before = memory_usage(data)
+    if not optimize:
+        return data, (before, before)
+    data = optimize_dtypes(data)
+    return data, (before, memory_usage(data))
+
+
+class FileLoadSignals(QObject):
+    """后台加载任务的信号，在主线程创建，跨线程发出时自动排队到主线程"""
+    
+    progress = Signal(int, int)  # 加载ID，进度百分比
+    finished = Signal(int, str, object, object, object)  # 加载ID，文件路径，DataFrame，编码，内存占用
+    failed = Signal(int, str)  # 加载ID，错误信息
+    cancelled = Signal(int, str)  # 加载ID，文件路径
+
+
+class FileLoadWorker(QRunnable):
+    """在线程池中读取文件的后台任务"""
+    
+    def __init__(self, load_id: int, file_path: str, read_options: Dict[str, Any],
+                 optimize_dtypes: bool = False):
+        super().__init__()
+        self.load_id = load_id
+        self.file_path = file_path
+        self.read_options = read_options
+        self.optimize_dtypes = optimize_dtypes
+        self.signals = FileLoadSignals()
+        self._cancelled = False
+    
+    def cancel(self) -> None:
+        """请求取消加载"""
+        self._cancelled = True
+    
+    def is_cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._cancelled
+    
+    def run(self) -> None:
+        """读取文件并通过信号返回结果，列类型优化也在后台线程中完成"""
+        try:
+            data, encoding = read_file(
+                self.file_path,
+                progress_callback=lambda percent: self.signals.progress.emit(self.load_id, percent),
+                is_cancelled=self.is_cancelled,
+                **self.read_options
+            )
+            data, memory = _prepare_loaded_data(data, self.optimize_dtypes)
+        except LoadCancelledError:
+            self.signals.cancelled.emit(self.load_id, self.file_path)
+        except FileReadError as e:
+            self.signals.failed.emit(self.load_id, str(e))
+        except Exception as e:
+            self.signals.failed.emit(self.load_id, f"读取文件时发生未知错误: {str(e)}")
+        else:
+            self.signals.finished.emit(self.load_id, self.file_path, data, encoding, memory)
 
 
 class DataService(QObject):
@@ -25,15 +97,48 @@ class DataService(QObject):
     data_validated = Signal(bool)  # 数据验证完成信号，传递验证结果
     headers_parsed = Signal(list)  # 表头解析完成信号，传递表头列表
     error_occurred = Signal(str)  # 错误发生信号，传递错误信息
+    load_progress = Signal(int)  # 后台加载进度信号，传递0-100的百分比
+    load_cancelled = Signal(str)  # 后台加载取消信号，传递文件路径
     
-    def __init__(self):
+    def __init__(self, csv_engine: str = 'auto', excel_engine: str = 'auto',
+                 data_cache: Optional[DataCache] = None, optimize_dtypes: bool = False):
+        """
+        Args:
+            csv_engine: CSV解析引擎，auto在安装了pyarrow时使用多线程的pyarrow引擎
+            excel_engine: Excel解析引擎，auto对较大的文件在安装了python-calamine时使用calamine
+            data_cache: 已解析数据的磁盘缓存，None表示不使用缓存
+            optimize_dtypes: 加载完整数据后是否缩小数值类型、将重复较多的文本转换为分类类型，
+                见dtype_optimizer.optimize_dtypes
+        """
         super().__init__()
+        # 校验引擎名称
+        resolve_csv_engine(csv_engine)
+        if excel_engine not in EXCEL_ENGINES:
+            raise ValueError(f"不支持的Excel引擎: {excel_engine}。支持的引擎: {', '.join(EXCEL_ENGINES)}")
+        self.csv_engine = csv_engine
+        self.excel_engine = excel_engine
+        self.data_cache = data_cache
+        self.optimize_dtypes = optimize_dtypes
         self._current_data: Optional[pd.DataFrame] = None
+        self._preview_data: Optional[pd.DataFrame] = None
+        self._row_count: Optional[int] = None
         self._current_file_path: Optional[str] = None
+        self._current_encoding: Optional[str] = None
         self._headers: List[str] = []
         
+        # 完整数据在列类型优化前和优化后占用的内存（字节）
+        self._memory_usage: Optional[Tuple[int, int]] = None
+        
+        # 工作簿中的工作表和当前选择的工作表，选择多个时合并为一个数据集
+        self._sheet_names: List[str] = []
+        self._selected_sheets: List[str] = []
+        
+        # 后台加载状态
+        self._load_worker: Optional[FileLoadWorker] = None
+        self._load_counter = 0
+        
         # 支持的文件格式
-        self.supported_formats = {'.xlsx', '.xls', '.csv'}
+        self.supported_formats = set(SUPPORTED_FORMATS)
     
     def load_file(self, file_path: str) -> bool:
         """
@@ -49,40 +154,216 @@ class DataService(QObject):
             FileReadError: 文件读取失败时抛出
         """
         try:
-            # 验证文件路径
-            path = Path(file_path)
-            if not path.exists():
-                raise FileReadError(f"文件不存在: {file_path}")
-            
-            if not path.is_file():
-                raise FileReadError(f"路径不是文件: {file_path}")
-            
-            # 检查文件格式
-            file_extension = path.suffix.lower()
-            if file_extension not in self.supported_formats:
-                raise FileReadError(
-                    f"不支持的文件格式: {file_extension}。"
-                    f"支持的格式: {', '.join(self.supported_formats)}"
-                )
-            
+            if file_path != self._current_file_path:
+                self._reset_sheets(file_path)
             # 根据文件类型读取数据
-            if file_extension in {'.xlsx', '.xls'}:
-                self._current_data = pd.read_excel(file_path)
-            elif file_extension == '.csv':
-                # 尝试不同的编码格式
-                encodings = ['utf-8', 'gbk', 'gb2312', 'latin1']
-                for encoding in encodings:
-                    try:
-                        self._current_data = pd.read_csv(file_path, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    raise FileReadError(f"无法解码CSV文件，尝试的编码: {', '.join(encodings)}")
-            
-            # 验证数据
-            if not self._validate_data():
-                return False
+            data, encoding = read_file(file_path, **self._read_options())
+            data, memory = _prepare_loaded_data(data, self.optimize_dtypes)
+        except FileReadError as e:
+            self.error_occurred.emit(str(e))
+            return False
+        except Exception as e:
+            error_msg = f"读取文件时发生未知错误: {str(e)}"
+            self.error_occurred.emit(error_msg)
+            return False
+        
+        return self._apply_loaded_data(file_path, data, encoding, memory)
+    
+    def peek_headers(self, file_path: str, rows: int = DEFAULT_PREVIEW_ROWS) -> bool:
+        """
+        只读取表头和前几行数据，完整数据推迟到需要时再加载
+        
+        成功后发出file_loaded和headers_parsed信号，预览使用读取的前几行。
+        
+        Args:
+            file_path: 文件路径
+            rows: 预览读取的行数
+            
+        Returns:
+            bool: 读取是否成功
+        """
+        try:
+            self._reset_sheets(file_path)
+        except FileReadError as e:
+            self.error_occurred.emit(str(e))
+            return False
+        return self._peek(file_path, rows)
+    
+    def select_sheets(self, sheet_names: List[str], rows: int = DEFAULT_PREVIEW_ROWS) -> bool:
+        """
+        切换当前工作簿使用的工作表，选择多个工作表时合并为一个数据集
+        
+        与peek_headers相同，只重新读取表头和预览行，并发出file_loaded和headers_parsed信号。
+        
+        Args:
+            sheet_names: 工作表名称，必须是当前工作簿中的工作表
+            rows: 预览读取的行数
+            
+        Returns:
+            bool: 切换是否成功
+        """
+        if self._current_file_path is None:
+            self.error_occurred.emit("没有已加载的文件")
+            return False
+        
+        unknown = [name for name in sheet_names if name not in self._sheet_names]
+        if not sheet_names or unknown:
+            self.error_occurred.emit(f"工作表不存在: {', '.join(unknown) or '未选择工作表'}")
+            return False
+        
+        self._selected_sheets = list(sheet_names)
+        return self._peek(self._current_file_path, rows)
+    
+    def _reset_sheets(self, file_path: str) -> None:
+        """列出新文件的工作表，默认选择第一个工作表"""
+        self._sheet_names = list_sheets(file_path, self.excel_engine)
+        self._selected_sheets = self._sheet_names[:1]
+    
+    def _peek(self, file_path: str, rows: int) -> bool:
+        """按当前的工作表选择读取表头和预览行"""
+        try:
+            preview_data, encoding, row_count = read_preview(
+                file_path, rows, sheet_name=self._sheet_selection()
+            )
+            self._validate_data(preview_data)
+        except (FileReadError, DataValidationError) as e:
+            self.error_occurred.emit(str(e))
+            return False
+        except Exception as e:
+            error_msg = f"读取文件时发生未知错误: {str(e)}"
+            self.error_occurred.emit(error_msg)
+            return False
+        
+        self.cancel_load()
+        self._load_worker = None
+        self._current_data = None
+        self._memory_usage = None
+        self._preview_data = preview_data
+        self._row_count = row_count
+        self._current_encoding = encoding
+        self._current_file_path = file_path
+        self._parse_headers()
+        
+        # 发出信号
+        self.file_loaded.emit(file_path)
+        self.headers_parsed.emit(self._headers)
+        
+        return True
+    
+    def is_fully_loaded(self) -> bool:
+        """
+        检查完整数据是否已加载
+        
+        Returns:
+            bool: 是否已加载完整数据
+        """
+        return self._current_data is not None
+    
+    def load_file_async(self, file_path: str) -> None:
+        """
+        在后台线程中加载Excel或CSV文件
+        
+        加载过程中发出load_progress信号；完成后在主线程中发出
+        file_loaded、headers_parsed或error_occurred信号。
+        正在进行的加载会被取消。
+        
+        Args:
+            file_path: 文件路径
+        """
+        self.cancel_load()
+        
+        if file_path != self._current_file_path:
+            try:
+                self._reset_sheets(file_path)
+            except FileReadError as e:
+                self.error_occurred.emit(str(e))
+                return
+        
+        self._load_counter += 1
+        worker = FileLoadWorker(self._load_counter, file_path, self._read_options(),
+                                self.optimize_dtypes)
+        worker.signals.progress.connect(self._on_load_progress)
+        worker.signals.finished.connect(self._on_load_finished)
+        worker.signals.failed.connect(self._on_load_failed)
+        worker.signals.cancelled.connect(self._on_load_cancelled)
+        self._load_worker = worker
+        
+        QThreadPool.globalInstance().start(worker)
+    
+    def cancel_load(self) -> None:
+        """取消正在进行的后台加载"""
+        if self._load_worker is not None:
+            self._load_worker.cancel()
+    
+    def is_loading(self) -> bool:
+        """
+        检查是否有正在进行的后台加载
+        
+        Returns:
+            bool: 是否正在加载
+        """
+        return self._load_worker is not None
+    
+    def _is_current_load(self, load_id: int) -> bool:
+        """检查信号是否来自当前的加载任务，忽略已被替换的任务"""
+        return self._load_worker is not None and self._load_worker.load_id == load_id
+    
+    def _on_load_progress(self, load_id: int, percent: int) -> None:
+        """处理后台加载进度"""
+        if self._is_current_load(load_id):
+            self.load_progress.emit(percent)
+    
+    def _on_load_finished(self, load_id: int, file_path: str, data: pd.DataFrame,
+                          encoding: Optional[str], memory: Tuple[int, int]) -> None:
+        """处理后台加载完成"""
+        if not self._is_current_load(load_id):
+            return
+        self._load_worker = None
+        self._apply_loaded_data(file_path, data, encoding, memory)
+    
+    def _on_load_failed(self, load_id: int, error_message: str) -> None:
+        """处理后台加载失败"""
+        if not self._is_current_load(load_id):
+            return
+        self._load_worker = None
+        self.error_occurred.emit(error_message)
+    
+    def _on_load_cancelled(self, load_id: int, file_path: str) -> None:
+        """处理后台加载取消"""
+        if not self._is_current_load(load_id):
+            return
+        self._load_worker = None
+        self.load_cancelled.emit(file_path)
+    
+    def _apply_loaded_data(self, file_path: str, data: pd.DataFrame,
+                           encoding: Optional[str], memory: Tuple[int, int]) -> bool:
+        """
+        验证读取的数据并更新当前状态
+        
+        Args:
+            file_path: 文件路径
+            data: 读取的数据
+            encoding: CSV文件编码
+            memory: 列类型优化前和优化后占用的字节数
+            
+        Returns:
+            bool: 数据是否有效
+        """
+        try:
+            # 先验证数据，验证失败时保留当前的数据和表头预览
+            self._validate_data(data)
+            
+            # 已预览的文件加载完整数据后表头不变，不重新发出headers_parsed以保留字段选择
+            previous_headers = self._headers
+            upgrading_preview = (
+                self._preview_data is not None and file_path == self._current_file_path
+            )
+            
+            self._current_data = data
+            self._memory_usage = memory
+            self._current_encoding = encoding
+            self._preview_data = None
+            self._row_count = len(data)
             
             # 解析表头
             self._parse_headers()
@@ -93,11 +374,12 @@ class DataService(QObject):
             # 发出信号
             self.file_loaded.emit(file_path)
             self.data_validated.emit(True)
-            self.headers_parsed.emit(self._headers)
+            if not (upgrading_preview and self._headers == previous_headers):
+                self.headers_parsed.emit(self._headers)
             
             return True
             
-        except (FileReadError, DataValidationError) as e:
+        except DataValidationError as e:
             self.error_occurred.emit(str(e))
             return False
         except Exception as e:
@@ -105,33 +387,38 @@ class DataService(QObject):
             self.error_occurred.emit(error_msg)
             return False
     
-    def _validate_data(self) -> bool:
+    def _validate_data(self, data: Optional[pd.DataFrame] = None) -> bool:
         """
         验证加载的数据
         
+        Args:
+            data: 待验证的数据，None表示验证当前数据
+        
         Returns:
             bool: 验证是否通过
             
         Raises:
             DataValidationError: 数据验证失败时抛出
         """
-        if self._current_data is None:
+        if data is None:
+            data = self._current_data
+        if data is None:
             raise DataValidationError("没有数据需要验证")
         
         # 检查数据是否为空
-        if self._current_data.empty:
+        if data.empty:
             raise DataValidationError("文件中没有数据")
         
         # 检查是否有列
-        if len(self._current_data.columns) == 0:
+        if len(data.columns) == 0:
             raise DataValidationError("文件中没有列")
         
         # 检查数据行数
-        if len(self._current_data) == 0:
+        if len(data) == 0:
             raise DataValidationError("文件中没有数据行")
         
         # 检查列名是否有重复
-        duplicate_columns = self._current_data.columns[self._current_data.columns.duplicated()]
+        duplicate_columns = data.columns[data.columns.duplicated()]
         if len(duplicate_columns) > 0:
             raise DataValidationError(f"发现重复的列名: {list(duplicate_columns)}")
         
@@ -139,12 +426,13 @@ class DataService(QObject):
     
     def _parse_headers(self) -> None:
         """解析表头信息"""
-        if self._current_data is None:
+        data = self._available_data()
+        if data is None:
             self._headers = []
             return
         
         # 获取列名并转换为字符串
-        self._headers = [str(col) for col in self._current_data.columns]
+        self._headers = [str(col) for col in data.columns]
         
         # 处理空列名
         for i, header in enumerate(self._headers):
@@ -160,33 +448,158 @@ class DataService(QObject):
         """
         return self._headers.copy()
     
-    def get_data_preview(self, rows: int = 5) -> Optional[pd.DataFrame]:
+    def get_data_preview(self, rows: Optional[int] = 5) -> Optional[pd.DataFrame]:
         """
         获取数据预览
         
         Args:
-            rows: 预览行数，默认5行
+            rows: 预览行数，默认5行；None表示所有已读取的数据
             
         Returns:
             Optional[pd.DataFrame]: 预览数据，如果没有数据则返回None
         """
-        if self._current_data is None:
+        data = self._available_data()
+        if data is None:
             return None
         
-        return self._current_data.head(rows)
+        if rows is None:
+            with copy_on_write():
+                return data.copy(deep=False)
+        return data.head(rows)
     
-    def get_full_data(self) -> Optional[pd.DataFrame]:
+    def get_full_data(self, copy: bool = True) -> Optional[pd.DataFrame]:
         """
         获取完整数据
         
+        Args:
+            copy: 是否返回深拷贝。为False时直接返回内部数据，调用方不得修改
+        
         Returns:
             Optional[pd.DataFrame]: 完整数据，如果没有数据则返回None
         """
         if self._current_data is None:
             return None
         
+        if not copy:
+            return self._current_data
         return self._current_data.copy()
     
+    def read_columns(self, columns: List[str]) -> pd.DataFrame:
+        """
+        读取指定的列，完整数据未加载时只从源文件解析这些列
+        
+        Args:
+            columns: 需要的列，为空时返回只保留行索引的数据
+            
+        Returns:
+            pd.DataFrame: 按columns顺序排列的数据
+            
+        Raises:
+            FileReadError: 没有已加载的文件或读取失败时抛出
+        """
+        if self._current_data is not None:
+            with copy_on_write():
+                return self._current_data[columns]
+        
+        if self._current_file_path is None:
+            raise FileReadError("没有已加载的文件")
+        
+        return read_columns(
+            self._current_file_path, columns, self._current_encoding, **self._read_options()
+        )
+    
+    def iter_chunks(self, columns: Optional[List[str]] = None,
+                    chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        从源文件分块读取数据，用于大文件的流式处理
+        
+        Args:
+            columns: 需要读取的列，None表示全部列
+            chunksize: 每块的行数
+            
+        Yields:
+            pd.DataFrame: 数据块
+            
+        Raises:
+            FileReadError: 没有已加载的文件或读取失败时抛出
+        """
+        if self._current_file_path is None:
+            raise FileReadError("没有已加载的文件")
+        
+        if len(self._selected_sheets) > 1:
+            # 合并的多个工作表无法从源文件流式读取，从合并后的数据中分块；
+            # 可能在后台导出线程中执行，不修改已加载的数据
+            if columns:
+                data = self.read_columns(columns)
+            elif self._current_data is not None:
+                data = self._current_data
+            else:
+                data, _ = read_file(self._current_file_path, **self._read_options())
+            for start in range(0, len(data), chunksize):
+                yield data.iloc[start:start + chunksize]
+            return
+        
+        yield from iter_file_chunks(
+            self._current_file_path,
+            columns=columns,
+            chunksize=chunksize,
+            encoding=self._current_encoding,
+            sheet_name=self._sheet_selection()
+        )
+    
+    def read_sheets(self, sheet_names: Optional[List[str]] = None,
+                    is_cancelled: Optional[CancelCheck] = None) -> Dict[str, pd.DataFrame]:
+        """
+        分别读取多个工作表，较大的工作簿在多个工作进程中并行解析
+        
+        Args:
+            sheet_names: 工作表名称，None表示所有工作表
+            is_cancelled: 取消检查函数，返回True时中止读取
+            
+        Returns:
+            Dict[str, pd.DataFrame]: 工作表名称到数据的映射
+            
+        Raises:
+            FileReadError: 没有已加载的Excel文件或读取失败时抛出
+            LoadCancelledError: 读取被取消时抛出
+        """
+        if self._current_file_path is None or not self._sheet_names:
+            raise FileReadError("没有已加载的Excel文件")
+        
+        return read_sheets(
+            self._current_file_path,
+            self._sheet_names if sheet_names is None else sheet_names,
+            self.excel_engine,
+            is_cancelled=is_cancelled
+        )
+    
+    def get_sheet_names(self) -> List[str]:
+        """
+        获取当前工作簿中的工作表
+        
+        Returns:
+            List[str]: 工作表名称，CSV文件为空列表
+        """
+        return self._sheet_names.copy()
+    
+    def get_selected_sheets(self) -> List[str]:
+        """
+        获取当前选择的工作表
+        
+        Returns:
+            List[str]: 工作表名称，多个时表示合并后的数据集
+        """
+        return self._selected_sheets.copy()
+    
+    def get_file_path(self) -> Optional[str]:
+        """
+        获取当前文件路径
+        
+        Returns:
+            Optional[str]: 当前文件路径，没有文件时返回None
+        """
+        return self._current_file_path
+    
     def get_data_info(self) -> Dict[str, Any]:
         """
         获取数据基本信息
@@ -194,26 +607,51 @@ class DataService(QObject):
         Returns:
             Dict[str, Any]: 数据信息字典
         """
-        if self._current_data is None:
+        data = self._available_data()
+        if data is None:
             return {
                 'rows': 0,
                 'columns': 0,
                 'file_path': None,
-                'headers': []
+                'headers': [],
+                'fully_loaded': False,
+                'encoding': None,
+                'sheets': [],
+                'selected_sheets': [],
+                'memory_before': None,
+                'memory_after': None,
+                'dtypes_optimized': False
             }
         
+        # 只读取了表头时，行数为估计值（未知时为None），内存占用为None
+        memory_before, memory_after = self._memory_usage or (None, None)
         return {
-            'rows': len(self._current_data),
-            'columns': len(self._current_data.columns),
+            'rows': self._row_count,
+            'columns': len(data.columns),
             'file_path': self._current_file_path,
-            'headers': self._headers.copy()
+            'headers': self._headers.copy(),
+            'fully_loaded': self.is_fully_loaded(),
+            'encoding': self._current_encoding,
+            'sheets': self._sheet_names.copy(),
+            'selected_sheets': self._selected_sheets.copy(),
+            'memory_before': memory_before,
+            'memory_after': memory_after,
+            'dtypes_optimized': self.optimize_dtypes and self._memory_usage is not None
         }
     
     def clear_data(self) -> None:
         """清除当前数据"""
+        self.cancel_load()
+        self._load_worker = None
         self._current_data = None
+        self._memory_usage = None
+        self._preview_data = None
+        self._row_count = None
         self._current_file_path = None
+        self._current_encoding = None
         self._headers = []
+        self._sheet_names = []
+        self._selected_sheets = []
     
     def has_data(self) -> bool:
         """
@@ -222,4 +660,24 @@ class DataService(QObject):
         Returns:
             bool: 是否有数据
         """
-        return self._current_data is not None and not self._current_data.empty
\ No newline at end of file
+        data = self._available_data()
+        return data is not None and not data.empty
+    
+    def _read_options(self) -> Dict[str, Any]:
+        """获取传给文件读取函数的解析选项"""
+        return {
+            'csv_engine': self.csv_engine,
+            'excel_engine': self.excel_engine,
+            'cache': self.data_cache,
+            'sheet_name': self._sheet_selection()
+        }
+    
+    def _sheet_selection(self) -> SheetSelection:
+        """当前的工作表选择，传给文件读取函数"""
+        return list(self._selected_sheets) or None
+    
+    def _available_data(self) -> Optional[pd.DataFrame]:
+        """获取已读取的数据：完整数据优先，否则为表头预览数据"""
+        if self._current_data is not None:
+            return self._current_data
+        return self._preview_data
\ No newline at end of file
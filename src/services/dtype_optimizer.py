@@ -0,0 +1,176 @@
+"""
+加载后的列类型优化
+
+读取文件时整数和浮点数默认为64位，文本为逐个存储的字符串。
+优化后整数使用能容纳所有值的最小类型，只包含较小整数值的浮点数列使用float32，
+重复较多的文本转换为分类类型（每行只存储类别编号），其余文本使用Arrow字符串。
+numpy存储和pyarrow存储（ArrowDtype）的列都会优化，并保持原有的存储方式。
+所有转换都不改变值，导出的内容与优化前相同。
+"""
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from .file_reader import is_module_available
+
+
+# 非空值中不同值的比例不超过该值的文本列转换为分类类型
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# 整数缩小时依次尝试的类型
+_UNSIGNED_TYPES = tuple(np.dtype(name) for name in ('uint8', 'uint16', 'uint32'))
+_SIGNED_TYPES = tuple(np.dtype(name) for name in ('int8', 'int16', 'int32'))
+
+# float32能精确表示的最大整数
+_FLOAT32_MAX_INTEGER = 2 ** 24
+
+
+def memory_usage(data: pd.DataFrame) -> int:
+    """
+    计算数据占用的内存，包括文本内容和索引
+
+    Args:
+        data: 数据
+
+    Returns:
+        int: 字节数
+    """
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+def optimize_dtypes(data: pd.DataFrame,
+                    category_max_ratio: float = CATEGORY_MAX_UNIQUE_RATIO) -> pd.DataFrame:
+    """
+    将各列转换为占用内存更少的类型
+
+    Args:
+        data: 原始数据，不会被修改
+        category_max_ratio: 不同值的比例不超过该值的文本列转换为分类类型
+
+    Returns:
+        pd.DataFrame: 优化后的数据，没有可优化的列时返回原数据
+    """
+    string_dtype = _arrow_string_dtype()
+    result = None
+    for position in range(len(data.columns)):
+        column = data.iloc[:, position]
+        optimized = _optimize_column(column, category_max_ratio, string_dtype)
+        if optimized is column:
+            continue
+        if result is None:
+            result = data.copy(deep=False)
+        result.isetitem(position, optimized)
+    return data if result is None else result
+
+
+def _optimize_column(column: pd.Series, category_max_ratio: float, string_dtype) -> pd.Series:
+    """优化单列的类型，不能优化时返回原列"""
+    numeric_dtype = numeric_storage(column.dtype)
+    if numeric_dtype is not None and numeric_dtype.kind in 'iu':
+        return _downcast_integer(column, numeric_dtype)
+    if numeric_dtype is not None:
+        return _downcast_float(column, numeric_dtype)
+    if _is_text(column.dtype):
+        return _optimize_text(column, category_max_ratio, string_dtype)
+    return column
+
+
+def numeric_storage(dtype: Any) -> Optional[np.dtype]:
+    """
+    获取数值列存储值使用的numpy类型
+
+    Args:
+        dtype: 列类型，包括numpy类型和pyarrow存储的ArrowDtype
+
+    Returns:
+        Optional[np.dtype]: 整数或浮点数的numpy类型，其他类型为None
+    """
+    if isinstance(dtype, pd.ArrowDtype):
+        dtype = dtype.numpy_dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iuf':
+        return dtype
+    return None
+
+
+def as_storage(column: pd.Series, numpy_dtype: np.dtype) -> pd.Series:
+    """
+    转换列的数值类型，保持列原有的存储方式（numpy或pyarrow）
+
+    Args:
+        column: 数值列
+        numpy_dtype: 目标类型
+
+    Returns:
+        pd.Series: 转换后的列
+    """
+    if isinstance(column.dtype, pd.ArrowDtype):
+        return column.astype(f"{numpy_dtype.name}[pyarrow]")
+    return column.astype(numpy_dtype)
+
+
+def _downcast_integer(column: pd.Series, dtype: np.dtype) -> pd.Series:
+    """整数列转换为能容纳最小值和最大值的最小类型"""
+    minimum, maximum = column.min(), column.max()
+    if pd.isna(minimum):
+        return column
+
+    candidates = _UNSIGNED_TYPES if minimum >= 0 else _SIGNED_TYPES
+    for candidate in candidates:
+        if candidate.itemsize >= dtype.itemsize:
+            break
+        info = np.iinfo(candidate)
+        if info.min <= minimum and maximum <= info.max:
+            return as_storage(column, candidate)
+    return column
+
+
+def _downcast_float(column: pd.Series, dtype: np.dtype) -> pd.Series:
+    """
+    只包含整数值的浮点数列（例如含缺失值的整数列）转换为float32
+
+    带小数的值即使能精确表示为float32，其最短十进制表示也可能与float64不同，
+    导出为文本时会改变内容，因此保持不变。
+    """
+    if dtype.itemsize <= 4:
+        return column
+    values = column.dropna().to_numpy(dtype=np.float64)
+    if values.size == 0:
+        return column
+    if not (np.abs(values) <= _FLOAT32_MAX_INTEGER).all() or not (np.floor(values) == values).all():
+        return column
+    return as_storage(column, np.dtype(np.float32))
+
+
+def _is_text(dtype: Any) -> bool:
+    """是否为文本列：object、pandas字符串类型或pyarrow字符串"""
+    if isinstance(dtype, pd.ArrowDtype):
+        return dtype.kind == 'U'
+    return isinstance(dtype, pd.StringDtype) or dtype == object
+
+
+def _optimize_text(column: pd.Series, category_max_ratio: float, string_dtype) -> pd.Series:
+    """重复较多的文本列转换为分类类型，object存储的其余文本转换为Arrow字符串"""
+    values = column.dropna()
+    if values.empty:
+        return column
+    # 混合了数字等其他类型的列保持不变，避免导出时数字变为文本
+    if column.dtype == object and pd.api.types.infer_dtype(values, skipna=False) != 'string':
+        return column
+
+    if values.nunique() <= category_max_ratio * len(values):
+        return column.astype('category')
+    if column.dtype == object and string_dtype is not None:
+        return column.astype(string_dtype)
+    return column
+
+
+def _arrow_string_dtype():
+    """pyarrow存储的字符串类型，缺失值与object列一样为NaN；未安装pyarrow时为None"""
+    if not is_module_available('pyarrow'):
+        return None
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        # pandas 2.3之前的版本不支持na_value参数
+        return pd.StringDtype('pyarrow')
@@ -0,0 +1,322 @@
+"""
+导出服务，负责将处理结果写入CSV/Excel/Parquet/Feather文件
+"""
+import contextlib
+import os
+import re
+import uuid
+import pandas as pd
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .columnar import COLUMNAR_FORMATS, DEFAULT_ROW_GROUP_SIZE, ColumnarWriter, is_columnar_format
+from .file_reader import CancelCheck
+from .xlsx_writer import EXCEL_MAX_ROWS, XlsxStreamWriter, resolve_xlsx_writer
+
+
+# 支持写出的文件格式
+OUTPUT_FORMATS = {'.csv', '.xlsx'} | COLUMNAR_FORMATS
+
+
+# 整体数据分块写入时每块的行数，也是报告进度和检查取消的间隔
+EXPORT_CHUNK_SIZE = 10000
+
+# xlsx输出的单元格数不超过该值时在内存中构建工作簿（文件更小），更大的输出逐行写出
+IN_MEMORY_XLSX_MAX_CELLS = 100000
+
+# 导出进度回调，参数为已写入的行数
+ExportProgressCallback = Callable[[int], None]
+
+
+class ExportError(Exception):
+    """文件导出错误"""
+    pass
+
+
+class ExportCancelledError(ExportError):
+    """导出被取消"""
+    pass
+
+
+@contextlib.contextmanager
+def atomic_output(output_file_path: str) -> Iterator[str]:
+    """
+    先写入同目录下的临时文件，成功后再替换为目标文件
+
+    出错或被取消时删除临时文件，目标文件保持原样，不会留下写了一半的文件。
+    临时文件保留原扩展名，pandas和openpyxl据此选择输出格式。
+
+    Args:
+        output_file_path: 目标文件路径
+
+    Yields:
+        str: 实际写入的临时文件路径
+    """
+    output = Path(output_file_path)
+    # 由写入方创建临时文件，使文件权限与直接写入时一致
+    temp_path = str(output.with_name(f".{output.stem}.{uuid.uuid4().hex[:8]}.tmp{output.suffix}"))
+    try:
+        yield temp_path
+        os.replace(temp_path, output)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ExportService:
+    """导出服务类，支持整体写入和分块流式写入"""
+
+    def __init__(self, xlsx_writer: str = 'auto', compression: Optional[str] = None):
+        """
+        Args:
+            xlsx_writer: 流式写入xlsx使用的引擎，见xlsx_writer.XLSX_WRITERS
+            compression: Parquet/Feather/Arrow文件的压缩算法，None表示各格式的默认算法，
+                见columnar.PARQUET_COMPRESSIONS和columnar.IPC_COMPRESSIONS
+
+        Raises:
+            ValueError: 引擎名称不受支持时抛出
+        """
+        resolve_xlsx_writer(xlsx_writer)
+        self.xlsx_writer = xlsx_writer
+        self.compression = compression
+
+    def write_data(self, data: pd.DataFrame, output_file_path: str,
+                   progress_callback: Optional[ExportProgressCallback] = None,
+                   is_cancelled: Optional[CancelCheck] = None) -> int:
+        """
+        将完整数据写入文件
+
+        xlsx文件按EXPORT_CHUNK_SIZE行分块写入，超过IN_MEMORY_XLSX_MAX_CELLS个单元格时
+        逐行写出，不在内存中构建整个工作簿；超过Excel行数上限时拆分为多个工作表。
+        Parquet文件按DEFAULT_ROW_GROUP_SIZE行写为一个行组，Feather/Arrow文件按同样的行数
+        写为一个记录批次。CSV文件在指定了进度回调或取消检查时分块写入。
+
+        Args:
+            data: 待写入的数据
+            output_file_path: 输出文件路径
+            progress_callback: 进度回调，参数为已写入的行数
+            is_cancelled: 取消检查函数，返回True时中止写入
+
+        Returns:
+            int: 写入的行数
+
+        Raises:
+            ExportCancelledError: 写入被取消时抛出，目标文件不会被修改
+        """
+        if self._is_columnar(output_file_path):
+            chunks = self._slices(data, DEFAULT_ROW_GROUP_SIZE)
+            return self.write_chunks(chunks, output_file_path, progress_callback, is_cancelled)
+
+        if self._is_xlsx(output_file_path):
+            with atomic_output(output_file_path) as temp_path:
+                return self._write_excel_chunks(
+                    self._slices(data), temp_path, progress_callback, is_cancelled,
+                    constant_memory=data.size > IN_MEMORY_XLSX_MAX_CELLS
+                )
+
+        if progress_callback is not None or is_cancelled is not None:
+            return self.write_chunks(self._slices(data), output_file_path,
+                                     progress_callback, is_cancelled)
+
+        with atomic_output(output_file_path) as temp_path:
+            data.to_csv(temp_path, index=False, encoding='utf-8-sig')
+        return len(data)
+
+    def write_sheets(self, sheets: Dict[str, pd.DataFrame], output_file_path: str,
+                     progress_callback: Optional[ExportProgressCallback] = None,
+                     is_cancelled: Optional[CancelCheck] = None) -> List[str]:
+        """
+        按工作表分别写入数据
+
+        Excel文件中每个工作表写为一个同名的工作表，超过行数上限的工作表续写到
+        "工作表名_2"等工作表；其他格式每个工作表写为一个文件，文件名为"输出文件名_工作表名.扩展名"。
+
+        Args:
+            sheets: 工作表名称到数据的映射
+            output_file_path: 输出文件路径
+            progress_callback: 进度回调，参数为已写入的总行数
+            is_cancelled: 取消检查函数，返回True时中止写入
+
+        Returns:
+            List[str]: 写入的文件路径
+
+        Raises:
+            ExportCancelledError: 写入被取消时抛出，已有的输出文件不会被修改
+        """
+        written_rows = 0
+        if not self._is_xlsx(output_file_path):
+            output = Path(output_file_path)
+            paths = [
+                str(output.with_name(f"{output.stem}_{self._safe_file_name(name)}{output.suffix}"))
+                for name in sheets
+            ]
+            # 所有工作表都写入临时文件后再统一替换，取消时不会只更新部分文件
+            with contextlib.ExitStack() as stack:
+                for path, data in zip(paths, sheets.values()):
+                    self._check_cancelled(is_cancelled)
+                    temp_path = stack.enter_context(atomic_output(path))
+                    if self._is_columnar(path):
+                        self._write_columnar_chunks(self._slices(data, DEFAULT_ROW_GROUP_SIZE),
+                                                    temp_path, None, is_cancelled)
+                    else:
+                        data.to_csv(temp_path, index=False, encoding='utf-8-sig')
+                    written_rows += len(data)
+                    self._report_progress(progress_callback, written_rows)
+                self._check_cancelled(is_cancelled)
+            return paths
+
+        constant_memory = sum(data.size for data in sheets.values()) > IN_MEMORY_XLSX_MAX_CELLS
+        with atomic_output(output_file_path) as temp_path:
+            with XlsxStreamWriter(temp_path, self.xlsx_writer,
+                                  constant_memory=constant_memory) as writer:
+                for sheet_name, data in sheets.items():
+                    writer.start_sheet(sheet_name)
+                    for chunk in self._slices(data):
+                        self._check_cancelled(is_cancelled)
+                        written_rows += writer.write_frame(chunk)
+                        self._report_progress(progress_callback, written_rows)
+                self._check_cancelled(is_cancelled)
+        return [output_file_path]
+
+    def write_chunks(self, chunks: Iterable[pd.DataFrame], output_file_path: str,
+                     progress_callback: Optional[ExportProgressCallback] = None,
+                     is_cancelled: Optional[CancelCheck] = None) -> int:
+        """
+        逐块追加写入文件，内存中同一时间只保留一块数据
+
+        Args:
+            chunks: 数据块迭代器，所有块的列必须一致
+            output_file_path: 输出文件路径
+            progress_callback: 进度回调，每写完一块报告已写入的总行数
+            is_cancelled: 取消检查函数，在数据块之间检查
+
+        Returns:
+            int: 写入的总行数
+
+        Raises:
+            ExportError: 数据块的列不一致时抛出
+            ExportCancelledError: 写入被取消时抛出，目标文件不会被修改
+        """
+        with atomic_output(output_file_path) as temp_path:
+            if self._is_csv(output_file_path):
+                return self._write_csv_chunks(chunks, temp_path, progress_callback, is_cancelled)
+            if self._is_columnar(output_file_path):
+                return self._write_columnar_chunks(chunks, temp_path, progress_callback, is_cancelled)
+            return self._write_excel_chunks(chunks, temp_path, progress_callback, is_cancelled)
+
+    def _write_csv_chunks(self, chunks: Iterable[pd.DataFrame], output_file_path: str,
+                          progress_callback: Optional[ExportProgressCallback],
+                          is_cancelled: Optional[CancelCheck]) -> int:
+        """分块写入CSV文件"""
+        total_rows = 0
+        columns = None
+        with open(output_file_path, 'w', encoding='utf-8-sig', newline='') as f:
+            for chunk in chunks:
+                self._check_cancelled(is_cancelled)
+                columns = self._check_columns(chunk, columns)
+                chunk.to_csv(f, index=False, header=(total_rows == 0))
+                total_rows += len(chunk)
+                self._report_progress(progress_callback, total_rows)
+        return total_rows
+
+    def _write_excel_chunks(self, chunks: Iterable[pd.DataFrame], output_file_path: str,
+                            progress_callback: Optional[ExportProgressCallback],
+                            is_cancelled: Optional[CancelCheck],
+                            constant_memory: bool = True) -> int:
+        """分块写入Excel文件，超过行数上限时续写到新的工作表"""
+        total_rows = 0
+        columns = None
+        with XlsxStreamWriter(output_file_path, self.xlsx_writer,
+                              constant_memory=constant_memory) as writer:
+            for chunk in chunks:
+                self._check_cancelled(is_cancelled)
+                columns = self._check_columns(chunk, columns)
+                total_rows += writer.write_frame(chunk)
+                self._report_progress(progress_callback, total_rows)
+
+            # 保存前最后检查一次，保存工作簿本身无法中断
+            self._check_cancelled(is_cancelled)
+        return total_rows
+
+    def _write_columnar_chunks(self, chunks: Iterable[pd.DataFrame], output_file_path: str,
+                               progress_callback: Optional[ExportProgressCallback],
+                               is_cancelled: Optional[CancelCheck]) -> int:
+        """分块写入Parquet/Feather/Arrow文件，每块写为一个行组或记录批次"""
+        total_rows = 0
+        columns = None
+        with ColumnarWriter(output_file_path, self.compression) as writer:
+            for chunk in chunks:
+                self._check_cancelled(is_cancelled)
+                columns = self._check_columns(chunk, columns)
+                total_rows += writer.write_frame(chunk)
+                self._report_progress(progress_callback, total_rows)
+            self._check_cancelled(is_cancelled)
+        return total_rows
+
+    @staticmethod
+    def row_limit_warning(output_file_path: str, rows: int, name: str = '输出数据') -> Optional[str]:
+        """
+        数据行数超过Excel单个工作表的上限时返回拆分工作表的提示
+
+        Args:
+            output_file_path: 输出文件路径
+            rows: 数据行数（不含表头）
+            name: 提示中使用的数据名称
+
+        Returns:
+            Optional[str]: 提示信息，不是xlsx文件或未超过上限时为None
+        """
+        rows_per_sheet = EXCEL_MAX_ROWS - 1
+        if not ExportService._is_xlsx(output_file_path) or rows <= rows_per_sheet:
+            return None
+        sheet_count = -(-rows // rows_per_sheet)
+        return (f"{name}共 {rows} 行，超过Excel单个工作表的上限 {rows_per_sheet} 行，"
+                f"已拆分为 {sheet_count} 个工作表")
+
+    @staticmethod
+    def _check_columns(chunk: pd.DataFrame, columns):
+        """检查数据块的列是否与第一块一致"""
+        if columns is not None and list(chunk.columns) != columns:
+            raise ExportError("数据块的列不一致，无法追加写入")
+        return list(chunk.columns)
+
+    @staticmethod
+    def _slices(data: pd.DataFrame, size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """按size行（默认为EXPORT_CHUNK_SIZE）切分数据，空数据也返回一块以写出表头"""
+        size = size or EXPORT_CHUNK_SIZE
+        for start in range(0, max(len(data), 1), size):
+            yield data.iloc[start:start + size]
+
+    @staticmethod
+    def _check_cancelled(is_cancelled: Optional[CancelCheck]) -> None:
+        """已请求取消时抛出ExportCancelledError"""
+        if is_cancelled is not None and is_cancelled():
+            raise ExportCancelledError("导出已取消")
+
+    @staticmethod
+    def _report_progress(progress_callback: Optional[ExportProgressCallback], rows: int) -> None:
+        """报告已写入的行数"""
+        if progress_callback is not None:
+            progress_callback(rows)
+
+    @staticmethod
+    def _safe_file_name(name: str) -> str:
+        """替换文件名中不允许的字符"""
+        return re.sub(r'[\\/:*?"<>|]', '_', str(name))
+
+    @staticmethod
+    def _is_csv(output_file_path: str) -> bool:
+        """判断输出文件是否为CSV格式"""
+        return Path(output_file_path).suffix.lower() == '.csv'
+
+    @staticmethod
+    def _is_columnar(output_file_path: str) -> bool:
+        """判断输出文件是否为Parquet/Feather/Arrow格式"""
+        return is_columnar_format(output_file_path)
+
+    @staticmethod
+    def _is_xlsx(output_file_path: str) -> bool:
+        """判断输出文件是否为Excel格式，CSV和列式格式之外的扩展名都按xlsx写出"""
+        return not (ExportService._is_csv(output_file_path)
+                    or ExportService._is_columnar(output_file_path))
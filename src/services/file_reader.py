@@ -0,0 +1,870 @@
+"""
+文件读取工具，提供与Qt无关的Excel/CSV/Parquet/Feather读取函数
+"""
+import codecs
+import importlib.util
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import columnar
+from .columnar import COLUMNAR_FORMATS
+
+if TYPE_CHECKING:
+    from .data_cache import DataCache
+
+
+# 支持的文件格式
+EXCEL_FORMATS = {'.xlsx', '.xls'}
+SUPPORTED_FORMATS = EXCEL_FORMATS | {'.csv'} | COLUMNAR_FORMATS
+
+# CSV文件尝试的编码格式
+CSV_ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'latin1']
+
+# CSV解析引擎：auto在安装了pyarrow时使用多线程的pyarrow引擎，否则使用C引擎
+CSV_ENGINES = ('auto', 'c', 'pyarrow')
+
+# Excel解析引擎：auto对较大的文件在安装了python-calamine时使用calamine，否则使用openpyxl
+EXCEL_ENGINES = ('auto', 'openpyxl', 'calamine')
+
+# auto模式下使用calamine的最小文件大小
+CALAMINE_MIN_FILE_SIZE = 1024 * 1024
+
+# 编码检测读取的字节数
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# 字节顺序标记及对应的编码
+_BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 分块读取时每块的默认行数
+DEFAULT_CHUNK_SIZE = 50000
+
+# 预览读取的默认行数
+DEFAULT_PREVIEW_ROWS = 100
+
+# 需要报告进度时CSV每块读取的行数
+PROGRESS_CHUNK_SIZE = 20000
+
+# 合并多个工作表时记录来源工作表的列名
+SHEET_COLUMN = '工作表'
+
+# 并行解析多个工作表的最小文件大小，较小的工作簿启动进程的开销大于收益
+PARALLEL_SHEETS_MIN_FILE_SIZE = 5 * 1024 * 1024
+
+# 并行解析时检查取消请求的间隔（秒）
+_CANCEL_POLL_INTERVAL = 0.2
+
+ProgressCallback = Callable[[int], None]
+CancelCheck = Callable[[], bool]
+
+# 工作表选择：None表示第一个工作表，字符串表示单个工作表，列表表示合并多个工作表
+SheetSelection = Union[str, List[str], None]
+
+
+class FileReadError(Exception):
+    """文件读取错误"""
+    pass
+
+
+class LoadCancelledError(Exception):
+    """文件加载被取消"""
+    pass
+
+
+def validate_file_path(file_path: str) -> str:
+    """
+    验证文件路径和格式
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        str: 小写的文件扩展名
+
+    Raises:
+        FileReadError: 文件不存在或格式不受支持时抛出
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileReadError(f"文件不存在: {file_path}")
+
+    if not path.is_file():
+        raise FileReadError(f"路径不是文件: {file_path}")
+
+    file_extension = path.suffix.lower()
+    if file_extension not in SUPPORTED_FORMATS:
+        raise FileReadError(
+            f"不支持的文件格式: {file_extension}。"
+            f"支持的格式: {', '.join(SUPPORTED_FORMATS)}"
+        )
+
+    return file_extension
+
+
+def detect_encoding(file_path: str, sample_size: int = ENCODING_SAMPLE_SIZE) -> str:
+    """
+    根据字节顺序标记和文件开头的字节样本检测CSV文件编码
+
+    Args:
+        file_path: 文件路径
+        sample_size: 读取的样本字节数
+
+    Returns:
+        str: 检测到的编码
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+        at_end = not f.read(1)
+
+    for bom, encoding in _BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+
+    for encoding in CSV_ENCODINGS:
+        # 样本可能在多字节字符中间截断，未到文件末尾时不要求完整解码
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=at_end)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+    return CSV_ENCODINGS[-1]
+
+
+def _candidate_encodings(file_path: str, encoding: Optional[str] = None) -> List[str]:
+    """检测到的编码优先，其余常用编码作为样本不具代表性时的后备"""
+    first = encoding or detect_encoding(file_path)
+    return [first] + [e for e in CSV_ENCODINGS if e != first]
+
+
+def _decodes_as(file_path: str, encoding: str, block_size: int = 1024 * 1024) -> bool:
+    """逐块解码整个文件，检查文件是否完全符合指定编码"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                decoder.decode(block, final=not block)
+                if not block:
+                    return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _stream_encoding(file_path: str, encoding: Optional[str] = None) -> str:
+    """
+    确定分块读取CSV文件使用的编码
+
+    分块读取在已输出部分数据后无法更换编码，而检测编码只使用文件开头的样本，
+    因此开始读取前先用整个文件验证编码。
+
+    Raises:
+        FileReadError: 所有候选编码都无法解码时抛出
+    """
+    encodings = _candidate_encodings(file_path, encoding)
+    for candidate in encodings:
+        if _decodes_as(file_path, candidate):
+            return candidate
+    raise _decode_error(encodings)
+
+
+def _decode_error(encodings: List[str]) -> FileReadError:
+    """创建CSV解码失败的错误"""
+    return FileReadError(f"无法解码CSV文件，尝试的编码: {', '.join(encodings)}")
+
+
+@lru_cache(maxsize=None)
+def is_module_available(module_name: str) -> bool:
+    """
+    检查可选依赖是否已安装，不实际导入
+
+    Args:
+        module_name: 模块名称
+
+    Returns:
+        bool: 是否已安装
+    """
+    return importlib.util.find_spec(module_name) is not None
+
+
+def resolve_csv_engine(engine: str = 'auto') -> str:
+    """
+    确定实际使用的CSV解析引擎
+
+    Args:
+        engine: 请求的引擎，auto、c或pyarrow
+
+    Returns:
+        str: 实际使用的引擎，pyarrow未安装时退回c
+
+    Raises:
+        ValueError: 引擎名称不受支持时抛出
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"不支持的CSV引擎: {engine}。支持的引擎: {', '.join(CSV_ENGINES)}")
+    if engine != 'c' and is_module_available('pyarrow'):
+        return 'pyarrow'
+    return 'c'
+
+
+def resolve_excel_engine(file_path: str, engine: str = 'auto') -> Optional[str]:
+    """
+    确定读取Excel文件实际使用的引擎
+
+    Args:
+        file_path: 文件路径，auto模式根据文件大小选择
+        engine: 请求的引擎，auto、openpyxl或calamine
+
+    Returns:
+        Optional[str]: 传给pandas的引擎名称，None表示由pandas按格式选择
+
+    Raises:
+        ValueError: 引擎名称不受支持时抛出
+    """
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"不支持的Excel引擎: {engine}。支持的引擎: {', '.join(EXCEL_ENGINES)}")
+
+    # pandas 2.2起支持calamine引擎
+    pandas_version = tuple(int(part) for part in pd.__version__.split('.')[:2])
+    calamine_available = pandas_version >= (2, 2) and is_module_available('python_calamine')
+    if engine == 'calamine':
+        return 'calamine' if calamine_available else None
+    if engine == 'openpyxl':
+        # openpyxl无法读取xls格式
+        return 'openpyxl' if Path(file_path).suffix.lower() == '.xlsx' else None
+
+    if calamine_available and os.path.getsize(file_path) >= CALAMINE_MIN_FILE_SIZE:
+        return 'calamine'
+    return None
+
+
+def _read_csv(file_path: str, encoding: str, engine: str,
+              usecols: Optional[list] = None) -> pd.DataFrame:
+    """使用指定引擎整体读取CSV文件，pyarrow无法解析或列名需要改写时退回C引擎"""
+    if engine == 'pyarrow':
+        try:
+            # pyarrow引擎多线程解析，并直接生成Arrow类型的列
+            data = pd.read_csv(
+                file_path,
+                encoding=encoding,
+                usecols=usecols,
+                engine='pyarrow',
+                dtype_backend='pyarrow'
+            )
+        except UnicodeDecodeError:
+            raise
+        except Exception:
+            # 由C引擎重新解析，并给出确定的错误信息
+            pass
+        else:
+            _check_decoded(data, encoding)
+            if _has_plain_names(data.columns):
+                return data
+            # 与预览使用的C引擎保持相同的列名
+    return pd.read_csv(file_path, encoding=encoding, usecols=usecols)
+
+
+def _has_plain_names(columns: pd.Index) -> bool:
+    """
+    列名是否既无重复也无空白
+
+    C引擎将重复的列名改为a.1、空白的列名改为Unnamed: N，pyarrow引擎保持原样，
+    两者不一致时表头预览和完整数据的列名会不同。
+    """
+    return columns.is_unique and all(str(name).strip() for name in columns)
+
+
+def _check_decoded(data: pd.DataFrame, encoding: str) -> None:
+    """
+    检查pyarrow引擎是否按编码解码了所有文本
+
+    编码只根据文件开头的样本检测，样本之后出现其他编码的字节时pyarrow不会报错，
+    而是把整列读为二进制。此时抛出UnicodeDecodeError，由调用方尝试下一个编码。
+    """
+    import pyarrow as pa
+
+    for name, dtype in data.dtypes.items():
+        if isinstance(dtype, pd.ArrowDtype) and (pa.types.is_binary(dtype.pyarrow_dtype)
+                                                 or pa.types.is_large_binary(dtype.pyarrow_dtype)):
+            raise UnicodeDecodeError(encoding, b'', 0, 0, f"列 {name} 无法按 {encoding} 解码")
+
+
+def read_file(file_path: str,
+              progress_callback: Optional[ProgressCallback] = None,
+              is_cancelled: Optional[CancelCheck] = None,
+              csv_engine: str = 'auto',
+              excel_engine: str = 'auto',
+              cache: Optional['DataCache'] = None,
+              sheet_name: SheetSelection = None) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    读取整个文件
+
+    Args:
+        file_path: 文件路径
+        progress_callback: 进度回调，参数为0-100的百分比
+        is_cancelled: 取消检查函数，返回True时中止读取
+        csv_engine: CSV解析引擎，见CSV_ENGINES
+        excel_engine: Excel解析引擎，见EXCEL_ENGINES
+        cache: 磁盘缓存，命中时直接读取缓存，未命中时解析后写入缓存
+        sheet_name: Excel工作表，多个工作表时合并为一个数据集，见combine_sheets
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[str]]: 数据和CSV使用的编码（其他格式为None）
+
+    Raises:
+        FileReadError: 文件读取失败时抛出
+        LoadCancelledError: 读取被取消时抛出
+    """
+    file_extension = validate_file_path(file_path)
+    sheet_name = _normalize_sheet_name(sheet_name)
+
+    # 列式文件本身读取很快，不需要缓存
+    if cache is None or not cache.is_available() or file_extension in COLUMNAR_FORMATS:
+        return _parse_file(file_path, progress_callback, is_cancelled, csv_engine, excel_engine,
+                           sheet_name)
+
+    key = cache.make_key(file_path, _cache_options(csv_engine, excel_engine, sheet_name))
+    cached = cache.get(key)
+    if cached is not None:
+        _report_progress(progress_callback, 100)
+        return cached
+
+    data, encoding = _parse_file(file_path, progress_callback, is_cancelled, csv_engine,
+                                 excel_engine, sheet_name)
+    cache.put(key, data, encoding)
+    return data, encoding
+
+
+def _cache_options(csv_engine: str, excel_engine: str,
+                   sheet_name: SheetSelection) -> Dict[str, Any]:
+    """影响解析结果、需要计入缓存键的读取选项"""
+    options: Dict[str, Any] = {'csv_engine': csv_engine, 'excel_engine': excel_engine}
+    if sheet_name is not None:
+        options['sheet_name'] = sheet_name
+    return options
+
+
+def _normalize_sheet_name(sheet_name: SheetSelection) -> SheetSelection:
+    """空列表视为第一个工作表，只有一个元素的列表视为单个工作表"""
+    if isinstance(sheet_name, (list, tuple)):
+        if not sheet_name:
+            return None
+        if len(sheet_name) == 1:
+            return sheet_name[0]
+        return list(sheet_name)
+    return sheet_name
+
+
+def _pandas_sheet_name(sheet_name: Optional[str]) -> Union[str, int]:
+    """转换为pandas的sheet_name参数，pandas中None表示读取所有工作表"""
+    return 0 if sheet_name is None else sheet_name
+
+
+def _parse_file(file_path: str,
+                progress_callback: Optional[ProgressCallback],
+                is_cancelled: Optional[CancelCheck],
+                csv_engine: str,
+                excel_engine: str,
+                sheet_name: SheetSelection = None) -> Tuple[pd.DataFrame, Optional[str]]:
+    """解析整个文件"""
+    file_extension = validate_file_path(file_path)
+
+    if file_extension in COLUMNAR_FORMATS:
+        return _read_columnar(file_path, None, progress_callback, is_cancelled), None
+
+    if file_extension in EXCEL_FORMATS:
+        if isinstance(sheet_name, list):
+            sheets = read_sheets(file_path, sheet_name, excel_engine,
+                                 progress_callback=progress_callback, is_cancelled=is_cancelled)
+            return combine_sheets(sheets), None
+
+        # Excel解析无法中途报告进度，只在开始和结束时报告
+        _report_progress(progress_callback, 0)
+        try:
+            data = pd.read_excel(file_path, sheet_name=_pandas_sheet_name(sheet_name),
+                                 engine=resolve_excel_engine(file_path, excel_engine))
+        except ValueError as e:
+            raise FileReadError(f"读取工作表失败: {str(e)}")
+        _check_cancelled(is_cancelled)
+        _report_progress(progress_callback, 100)
+        return data, None
+
+    # 先检测编码，通常只需解析一次
+    engine = resolve_csv_engine(csv_engine)
+    encodings = _candidate_encodings(file_path)
+    for encoding in encodings:
+        try:
+            if engine == 'pyarrow' or (progress_callback is None and is_cancelled is None):
+                # pyarrow引擎不支持分块读取，只在开始和结束时报告进度
+                _report_progress(progress_callback, 0)
+                data = _read_csv(file_path, encoding, engine)
+                _check_cancelled(is_cancelled)
+                _report_progress(progress_callback, 100)
+            else:
+                data = _read_csv_with_progress(file_path, encoding, progress_callback, is_cancelled)
+            return data, encoding
+        except UnicodeDecodeError:
+            continue
+
+    raise _decode_error(encodings)
+
+
+def _read_csv_with_progress(file_path: str,
+                            encoding: str,
+                            progress_callback: Optional[ProgressCallback],
+                            is_cancelled: Optional[CancelCheck]) -> pd.DataFrame:
+    """分块读取CSV文件，按已读取的字节数报告进度"""
+    total_size = os.path.getsize(file_path) or 1
+    chunks = []
+    _report_progress(progress_callback, 0)
+    with open(file_path, 'rb') as f:
+        with pd.read_csv(f, encoding=encoding, chunksize=PROGRESS_CHUNK_SIZE) as reader:
+            for chunk in reader:
+                _check_cancelled(is_cancelled)
+                chunks.append(chunk)
+                _report_progress(progress_callback, min(99, f.tell() * 100 // total_size))
+
+    _report_progress(progress_callback, 100)
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _read_columnar(file_path: str,
+                   columns: Optional[List[str]],
+                   progress_callback: Optional[ProgressCallback] = None,
+                   is_cancelled: Optional[CancelCheck] = None,
+                   nrows: Optional[int] = None) -> pd.DataFrame:
+    """读取Parquet/Feather/Arrow文件，需要进度或取消时按行组逐块读取"""
+    on_batch = None
+    if progress_callback is not None or is_cancelled is not None:
+        def on_batch(rows: int, total_rows: int) -> None:
+            _check_cancelled(is_cancelled)
+            _report_progress(progress_callback, min(99, rows * 100 // max(total_rows, 1)))
+
+    _report_progress(progress_callback, 0)
+    try:
+        data = columnar.read_table(file_path, columns, nrows=nrows, on_batch=on_batch)
+    except LoadCancelledError:
+        raise
+    except KeyError as e:
+        raise FileReadError(str(e.args[0]) if e.args else str(e))
+    except (ImportError, OSError, ValueError) as e:
+        raise FileReadError(f"读取文件失败: {str(e)}")
+    _report_progress(progress_callback, 100)
+    return data
+
+
+def _report_progress(progress_callback: Optional[ProgressCallback], percent: int) -> None:
+    """报告读取进度"""
+    if progress_callback is not None:
+        progress_callback(int(percent))
+
+
+def _check_cancelled(is_cancelled: Optional[CancelCheck]) -> None:
+    """检查是否已取消读取"""
+    if is_cancelled is not None and is_cancelled():
+        raise LoadCancelledError("文件加载已取消")
+
+
+def list_sheets(file_path: str, excel_engine: str = 'auto') -> List[str]:
+    """
+    列出Excel文件中的工作表，只读取工作簿目录，不解析单元格
+
+    Args:
+        file_path: 文件路径
+        excel_engine: Excel解析引擎，见EXCEL_ENGINES
+
+    Returns:
+        List[str]: 工作表名称，CSV和列式存储文件返回空列表
+
+    Raises:
+        FileReadError: 文件读取失败时抛出
+    """
+    file_extension = validate_file_path(file_path)
+    if file_extension not in EXCEL_FORMATS:
+        return []
+
+    try:
+        with pd.ExcelFile(file_path, engine=resolve_excel_engine(file_path, excel_engine)) as workbook:
+            return [str(name) for name in workbook.sheet_names]
+    except Exception as e:
+        raise FileReadError(f"读取工作表列表失败: {str(e)}")
+
+
+def _read_sheet(file_path: str, sheet_name: str, engine: Optional[str]) -> pd.DataFrame:
+    """在工作进程中解析单个工作表"""
+    return pd.read_excel(file_path, sheet_name=sheet_name, engine=engine)
+
+
+def read_sheets(file_path: str,
+                sheet_names: List[str],
+                excel_engine: str = 'auto',
+                max_workers: Optional[int] = None,
+                progress_callback: Optional[ProgressCallback] = None,
+                is_cancelled: Optional[CancelCheck] = None) -> Dict[str, pd.DataFrame]:
+    """
+    解析多个工作表
+
+    较大的工作簿在多个工作进程中并行解析，每个进程解析一个工作表；
+    较小的工作簿只打开一次，在当前进程中依次解析。
+
+    Args:
+        file_path: Excel文件路径
+        sheet_names: 需要解析的工作表
+        excel_engine: Excel解析引擎，见EXCEL_ENGINES
+        max_workers: 最大工作进程数，None表示CPU核心数，1表示不使用工作进程
+        progress_callback: 进度回调，按已解析的工作表数量报告
+        is_cancelled: 取消检查函数，返回True时中止读取
+
+    Returns:
+        Dict[str, pd.DataFrame]: 工作表名称到数据的映射，按sheet_names排列
+
+    Raises:
+        FileReadError: 文件不是Excel文件、工作表不存在或解析失败时抛出
+        LoadCancelledError: 读取被取消时抛出
+    """
+    if validate_file_path(file_path) not in EXCEL_FORMATS:
+        raise FileReadError("只有Excel文件包含工作表")
+
+    sheet_names = list(sheet_names)
+    engine = resolve_excel_engine(file_path, excel_engine)
+    workers = min(max_workers or os.cpu_count() or 1, len(sheet_names))
+    _report_progress(progress_callback, 0)
+
+    try:
+        if workers <= 1 or os.path.getsize(file_path) < PARALLEL_SHEETS_MIN_FILE_SIZE:
+            sheets = _read_sheets_sequential(file_path, sheet_names, engine,
+                                             progress_callback, is_cancelled)
+        else:
+            sheets = _read_sheets_parallel(file_path, sheet_names, engine, workers,
+                                           progress_callback, is_cancelled)
+    except (FileReadError, LoadCancelledError):
+        raise
+    except Exception as e:
+        raise FileReadError(f"读取工作表失败: {str(e)}")
+
+    _report_progress(progress_callback, 100)
+    return {name: sheets[name] for name in sheet_names}
+
+
+def _read_sheets_sequential(file_path: str, sheet_names: List[str], engine: Optional[str],
+                            progress_callback: Optional[ProgressCallback],
+                            is_cancelled: Optional[CancelCheck]) -> Dict[str, pd.DataFrame]:
+    """只打开一次工作簿，依次解析各工作表"""
+    sheets = {}
+    with pd.ExcelFile(file_path, engine=engine) as workbook:
+        for name in sheet_names:
+            _check_cancelled(is_cancelled)
+            sheets[name] = workbook.parse(name)
+            _report_progress(progress_callback, len(sheets) * 100 // len(sheet_names))
+    return sheets
+
+
+def _read_sheets_parallel(file_path: str, sheet_names: List[str], engine: Optional[str],
+                          workers: int, progress_callback: Optional[ProgressCallback],
+                          is_cancelled: Optional[CancelCheck]) -> Dict[str, pd.DataFrame]:
+    """在工作进程中并行解析各工作表，工作进程使用spawn方式启动"""
+    sheets = {}
+    context = multiprocessing.get_context('spawn')
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    futures = {}
+    try:
+        for name in sheet_names:
+            futures[executor.submit(_read_sheet, file_path, name, engine)] = name
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=_CANCEL_POLL_INTERVAL,
+                                 return_when=FIRST_COMPLETED)
+            _check_cancelled(is_cancelled)
+            for future in done:
+                sheets[futures[future]] = future.result()
+            if done:
+                _report_progress(progress_callback, len(sheets) * 100 // len(sheet_names))
+    finally:
+        # 取消或出错时不再等待尚未开始的工作表
+        # （shutdown的cancel_futures参数需要Python 3.9，这里逐个取消以支持3.8）
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    return sheets
+
+
+def combine_sheets(sheets: Dict[str, pd.DataFrame],
+                   sheet_column: Optional[str] = SHEET_COLUMN) -> pd.DataFrame:
+    """
+    将多个工作表合并为一个数据集，列取各工作表的并集
+
+    Args:
+        sheets: 工作表名称到数据的映射
+        sheet_column: 记录来源工作表的列名，放在第一列；None或与已有列重名时不添加
+
+    Returns:
+        pd.DataFrame: 合并后的数据
+    """
+    if not sheets:
+        return pd.DataFrame()
+
+    names = list(sheets)
+    frames = []
+    for code, (name, data) in enumerate(sheets.items()):
+        if sheet_column and sheet_column not in data.columns:
+            # 来源列使用分类类型，每行只保存一个整数编码
+            codes = np.full(len(data), code, dtype=np.int32)
+            data = data.copy(deep=False)
+            data.insert(0, sheet_column, pd.Categorical.from_codes(codes, categories=names))
+        frames.append(data)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_columns(file_path: str,
+                 columns: List[str],
+                 encoding: Optional[str] = None,
+                 csv_engine: str = 'auto',
+                 excel_engine: str = 'auto',
+                 cache: Optional['DataCache'] = None,
+                 sheet_name: SheetSelection = None) -> pd.DataFrame:
+    """
+    只读取指定的列，未选中的列不会被解析
+
+    Args:
+        file_path: 文件路径
+        columns: 需要读取的列，为空时只读取第一列以保留行数
+        encoding: CSV文件编码，None时自动检测
+        csv_engine: CSV解析引擎，见CSV_ENGINES
+        excel_engine: Excel解析引擎，见EXCEL_ENGINES
+        cache: 磁盘缓存，只用于多个工作表时读取合并后的完整数据
+        sheet_name: Excel工作表，多个工作表时从合并后的数据中选择列
+
+    Returns:
+        pd.DataFrame: 按columns顺序排列的数据
+
+    Raises:
+        FileReadError: 文件读取失败或列不存在时抛出
+    """
+    file_extension = validate_file_path(file_path)
+    sheet_name = _normalize_sheet_name(sheet_name)
+    usecols = list(columns) if columns else [0]
+
+    if file_extension in COLUMNAR_FORMATS:
+        # 列式文件只解码需要的列，没有选择列时只读取行数
+        return _read_columnar(file_path, list(columns))
+
+    # 只读取部分列时不查询缓存：计算缓存键需要读取整个文件计算哈希，
+    # 而部分列的结果又不能写入缓存，未命中时会白白多读一遍文件
+    if isinstance(sheet_name, list):
+        # 各工作表的列可能不同，读取合并后的数据再选择列，完整数据可以使用缓存
+        data, _ = read_file(file_path, excel_engine=excel_engine, cache=cache, sheet_name=sheet_name)
+        try:
+            return data[list(columns)]
+        except KeyError as e:
+            raise FileReadError(f"读取指定列失败: {str(e)}")
+
+    try:
+        if file_extension in EXCEL_FORMATS:
+            data = pd.read_excel(
+                file_path,
+                sheet_name=_pandas_sheet_name(sheet_name),
+                usecols=usecols,
+                engine=resolve_excel_engine(file_path, excel_engine)
+            )
+        else:
+            engine = resolve_csv_engine(csv_engine)
+            encodings = _candidate_encodings(file_path, encoding)
+            for candidate in encodings:
+                try:
+                    data = _read_csv(file_path, candidate, engine, usecols)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            else:
+                raise _decode_error(encodings)
+    except ValueError as e:
+        raise FileReadError(f"读取指定列失败: {str(e)}")
+
+    return data[list(columns)]
+
+
+def read_preview(file_path: str,
+                 rows: int = DEFAULT_PREVIEW_ROWS,
+                 sheet_name: SheetSelection = None) -> Tuple[pd.DataFrame, Optional[str], Optional[int]]:
+    """
+    只读取表头和前几行数据，用于快速填充字段列表和预览
+
+    Args:
+        file_path: 文件路径
+        rows: 读取的数据行数
+        sheet_name: Excel工作表，多个工作表时返回合并后的前几行
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[str], Optional[int]]:
+            预览数据、CSV使用的编码（其他格式为None）以及估计的总行数（未知时为None）
+
+    Raises:
+        FileReadError: 文件读取失败时抛出
+    """
+    file_extension = validate_file_path(file_path)
+    sheet_name = _normalize_sheet_name(sheet_name)
+
+    if file_extension in COLUMNAR_FORMATS:
+        # 列式文件的元数据记录了准确的行数
+        data = _read_columnar(file_path, None, nrows=rows)
+        try:
+            _, row_count = columnar.read_schema(file_path)
+        except (ImportError, OSError, ValueError):
+            row_count = None
+        return data, None, row_count
+
+    if file_extension in EXCEL_FORMATS:
+        row_count = _xlsx_row_count(file_path, sheet_name) if file_extension == '.xlsx' else None
+        try:
+            if isinstance(sheet_name, list):
+                with pd.ExcelFile(file_path) as workbook:
+                    sheets = {name: workbook.parse(name, nrows=rows) for name in sheet_name}
+                return combine_sheets(sheets).head(rows), None, row_count
+            return pd.read_excel(file_path, sheet_name=_pandas_sheet_name(sheet_name),
+                                 nrows=rows), None, row_count
+        except ValueError as e:
+            raise FileReadError(f"读取工作表失败: {str(e)}")
+
+    encodings = _candidate_encodings(file_path)
+    for encoding in encodings:
+        try:
+            return pd.read_csv(file_path, encoding=encoding, nrows=rows), encoding, None
+        except UnicodeDecodeError:
+            continue
+
+    raise _decode_error(encodings)
+
+
+def _xlsx_row_count(file_path: str, sheet_name: SheetSelection = None) -> Optional[int]:
+    """根据工作表的尺寸信息估计数据行数，无需读取单元格；多个工作表时返回总行数"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        if sheet_name is None:
+            worksheets = [workbook.worksheets[0]]
+        elif isinstance(sheet_name, list):
+            worksheets = [workbook[name] for name in sheet_name]
+        else:
+            worksheets = [workbook[sheet_name]]
+        max_rows = [worksheet.max_row for worksheet in worksheets]
+    except KeyError:
+        return None
+    finally:
+        workbook.close()
+
+    if any(max_row is None for max_row in max_rows):
+        return None
+    return sum(max(max_row - 1, 0) for max_row in max_rows)
+
+
+def iter_file_chunks(file_path: str,
+                     columns: Optional[List[str]] = None,
+                     chunksize: int = DEFAULT_CHUNK_SIZE,
+                     encoding: Optional[str] = None,
+                     sheet_name: SheetSelection = None) -> Iterator[pd.DataFrame]:
+    """
+    分块读取文件，每次只在内存中保留一块数据
+
+    Args:
+        file_path: 文件路径
+        columns: 需要读取的列，None表示读取全部列
+        chunksize: 每块的行数
+        encoding: CSV文件编码，None时自动检测
+        sheet_name: Excel工作表，None表示第一个工作表；多个工作表时读取合并后的数据再分块
+
+    Yields:
+        pd.DataFrame: 按columns顺序排列的数据块
+
+    Raises:
+        FileReadError: 文件读取失败时抛出
+    """
+    file_extension = validate_file_path(file_path)
+    sheet_name = _normalize_sheet_name(sheet_name)
+
+    if isinstance(sheet_name, list):
+        # 合并的多个工作表无法从源文件流式读取
+        data = read_columns(file_path, columns, sheet_name=sheet_name) if columns else \
+            read_file(file_path, sheet_name=sheet_name)[0]
+        for start in range(0, len(data), chunksize):
+            yield data.iloc[start:start + chunksize]
+    elif file_extension in COLUMNAR_FORMATS:
+        # Parquet按行组、Feather/Arrow按记录批次读取，只解码需要的列
+        try:
+            for batch in columnar.iter_batches(file_path, columns, chunksize):
+                yield columnar.table_to_frame(batch)
+        except KeyError as e:
+            raise FileReadError(str(e.args[0]) if e.args else str(e))
+        except (ImportError, OSError, ValueError) as e:
+            raise FileReadError(f"读取文件失败: {str(e)}")
+    elif file_extension == '.csv':
+        reader = pd.read_csv(
+            file_path,
+            encoding=_stream_encoding(file_path, encoding),
+            usecols=columns,
+            chunksize=chunksize
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk[columns] if columns else chunk
+    elif file_extension == '.xlsx':
+        yield from _iter_xlsx_chunks(file_path, columns, chunksize, sheet_name)
+    else:
+        # xls格式不支持流式读取，整体读取后再分块
+        data = pd.read_excel(file_path, sheet_name=_pandas_sheet_name(sheet_name), usecols=columns)
+        if columns:
+            data = data[columns]
+        for start in range(0, len(data), chunksize):
+            yield data.iloc[start:start + chunksize]
+
+
+def _iter_xlsx_chunks(file_path: str,
+                      columns: Optional[List[str]],
+                      chunksize: int,
+                      sheet_name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """使用openpyxl只读模式逐行读取xlsx文件"""
+    from openpyxl import load_workbook
+
+    # 用pandas解析表头，保证列名与整体读取时一致
+    header = pd.read_excel(file_path, sheet_name=_pandas_sheet_name(sheet_name), nrows=0).columns
+    names = list(columns) if columns else list(header)
+    try:
+        positions = [header.get_loc(name) for name in names]
+    except KeyError as e:
+        raise FileReadError(f"文件中不存在列: {e}")
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        buffer = []
+        pending_empty = []
+        for row in worksheet.iter_rows(min_row=2, values_only=True):
+            # 与pandas一致，丢弃末尾的空行
+            if all(value is None for value in row):
+                pending_empty.append([None] * len(positions))
+                continue
+            if pending_empty:
+                buffer.extend(pending_empty)
+                pending_empty = []
+
+            buffer.append([row[p] if p < len(row) else None for p in positions])
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=names)
+                buffer = []
+
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names)
+    finally:
+        workbook.close()
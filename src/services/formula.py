@@ -0,0 +1,228 @@
+"""
+公式字段的解析和向量化计算
+
+公式使用 [列名] 引用原始列，例如 "[薪资] * 1.1" 或 "[基本工资] + [奖金]"。
+公式只解析一次，计算时对整列执行运算，不会逐行求值。
+预览在界面线程中计算，编译时拒绝计算量不受控制的运算。
+"""
+import ast
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .dtype_optimizer import as_storage, numeric_storage
+
+
+# 列引用的写法：[列名]
+_COLUMN_REFERENCE = re.compile(r'\[([^\[\]]+)\]')
+
+# 列引用在表达式中的占位变量名前缀
+_PLACEHOLDER_PREFIX = '__column_'
+
+# 乘方的指数必须是绝对值不超过该值的数值常量
+MAX_POWER_EXPONENT = 100
+
+# 常量折叠得到的整数不超过该值时保持为整数，更大的值float64无法精确表示
+_MAX_EXACT_INTEGER = 2 ** 53
+
+# 常量折叠支持的运算，按float64计算
+_CONSTANT_OPERATORS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide, ast.Mod: np.mod, ast.Pow: np.power,
+}
+
+# 允许出现在公式中的语法节点
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Constant,
+    ast.Name, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+class FormulaError(ValueError):
+    """公式语法错误"""
+    pass
+
+
+class CompiledFormula:
+    """
+    编译后的公式
+
+    Attributes:
+        expression: 原始公式表达式
+        columns: 公式引用的列名，按首次出现的顺序
+    """
+
+    def __init__(self, expression: str, columns: List[str], code: Any):
+        self.expression = expression
+        self.columns = columns
+        self._code = code
+
+    def evaluate(self, data: pd.DataFrame) -> pd.Series:
+        """
+        对整个数据计算公式
+
+        Args:
+            data: 包含公式引用列的数据
+
+        Returns:
+            pd.Series: 计算结果，索引与data一致
+
+        Raises:
+            FormulaError: 引用的列不存在
+        """
+        missing = [col for col in self.columns if col not in data.columns]
+        if missing:
+            raise FormulaError(f"公式引用的列不存在: {', '.join(missing)}")
+
+        variables: Dict[str, Any] = {
+            f'{_PLACEHOLDER_PREFIX}{i}': _widen(data[col]) for i, col in enumerate(self.columns)
+        }
+        result = eval(self._code, {'__builtins__': {}}, variables)
+
+        # 不引用任何列的公式得到标量，扩展为整列
+        if not isinstance(result, pd.Series):
+            result = pd.Series(result, index=data.index)
+        return result
+
+
+def _widen(column: pd.Series) -> pd.Series:
+    """
+    将优化过类型的列恢复为计算用的类型
+
+    缩小后的整数在运算中会溢出（例如int8的 100 * 2），分类类型不支持文本拼接，
+    计算前转换为64位数值和类别本身的类型。
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.astype(column.dtype.categories.dtype)
+    storage = numeric_storage(column.dtype)
+    if storage is not None and storage.itemsize < 8:
+        return as_storage(column, np.dtype(np.float64 if storage.kind == 'f' else np.int64))
+    return column
+
+
+@lru_cache(maxsize=256)
+def compile_formula(expression: str) -> CompiledFormula:
+    """
+    解析并编译公式，相同的公式只编译一次
+
+    Args:
+        expression: 公式表达式
+
+    Returns:
+        CompiledFormula: 编译后的公式
+
+    Raises:
+        FormulaError: 公式为空、语法错误或包含不支持的运算
+    """
+    if not expression or not expression.strip():
+        raise FormulaError("公式不能为空")
+
+    columns: List[str] = []
+
+    def replace_reference(match: re.Match) -> str:
+        name = match.group(1).strip()
+        if name not in columns:
+            columns.append(name)
+        return f'{_PLACEHOLDER_PREFIX}{columns.index(name)}'
+
+    source = _COLUMN_REFERENCE.sub(replace_reference, expression.strip())
+
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError:
+        raise FormulaError(f"公式语法错误: {expression}")
+
+    placeholders = {f'{_PLACEHOLDER_PREFIX}{i}' for i in range(len(columns))}
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise FormulaError(f"公式包含不支持的运算: {expression}")
+        if isinstance(node, ast.Name) and node.id not in placeholders:
+            raise FormulaError(f"公式中的列名需要用方括号括起来: {expression}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str)):
+            raise FormulaError(f"公式包含不支持的常量: {node.value!r}")
+        _check_operation(node, expression)
+
+    tree = ast.fix_missing_locations(_ConstantFolder(expression).visit(tree))
+    return CompiledFormula(expression, columns, compile(tree, '<formula>', 'eval'))
+
+
+def _check_operation(node: ast.AST, expression: str) -> None:
+    """
+    拒绝计算量或内存占用不受控制的运算
+
+    预览在界面线程中计算，例如 9 ** 9 ** 9 或 "x" * 10 ** 10 会使程序长时间无响应。
+    连续比较（1 < [a] < 5）对整列求值时会因真值不明确而失败，也在编译时拒绝。
+    """
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+        exponent = _number(node.right)
+        if exponent is None or abs(exponent) > MAX_POWER_EXPONENT:
+            raise FormulaError(
+                f"乘方的指数必须是绝对值不超过 {MAX_POWER_EXPONENT} 的数值: {expression}"
+            )
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult) and any(
+            isinstance(operand, ast.Constant) and isinstance(operand.value, str)
+            for operand in (node.left, node.right)):
+        raise FormulaError(f"文本不能与数字相乘: {expression}")
+    if isinstance(node, ast.Compare) and len(node.ops) > 1:
+        raise FormulaError(f"不支持连续比较，请拆分为多个公式字段: {expression}")
+
+
+def _number(node: ast.AST) -> Optional[float]:
+    """数值常量（可带正负号）的值，其他表达式为None"""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _number(node.operand)
+        if value is None or isinstance(node.op, ast.UAdd):
+            return value
+        return -value
+    if (isinstance(node, ast.Constant) and isinstance(node.value, (int, float))
+            and not isinstance(node.value, bool)):
+        return node.value
+    return None
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """
+    在编译时按float64计算只由数值常量组成的子表达式
+
+    Python整数没有位数上限，例如 ((10 ** 100) ** 100) ** 100 按大整数求值时计算量随位数增长；
+    按float64计算时溢出为无穷大。整数之间的运算（除法和负指数乘方除外）
+    得到能精确表示的整数时仍保持为整数，与Python的计算结果相同。
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        value = _number(node)
+        if value is None:
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        left, right = _number(node.left), _number(node.right)
+        if left is None or right is None:
+            return node
+
+        try:
+            with np.errstate(all='ignore'):
+                result = float(_CONSTANT_OPERATORS[type(node.op)](
+                    np.float64(left), np.float64(right)))
+        except OverflowError:
+            raise FormulaError(f"公式中的数值超出范围: {self.expression}")
+
+        integral = (
+            isinstance(left, int) and isinstance(right, int)
+            and not isinstance(node.op, ast.Div)
+            and not (isinstance(node.op, ast.Pow) and right < 0)
+        )
+        if integral and abs(result) <= _MAX_EXACT_INTEGER:
+            result = int(result)
+        return ast.copy_location(ast.Constant(result), node)
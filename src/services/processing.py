@@ -0,0 +1,176 @@
+"""
+数据处理工具，根据配置选择字段并添加自定义字段
+"""
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, List, Optional
+
+from ..models.data_model import CustomField, DataConfiguration
+from .formula import compile_formula
+
+
+# pandas 3.0起写时复制始终开启，之前的版本需要通过选项开启
+_COPY_ON_WRITE_ALWAYS = int(pd.__version__.split('.')[0]) >= 3
+
+
+@contextmanager
+def copy_on_write() -> Iterator[None]:
+    """
+    在上下文中启用pandas写时复制模式
+
+    启用后列选择和浅复制共享底层列缓冲区，只有在修改时才复制，
+    因此选择字段和导出不会复制整份数据，也不会修改原始数据。
+    """
+    if _COPY_ON_WRITE_ALWAYS:
+        context = nullcontext()
+    else:
+        context = pd.option_context('mode.copy_on_write', True)
+    with context:
+        yield
+
+
+def get_required_columns(configuration: DataConfiguration) -> List[str]:
+    """
+    根据配置计算需要从源文件读取的原始列
+
+    Args:
+        configuration: 数据配置
+
+    Returns:
+        List[str]: 需要读取的原始列名，包括选中的公式字段引用的列
+    """
+    columns = configuration.get_selected_original_fields()
+    original_headers = set(configuration.original_headers)
+    required = set(columns)
+    for custom_field in configuration.get_selected_custom_fields():
+        if custom_field.field_type != 'formula':
+            continue
+        try:
+            formula = compile_formula(custom_field.default_value)
+        except ValueError:
+            # 无效的公式在处理时记录警告
+            continue
+        for col in formula.columns:
+            if col in original_headers and col not in required:
+                columns.append(col)
+                required.add(col)
+    return columns
+
+
+def _number_column(custom_field: CustomField, source: pd.DataFrame,
+                   warnings: Optional[List[str]]) -> pd.Series:
+    """创建数字类型的常量列，使用可空浮点类型"""
+    try:
+        value = float(custom_field.default_value) if custom_field.default_value else 0.0
+    except ValueError:
+        value = 0.0
+        if warnings is not None:
+            warnings.append(f"自定义字段 '{custom_field.name}' 的默认值无法转换为数字，使用0")
+    return pd.Series(value, index=source.index, dtype='Float64')
+
+
+def _date_column(custom_field: CustomField, source: pd.DataFrame,
+                 warnings: Optional[List[str]]) -> pd.Series:
+    """创建日期类型的常量列，默认值为空或无法解析时为缺失值"""
+    value = pd.NaT
+    if custom_field.default_value:
+        try:
+            value = pd.Timestamp(custom_field.default_value)
+        except ValueError:
+            if warnings is not None:
+                warnings.append(f"自定义字段 '{custom_field.name}' 的默认值无法转换为日期，留空")
+    return pd.Series(value, index=source.index, dtype='datetime64[ns]')
+
+
+def _text_column(custom_field: CustomField, source: pd.DataFrame,
+                 warnings: Optional[List[str]]) -> pd.Series:
+    """创建文本类型的常量列，使用只有一个类别的分类类型，每行只占一个字节"""
+    codes = np.zeros(len(source.index), dtype=np.int8)
+    categorical = pd.Categorical.from_codes(codes, categories=[custom_field.default_value])
+    return pd.Series(categorical, index=source.index)
+
+
+def _formula_column(custom_field: CustomField, source: pd.DataFrame,
+                    warnings: Optional[List[str]]) -> pd.Series:
+    """按公式对整列向量化计算，default_value为公式表达式"""
+    return compile_formula(custom_field.default_value).evaluate(source)
+
+
+# 各字段类型对应的常量列构造函数，未列出的类型按文本处理
+_COLUMN_BUILDERS = {
+    'number': _number_column,
+    'date': _date_column,
+    'text': _text_column,
+    'formula': _formula_column,
+}
+
+
+def add_custom_fields(data: pd.DataFrame,
+                      custom_fields: List[CustomField],
+                      warnings: Optional[List[str]] = None,
+                      source: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    向数据中添加自定义字段列
+    
+    所有自定义列先分别构造为带类型的列，再一次性拼接到数据中，
+    避免逐列插入导致DataFrame碎片化。
+
+    Args:
+        data: 待添加列的数据
+        custom_fields: 自定义字段列表
+        warnings: 用于收集警告信息的列表，None表示忽略警告
+        source: 公式字段计算时使用的数据，需与data的索引一致，None表示使用data
+
+    Returns:
+        pd.DataFrame: 添加自定义字段后的数据
+    """
+    if source is None:
+        source = data
+
+    columns = {}
+    for custom_field in custom_fields:
+        builder = _COLUMN_BUILDERS.get(custom_field.field_type, _text_column)
+        try:
+            columns[custom_field.name] = builder(custom_field, source, warnings)
+        except Exception as e:
+            if warnings is not None:
+                warnings.append(f"处理自定义字段 '{custom_field.name}' 时出错: {str(e)}")
+
+    if not columns:
+        return data
+
+    # 同名的已有列会被自定义字段替换
+    existing = [name for name in columns if name in data.columns]
+    if existing:
+        data = data.drop(columns=existing)
+    return pd.concat([data, pd.DataFrame(columns, index=data.index)], axis=1)
+
+
+def apply_configuration(data: pd.DataFrame,
+                        configuration: DataConfiguration,
+                        warnings: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    按配置处理数据：选择原始字段并添加自定义字段
+
+    Args:
+        data: 原始数据
+        configuration: 数据配置
+        warnings: 用于收集警告信息的列表，None表示忽略警告
+
+    Returns:
+        pd.DataFrame: 处理后的数据
+    """
+    selected_original_fields = configuration.get_selected_original_fields()
+
+    with copy_on_write():
+        # 创建结果DataFrame，写时复制模式下列选择不会复制数据
+        if selected_original_fields:
+            result_data = data[selected_original_fields]
+        else:
+            result_data = pd.DataFrame(index=data.index)
+
+        # 公式字段可以引用未选中的原始字段，因此基于原始数据计算
+        return add_custom_fields(
+            result_data, configuration.get_selected_custom_fields(), warnings, source=data
+        )
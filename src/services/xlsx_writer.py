@@ -0,0 +1,296 @@
+"""
+流式写入xlsx文件
+
+逐块写出数据：安装了xlsxwriter时使用xlsxwriter，较大的输出使用其constant_memory模式，
+每写完一行即写入临时文件；否则使用openpyxl的只写模式。
+数据超过Excel单个工作表的行数上限时自动续写到新的工作表。
+文本按原样保存，以"="开头的文本不会被当作公式。
+Excel不支持无穷大，与pandas的to_excel一样写为文本inf和-inf。
+"""
+import re
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Any, Iterable, List, Optional
+
+from .file_reader import is_module_available
+
+
+# Excel单个工作表的最大行数（含表头）和最大列数
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLUMNS = 16384
+
+# 支持的流式写入引擎
+XLSX_WRITERS = ('auto', 'xlsxwriter', 'openpyxl')
+
+# 无穷大写入的文本，与pandas的inf_rep默认值相同
+INF_REP = 'inf'
+
+# Excel工作表名称的最大长度和不允许的字符
+MAX_SHEET_NAME_LENGTH = 31
+_INVALID_SHEET_NAME_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+
+def resolve_xlsx_writer(writer: str = 'auto') -> str:
+    """
+    确定实际使用的流式写入引擎
+
+    Args:
+        writer: 请求的引擎，auto、xlsxwriter或openpyxl
+
+    Returns:
+        str: 实际使用的引擎，xlsxwriter未安装时退回openpyxl
+
+    Raises:
+        ValueError: 引擎名称不受支持时抛出
+    """
+    if writer not in XLSX_WRITERS:
+        raise ValueError(f"不支持的xlsx写入引擎: {writer}。支持的引擎: {', '.join(XLSX_WRITERS)}")
+    if writer != 'openpyxl' and is_module_available('xlsxwriter'):
+        return 'xlsxwriter'
+    return 'openpyxl'
+
+
+def safe_sheet_name(sheet_name: Any, used_names: set) -> str:
+    """
+    转换为合法且不重复的Excel工作表名称
+
+    Args:
+        sheet_name: 原始名称
+        used_names: 已使用的名称（小写），Excel比较工作表名称时不区分大小写
+
+    Returns:
+        str: 合法的工作表名称，未加入used_names
+    """
+    base = _INVALID_SHEET_NAME_CHARS.sub('_', str(sheet_name)).strip("'") or 'Sheet'
+    name = base[:MAX_SHEET_NAME_LENGTH]
+    counter = 1
+    while name.lower() in used_names:
+        suffix = f"_{counter}"
+        name = base[:MAX_SHEET_NAME_LENGTH - len(suffix)] + suffix
+        counter += 1
+    return name
+
+
+def _replace_infinity(values: pd.DataFrame, data: pd.DataFrame) -> pd.DataFrame:
+    """将浮点数列中的正负无穷大替换为文本INF_REP和-INF_REP"""
+    for position in range(len(data.columns)):
+        column = data.iloc[:, position]
+        if not pd.api.types.is_float_dtype(column.dtype):
+            continue
+        numbers = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        infinite = np.isinf(numbers)
+        if infinite.any():
+            replaced = values.iloc[:, position].copy()
+            replaced[infinite] = np.where(numbers[infinite] > 0, INF_REP, f"-{INF_REP}")
+            values.isetitem(position, replaced)
+    return values
+
+
+class _XlsxWriterBackend:
+    """
+    xlsxwriter写入
+
+    constant_memory模式下每个工作表的行写入临时目录中的临时文件，内存占用不随行数增长，
+    但文本不使用共享字符串表，重复文本较多时文件更大。
+    """
+
+    def __init__(self, output_file_path: str, constant_memory: bool):
+        import xlsxwriter
+
+        self._temp_dir = tempfile.mkdtemp(prefix='xlsx_rows_')
+        self._workbook = xlsxwriter.Workbook(output_file_path, {
+            'constant_memory': constant_memory,
+            'tmpdir': self._temp_dir,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'remove_timezone': True,
+            # 文本按原样保存，不转换为公式或超链接
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        self._worksheet = None
+        self._row = 0
+
+    def add_sheet(self, name: str) -> None:
+        self._worksheet = self._workbook.add_worksheet(name)
+        self._row = 0
+
+    def append(self, values: Iterable[Any]) -> None:
+        self._worksheet.write_row(self._row, 0, values)
+        self._row += 1
+
+    def save(self) -> None:
+        try:
+            self._workbook.close()
+        finally:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def discard(self) -> None:
+        # 工作簿未关闭时不会写出文件，释放工作簿后删除临时文件
+        self._workbook = None
+        self._worksheet = None
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+
+class _OpenpyxlBackend:
+    """openpyxl的只写模式，始终逐行写入临时文件"""
+
+    def __init__(self, output_file_path: str, constant_memory: bool):
+        from openpyxl import Workbook
+
+        self._output_file_path = output_file_path
+        self._workbook = Workbook(write_only=True)
+        self._worksheets = []
+
+    def add_sheet(self, name: str) -> None:
+        self._worksheets.append(self._workbook.create_sheet(name))
+
+    def append(self, values: Iterable[Any]) -> None:
+        worksheet = self._worksheets[-1]
+        worksheet.append([
+            self._text_cell(worksheet, value)
+            if isinstance(value, str) and value.startswith('=') else value
+            for value in values
+        ])
+
+    @staticmethod
+    def _text_cell(worksheet, value: str):
+        """openpyxl会把以"="开头的文本写为公式，显式指定为文本单元格"""
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.data_type = 's'
+        return cell
+
+    def save(self) -> None:
+        self._workbook.save(self._output_file_path)
+
+    def discard(self) -> None:
+        # 关闭只写工作表的临时文件，不再保存工作簿
+        for worksheet in self._worksheets:
+            try:
+                worksheet.close()
+            except Exception:
+                pass
+
+
+_BACKENDS = {
+    'xlsxwriter': _XlsxWriterBackend,
+    'openpyxl': _OpenpyxlBackend,
+}
+
+
+class XlsxStreamWriter:
+    """
+    逐块写入xlsx文件
+
+    每个逻辑工作表的第一块写出表头；行数达到max_rows时续写到名为
+    "工作表名_2"、"工作表名_3"…的新工作表，并重复表头。
+
+    用法:
+        with XlsxStreamWriter(path) as writer:
+            writer.start_sheet('数据')
+            for chunk in chunks:
+                writer.write_frame(chunk)
+    """
+
+    def __init__(self, output_file_path: str, writer: str = 'auto',
+                 max_rows: int = EXCEL_MAX_ROWS, constant_memory: bool = True):
+        """
+        Args:
+            output_file_path: 输出文件路径，扩展名必须为.xlsx
+            writer: 写入引擎，见XLSX_WRITERS
+            max_rows: 每个工作表的最大行数（含表头）
+            constant_memory: 是否逐行写出，不在内存中保留已写入的行；
+                False时xlsxwriter在内存中构建工作簿，生成的文件更小
+
+        Raises:
+            ValueError: 引擎名称不受支持或max_rows小于2时抛出
+        """
+        if max_rows < 2:
+            raise ValueError("每个工作表至少需要容纳表头和一行数据")
+
+        self.writer = resolve_xlsx_writer(writer)
+        self.max_rows = max_rows
+        self.sheet_names: List[str] = []
+        self._backend = _BACKENDS[self.writer](output_file_path, constant_memory)
+        self._used_names: set = set()
+        self._base_name: Optional[str] = None
+        self._header: Optional[List[str]] = None
+        self._part = 0
+        self._rows_in_sheet = 0
+
+    def start_sheet(self, sheet_name: Any) -> None:
+        """
+        开始一个新的逻辑工作表，名称会被转换为合法且不重复的工作表名称
+
+        Args:
+            sheet_name: 工作表名称
+        """
+        self._base_name = str(sheet_name)
+        self._header = None
+        self._part = 0
+        self._add_sheet()
+
+    def write_frame(self, data: pd.DataFrame) -> int:
+        """
+        写入一块数据
+
+        Args:
+            data: 数据块，同一逻辑工作表中各块的列应一致
+
+        Returns:
+            int: 写入的数据行数
+
+        Raises:
+            ValueError: 列数超过Excel的上限时抛出，此时尚未写入任何行
+        """
+        if len(data.columns) > EXCEL_MAX_COLUMNS:
+            raise ValueError(f"列数 {len(data.columns)} 超过Excel工作表的上限 {EXCEL_MAX_COLUMNS}")
+        if self._base_name is None:
+            self.start_sheet('Sheet1')
+        if self._header is None:
+            self._header = [str(col) for col in data.columns]
+            self._backend.append(self._header)
+            self._rows_in_sheet += 1
+
+        # 将缺失值转换为空单元格，无穷大转换为文本
+        values = _replace_infinity(data.astype(object).where(data.notna(), None), data)
+        for row in values.itertuples(index=False, name=None):
+            if self._rows_in_sheet >= self.max_rows:
+                self._add_sheet()
+                self._backend.append(self._header)
+                self._rows_in_sheet += 1
+            self._backend.append(row)
+            self._rows_in_sheet += 1
+        return len(data)
+
+    def close(self) -> None:
+        """保存工作簿，没有写入任何工作表时写出一个空工作表"""
+        if not self.sheet_names:
+            self.start_sheet('Sheet1')
+        self._backend.save()
+
+    def discard(self) -> None:
+        """放弃写入，释放临时文件"""
+        self._backend.discard()
+
+    def _add_sheet(self) -> None:
+        """为当前逻辑工作表添加一个工作表"""
+        self._part += 1
+        name = self._base_name if self._part == 1 else f"{self._base_name}_{self._part}"
+        name = safe_sheet_name(name, self._used_names)
+        self._used_names.add(name.lower())
+        self.sheet_names.append(name)
+        self._backend.add_sheet(name)
+        self._rows_in_sheet = 0
+
+    def __enter__(self) -> 'XlsxStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -1,18 +1,23 @@
 """
 数据处理主视图
 """
-import pandas as pd
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                                QPushButton, QLabel, QGroupBox,
-                               QListWidget, QTableWidget, QSplitter,
-                               QListWidgetItem, QTableWidgetItem,
+                               QListView, QTableView, QSplitter,
+                               QHeaderView,
                                QCheckBox, QFileDialog, QMessageBox,
                                QDialog, QLineEdit, QComboBox, QTextEdit,
-                               QDialogButtonBox, QFormLayout)
+                               QDialogButtonBox, QFormLayout, QProgressBar)
 from PySide6.QtCore import Signal, Qt
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
 
-from ..models.data_model import CustomField, FieldSelection, FieldType
+from ..models.data_model import CustomField, FieldSelection
+from .dataframe_table_model import DataFrameTableModel
+from .field_list_model import FieldListModel
+
+if TYPE_CHECKING:
+    # pandas只用于类型注解，不在界面启动时导入
+    import pandas as pd
 
 
 class DataProcessingView(QWidget):
@@ -20,9 +25,13 @@ class DataProcessingView(QWidget):
     
     # 信号定义
     file_import_requested = Signal()
+    load_cancel_requested = Signal()
+    sheet_selection_changed = Signal(list)  # 选择的工作表名称，多个时合并
     field_selection_changed = Signal(list)
-    custom_field_added = Signal(str, str)
+    field_selections_changed = Signal(dict)  # 批量选择变更，字段名称到是否选中的映射
+    custom_field_added = Signal(object)  # CustomField
     generate_requested = Signal()
+    export_cancel_requested = Signal()
     
     def __init__(self):
         super().__init__()
@@ -59,8 +68,20 @@ class DataProcessingView(QWidget):
         
         # 底部操作按钮
         button_layout = QHBoxLayout()
+        
+        # 导出进度
+        self.export_progress_bar = QProgressBar()
+        self.cancel_export_btn = QPushButton("取消导出")
+        button_layout.addWidget(self.export_progress_bar, 1)
+        button_layout.addWidget(self.cancel_export_btn)
+        self.export_progress_bar.setVisible(False)
+        self.cancel_export_btn.setVisible(False)
         button_layout.addStretch()
         
+        self.export_per_sheet_check = QCheckBox("按工作表分别导出")
+        self.export_per_sheet_check.setVisible(False)
+        button_layout.addWidget(self.export_per_sheet_check)
+        
         self.generate_btn = QPushButton("生成Excel文件")
         self.generate_btn.setObjectName("primaryButton")
         self.generate_btn.setEnabled(False)  # 初始状态禁用
@@ -85,6 +106,27 @@ class DataProcessingView(QWidget):
         self.file_info_label.setObjectName("fileInfoLabel")
         import_layout.addWidget(self.file_info_label)
         
+        # 加载进度
+        load_progress_layout = QHBoxLayout()
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setRange(0, 100)
+        self.cancel_load_btn = QPushButton("取消")
+        load_progress_layout.addWidget(self.load_progress_bar)
+        load_progress_layout.addWidget(self.cancel_load_btn)
+        import_layout.addLayout(load_progress_layout)
+        self.load_progress_bar.setVisible(False)
+        self.cancel_load_btn.setVisible(False)
+        
+        # 工作表选择，只有多个工作表的工作簿才显示
+        sheet_layout = QHBoxLayout()
+        self.sheet_label = QLabel("工作表:")
+        self.sheet_combo = QComboBox()
+        sheet_layout.addWidget(self.sheet_label)
+        sheet_layout.addWidget(self.sheet_combo, 1)
+        import_layout.addLayout(sheet_layout)
+        self.sheet_label.setVisible(False)
+        self.sheet_combo.setVisible(False)
+        
         layout.addWidget(import_group)
         
         # 字段选择区域
@@ -92,8 +134,11 @@ class DataProcessingView(QWidget):
         fields_layout = QVBoxLayout(fields_group)
         
         # 字段列表
-        self.fields_list = QListWidget()
+        self.fields_model = FieldListModel(self)
+        self.fields_list = QListView()
         self.fields_list.setObjectName("fieldsList")
+        self.fields_list.setModel(self.fields_model)
+        self.fields_list.setUniformItemSizes(True)
         fields_layout.addWidget(self.fields_list)
         
         # 字段操作按钮
@@ -102,9 +147,12 @@ class DataProcessingView(QWidget):
         self.select_all_btn.setEnabled(False)
         self.select_none_btn = QPushButton("全不选")
         self.select_none_btn.setEnabled(False)
+        self.invert_selection_btn = QPushButton("反选")
+        self.invert_selection_btn.setEnabled(False)
         
         field_buttons_layout.addWidget(self.select_all_btn)
         field_buttons_layout.addWidget(self.select_none_btn)
+        field_buttons_layout.addWidget(self.invert_selection_btn)
         fields_layout.addLayout(field_buttons_layout)
         
         layout.addWidget(fields_group)
@@ -134,9 +182,14 @@ class DataProcessingView(QWidget):
         preview_label.setObjectName("sectionTitle")
         layout.addWidget(preview_label)
         
-        # 预览表格
-        self.preview_table = QTableWidget()
+        # 预览表格，数据在滚动到可见区域时才读取
+        self.preview_model = DataFrameTableModel(self)
+        self.preview_table = QTableView()
         self.preview_table.setObjectName("previewTable")
+        self.preview_table.setModel(self.preview_model)
+        self.preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        # 按内容调整列宽时只参考有限的行
+        self.preview_table.horizontalHeader().setResizeContentsPrecision(100)
         layout.addWidget(self.preview_table)
         
         # 预览信息
@@ -247,110 +300,203 @@ class DataProcessingView(QWidget):
     def connect_signals(self) -> None:
         """连接信号槽"""
         self.import_btn.clicked.connect(self.file_import_requested.emit)
+        self.cancel_load_btn.clicked.connect(self.load_cancel_requested.emit)
+        self.sheet_combo.activated.connect(self._on_sheet_activated)
         self.generate_btn.clicked.connect(self.generate_requested.emit)
+        self.cancel_export_btn.clicked.connect(self._on_cancel_export)
         self.select_all_btn.clicked.connect(self._on_select_all)
         self.select_none_btn.clicked.connect(self._on_select_none)
+        self.invert_selection_btn.clicked.connect(self._on_invert_selection)
         self.add_field_btn.clicked.connect(self._on_add_custom_field)
-        self.fields_list.itemChanged.connect(self._on_field_item_changed)
+        self.fields_model.selection_changed.connect(self._on_field_item_changed)
+    
+    def _on_sheet_activated(self, index: int) -> None:
+        """用户选择了工作表"""
+        sheet_names = self.sheet_combo.itemData(index)
+        if sheet_names:
+            self.sheet_selection_changed.emit(list(sheet_names))
+    
+    def _on_cancel_export(self) -> None:
+        """请求取消导出，等待导出任务在下一个数据块前停止"""
+        self.cancel_export_btn.setEnabled(False)
+        self.export_progress_bar.setFormat("正在取消...")
+        self.export_cancel_requested.emit()
     
     def _on_select_all(self) -> None:
         """全选字段"""
-        for i in range(self.fields_list.count()):
-            item = self.fields_list.item(i)
-            if item and hasattr(item, 'setCheckState'):
-                item.setCheckState(Qt.Checked)
+        self._apply_bulk_selection(lambda checked: True)
     
     def _on_select_none(self) -> None:
         """全不选字段"""
-        for i in range(self.fields_list.count()):
-            item = self.fields_list.item(i)
-            if item and hasattr(item, 'setCheckState'):
-                item.setCheckState(Qt.Unchecked)
+        self._apply_bulk_selection(lambda checked: False)
+    
+    def _on_invert_selection(self) -> None:
+        """反选字段"""
+        self._apply_bulk_selection(lambda checked: not checked)
+    
+    def _apply_bulk_selection(self, new_state) -> None:
+        """
+        批量更新复选框，并只发出一次批量选择变更信号
+        
+        Args:
+            new_state: 根据当前是否选中计算新状态的函数
+        """
+        selections = self.fields_model.apply_bulk_selection(new_state)
+        if selections:
+            self.field_selections_changed.emit(selections)
     
-    def _on_field_item_changed(self, item: QListWidgetItem) -> None:
+    def _on_field_item_changed(self, field_name: str, is_selected: bool) -> None:
         """字段选择状态改变"""
-        if hasattr(item, 'field_name'):
-            field_name = item.field_name
-            is_selected = item.checkState() == Qt.Checked
-            self.field_selection_changed.emit([field_name, is_selected])
+        self.field_selection_changed.emit([field_name, is_selected])
     
     def _on_add_custom_field(self) -> None:
         """添加自定义字段"""
         dialog = CustomFieldDialog(self)
         if dialog.exec() == QDialog.Accepted:
-            field_name, default_value = dialog.get_field_data()
-            self.custom_field_added.emit(field_name, default_value)
+            self.custom_field_added.emit(dialog.get_custom_field())
+    
+    def set_loading(self, loading: bool) -> None:
+        """切换文件加载状态"""
+        self.load_progress_bar.setValue(0)
+        self.load_progress_bar.setVisible(loading)
+        self.cancel_load_btn.setVisible(loading)
+        self.import_btn.setEnabled(not loading)
+        if loading:
+            self.file_info_label.setText("正在加载文件...")
+    
+    def update_load_progress(self, percent: int) -> None:
+        """更新文件加载进度"""
+        self.load_progress_bar.setValue(percent)
+    
+    def show_load_cancelled(self) -> None:
+        """显示文件加载已取消"""
+        self.set_loading(False)
+        self.file_info_label.setText("文件加载已取消")
+    
+    def set_exporting(self, exporting: bool) -> None:
+        """切换导出状态，导出期间不能导入文件、切换工作表或再次导出"""
+        self.export_progress_bar.setRange(0, 0)
+        self.export_progress_bar.setFormat("正在导出...")
+        self.export_progress_bar.setVisible(exporting)
+        self.cancel_export_btn.setVisible(exporting)
+        self.cancel_export_btn.setEnabled(exporting)
+        self.generate_btn.setEnabled(not exporting)
+        self.import_btn.setEnabled(not exporting)
+        self.sheet_combo.setEnabled(not exporting)
+    
+    def update_export_progress(self, rows: int, total_rows: int) -> None:
+        """
+        更新导出进度
+        
+        Args:
+            rows: 已写入的行数
+            total_rows: 预计总行数，0表示未知
+        """
+        if not self.cancel_export_btn.isEnabled():
+            # 已请求取消，保留取消提示
+            return
+        if total_rows > 0:
+            self.export_progress_bar.setRange(0, max(total_rows, rows))
+            self.export_progress_bar.setValue(rows)
+            self.export_progress_bar.setFormat("已写入 %v / %m 行")
+        else:
+            self.export_progress_bar.setFormat(f"已写入 {rows} 行")
     
     def update_file_info(self, file_path: str, data_info: dict) -> None:
         """更新文件信息显示"""
+        self.set_loading(False)
         file_name = file_path.split('/')[-1] if '/' in file_path else file_path.split('\\')[-1]
-        info_text = f"{file_name} ({data_info.get('rows', 0)} 行, {data_info.get('columns', 0)} 列)"
+        rows = data_info.get('rows')
+        if rows is None:
+            rows_text = "行数未知"
+        elif data_info.get('fully_loaded', True):
+            rows_text = f"{rows} 行"
+        else:
+            rows_text = f"约 {rows} 行"
+        info_text = f"{file_name} ({rows_text}, {data_info.get('columns', 0)} 列)"
+        memory_after = data_info.get('memory_after')
+        if memory_after is not None:
+            info_text += f" 内存 {self._format_size(memory_after)}"
+            if data_info.get('dtypes_optimized'):
+                info_text += f"（优化前 {self._format_size(data_info['memory_before'])}）"
         self.file_info_label.setText(info_text)
         
         # 启用相关按钮
         self.select_all_btn.setEnabled(True)
         self.select_none_btn.setEnabled(True)
+        self.invert_selection_btn.setEnabled(True)
         self.add_field_btn.setEnabled(True)
     
-    def update_fields_list(self, field_selections: List[FieldSelection]) -> None:
-        """更新字段列表"""
-        self.fields_list.clear()
+    def update_sheet_list(self, sheet_names: List[str], selected_sheets: List[str]) -> None:
+        """
+        更新工作表选择框
         
-        for field_selection in field_selections:
-            item = QListWidgetItem(field_selection.field_name)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if field_selection.is_selected else Qt.Unchecked)
-            
-            # 添加字段名称属性，用于信号处理
-            item.field_name = field_selection.field_name
+        Args:
+            sheet_names: 工作簿中的工作表，少于两个时隐藏选择框
+            selected_sheets: 当前选择的工作表
+        """
+        multiple = len(sheet_names) > 1
+        self.sheet_label.setVisible(multiple)
+        self.sheet_combo.setVisible(multiple)
+        self.export_per_sheet_check.setVisible(multiple)
+        if not multiple:
+            self.export_per_sheet_check.setChecked(False)
+        
+        # 每项的数据为选择的工作表列表，最后一项合并所有工作表
+        self.sheet_combo.blockSignals(True)
+        try:
+            self.sheet_combo.clear()
+            for sheet_name in sheet_names:
+                self.sheet_combo.addItem(sheet_name, [sheet_name])
+            if multiple:
+                self.sheet_combo.addItem(f"合并全部 {len(sheet_names)} 个工作表", list(sheet_names))
             
-            # 根据字段类型设置不同的显示样式
-            if field_selection.field_type == FieldType.CUSTOM:
-                item.setText(f"🔧 {field_selection.field_name}")
-                item.setToolTip("自定义字段")
+            for index in range(self.sheet_combo.count()):
+                if self.sheet_combo.itemData(index) == list(selected_sheets):
+                    self.sheet_combo.setCurrentIndex(index)
+                    break
             else:
-                item.setText(f"📊 {field_selection.field_name}")
-                item.setToolTip("原始字段")
-            
-            self.fields_list.addItem(item)
+                if selected_sheets:
+                    # 通过接口选择的部分工作表
+                    self.sheet_combo.addItem(f"合并 {len(selected_sheets)} 个工作表", list(selected_sheets))
+                    self.sheet_combo.setCurrentIndex(self.sheet_combo.count() - 1)
+        finally:
+            self.sheet_combo.blockSignals(False)
+    
+    def is_export_per_sheet(self) -> bool:
+        """是否按工作表分别导出"""
+        return self.export_per_sheet_check.isVisible() and self.export_per_sheet_check.isChecked()
+    
+    def update_fields_list(self, field_selections: List[FieldSelection]) -> None:
+        """更新字段列表，只刷新发生变化的行"""
+        self.fields_model.update_fields(field_selections)
     
-    def update_preview_table(self, preview_data: Optional[pd.DataFrame]) -> None:
+    @staticmethod
+    def _format_size(size: int) -> str:
+        """将字节数格式化为便于阅读的大小"""
+        for unit in ('B', 'KB', 'MB'):
+            if size < 1024:
+                return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GB"
+    
+    def update_preview_table(self, preview_data: Optional['pd.DataFrame']) -> None:
         """更新预览表格"""
         if preview_data is None or preview_data.empty:
-            self.preview_table.clear()
-            self.preview_table.setRowCount(0)
-            self.preview_table.setColumnCount(0)
+            self.preview_model.set_data_frame(None)
             self.preview_info_label.setText("没有可预览的数据")
             self.generate_btn.setEnabled(False)
             return
         
-        # 设置表格尺寸
-        rows, cols = preview_data.shape
-        self.preview_table.setRowCount(rows)
-        self.preview_table.setColumnCount(cols)
-        
-        # 设置表头
-        self.preview_table.setHorizontalHeaderLabels(list(preview_data.columns))
-        
-        # 填充数据
-        for i in range(rows):
-            for j in range(cols):
-                value = preview_data.iloc[i, j]
-                # 处理NaN值
-                if pd.isna(value):
-                    display_value = ""
-                else:
-                    display_value = str(value)
-                
-                item = QTableWidgetItem(display_value)
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # 设置为只读
-                self.preview_table.setItem(i, j, item)
+        # 设置模型数据，单元格按需读取
+        self.preview_model.set_data_frame(preview_data)
         
         # 调整列宽
         self.preview_table.resizeColumnsToContents()
         
         # 更新信息标签
-        self.preview_info_label.setText(f"预览数据 (前 {rows} 行，共 {cols} 列)")
+        rows, cols = preview_data.shape
+        self.preview_info_label.setText(f"预览数据 (共 {rows} 行，{cols} 列)")
         
         # 启用生成按钮
         self.generate_btn.setEnabled(True)
@@ -369,7 +515,8 @@ class DataProcessingView(QWidget):
             self,
             "保存Excel文件",
             "",
-            "Excel文件 (*.xlsx);;CSV文件 (*.csv)"
+            "Excel文件 (*.xlsx);;CSV文件 (*.csv);;"
+            "Parquet文件 (*.parquet);;Feather/Arrow文件 (*.feather *.arrow)"
         )
         return file_path if file_path else None
 
@@ -400,13 +547,14 @@ class CustomFieldDialog(QDialog):
         
         # 字段类型
         self.type_combo = QComboBox()
-        self.type_combo.addItems(["text", "number", "date"])
+        self.type_combo.addItems(["text", "number", "date", "formula"])
         form_layout.addRow("字段类型:", self.type_combo)
         
         # 默认值
         self.default_edit = QLineEdit()
         self.default_edit.setPlaceholderText("请输入默认值")
-        form_layout.addRow("默认值:", self.default_edit)
+        self.default_label = QLabel("默认值:")
+        form_layout.addRow(self.default_label, self.default_edit)
         
         # 描述
         self.description_edit = QTextEdit()
@@ -435,6 +583,16 @@ class CustomFieldDialog(QDialog):
     def connect_signals(self) -> None:
         """连接信号"""
         self.name_edit.textChanged.connect(self._validate_input)
+        self.type_combo.currentTextChanged.connect(self._on_type_changed)
+    
+    def _on_type_changed(self, field_type: str) -> None:
+        """公式字段的默认值输入框用于填写公式"""
+        if field_type == "formula":
+            self.default_label.setText("公式:")
+            self.default_edit.setPlaceholderText("用[字段名]引用字段，例如: [薪资] * 1.1")
+        else:
+            self.default_label.setText("默认值:")
+            self.default_edit.setPlaceholderText("请输入默认值")
     
     def _validate_input(self) -> None:
         """验证输入"""
@@ -0,0 +1,106 @@
+"""
+基于DataFrame的表格模型，按需获取单元格数据
+"""
+from typing import TYPE_CHECKING, Any, Optional
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+if TYPE_CHECKING:
+    # 界面启动时不导入pandas，模型收到数据时pandas已经加载
+    import pandas as pd
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    DataFrame表格模型
+
+    只在单元格滚动到可见区域时才读取并格式化数据，
+    行按批次通过fetchMore逐步加入，大数据集也不会阻塞界面。
+    """
+
+    # 每次滚动到底部时追加的行数
+    FETCH_BATCH_SIZE = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._data: Optional['pd.DataFrame'] = None
+        self._loaded_rows = 0
+
+    def set_data_frame(self, data: Optional['pd.DataFrame']) -> None:
+        """
+        设置模型数据
+
+        Args:
+            data: 要显示的数据，None表示清空
+        """
+        self.beginResetModel()
+        self._data = data
+        self._loaded_rows = 0 if data is None else min(len(data), self.FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def get_data_frame(self) -> Optional['pd.DataFrame']:
+        """获取模型数据"""
+        return self._data
+
+    def total_row_count(self) -> int:
+        """获取数据的总行数，包括尚未加入模型的行"""
+        return 0 if self._data is None else len(self._data)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """已加入模型的行数"""
+        if parent.isValid():
+            return 0
+        return self._loaded_rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """列数"""
+        if parent.isValid() or self._data is None:
+            return 0
+        return len(self._data.columns)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        """是否还有未加入模型的行"""
+        if parent.isValid():
+            return False
+        return self._loaded_rows < self.total_row_count()
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """追加下一批行"""
+        if parent.isValid():
+            return
+        remaining = self.total_row_count() - self._loaded_rows
+        count = min(remaining, self.FETCH_BATCH_SIZE)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + count - 1)
+        self._loaded_rows += count
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        """获取单元格显示内容"""
+        if role != Qt.DisplayRole or not index.isValid() or self._data is None:
+            return None
+
+        import pandas as pd
+
+        value = self._data.iat[index.row(), index.column()]
+        # 处理NaN值
+        if pd.isna(value):
+            return ""
+        return str(value)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.DisplayRole) -> Any:
+        """获取表头内容"""
+        if role != Qt.DisplayRole or self._data is None:
+            return None
+
+        if orientation == Qt.Horizontal:
+            return str(self._data.columns[section])
+        return str(section + 1)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        """单元格只读"""
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
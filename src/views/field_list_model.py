@@ -0,0 +1,151 @@
+"""
+字段选择列表模型，按差异增量更新
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+
+from ..models.data_model import FieldSelection, FieldType
+
+
+class _FieldRow(NamedTuple):
+    """列表中一行的显示状态快照"""
+    field_name: str
+    field_type: FieldType
+    is_selected: bool
+
+
+class FieldListModel(QAbstractListModel):
+    """
+    字段选择列表模型
+
+    保存字段选择状态的快照，update_fields只对名称、类型或选中状态
+    实际变化的行发出dataChanged，增删字段时插入或移除对应的行，
+    不会重建整个列表。
+    """
+
+    # 用户勾选或取消勾选单个字段：字段名称, 是否选中
+    selection_changed = Signal(str, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[_FieldRow] = []
+
+    def update_fields(self, field_selections: List[FieldSelection]) -> None:
+        """
+        按字段选择列表增量更新模型
+
+        Args:
+            field_selections: 最新的字段选择列表
+        """
+        new_rows = [
+            _FieldRow(fs.field_name, fs.field_type, fs.is_selected)
+            for fs in field_selections
+        ]
+        old_rows = self._rows
+
+        # 找出名称相同的公共前缀和公共后缀，中间部分为增删的行
+        old_count, new_count = len(old_rows), len(new_rows)
+        prefix = 0
+        while (prefix < old_count and prefix < new_count
+               and old_rows[prefix].field_name == new_rows[prefix].field_name):
+            prefix += 1
+        suffix = 0
+        while (suffix < old_count - prefix and suffix < new_count - prefix
+               and old_rows[old_count - 1 - suffix].field_name
+               == new_rows[new_count - 1 - suffix].field_name):
+            suffix += 1
+
+        removed = old_count - prefix - suffix
+        inserted = new_count - prefix - suffix
+        if removed and inserted:
+            # 中间部分整体替换（例如导入了新文件），直接重置模型
+            self.beginResetModel()
+            self._rows = new_rows
+            self.endResetModel()
+            return
+
+        if removed:
+            self.beginRemoveRows(QModelIndex(), prefix, prefix + removed - 1)
+            self._rows = old_rows[:prefix] + old_rows[prefix + removed:]
+            self.endRemoveRows()
+        elif inserted:
+            self.beginInsertRows(QModelIndex(), prefix, prefix + inserted - 1)
+            self._rows = old_rows[:prefix] + new_rows[prefix:prefix + inserted] + old_rows[prefix:]
+            self.endInsertRows()
+
+        # 只通知内容发生变化的行
+        for row, new_row in enumerate(new_rows):
+            if self._rows[row] != new_row:
+                self._rows[row] = new_row
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def apply_bulk_selection(self, new_state: Callable[[bool], bool]) -> Dict[str, bool]:
+        """
+        批量更新所有字段的选中状态
+
+        Args:
+            new_state: 根据当前是否选中计算新状态的函数
+
+        Returns:
+            Dict[str, bool]: 字段名称到新选中状态的映射
+        """
+        selections = {}
+        for row, field_row in enumerate(self._rows):
+            selected = new_state(field_row.is_selected)
+            self._rows[row] = field_row._replace(is_selected=selected)
+            selections[field_row.field_name] = selected
+
+        if self._rows:
+            self.dataChanged.emit(self.index(0), self.index(len(self._rows) - 1),
+                                  [Qt.CheckStateRole])
+        return selections
+
+    def field_name(self, row: int) -> Optional[str]:
+        """获取指定行的字段名称"""
+        if 0 <= row < len(self._rows):
+            return self._rows[row].field_name
+        return None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """字段数量"""
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        """获取字段的显示内容、勾选状态和提示"""
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+
+        field_row = self._rows[index.row()]
+        is_custom = field_row.field_type == FieldType.CUSTOM
+        if role == Qt.DisplayRole:
+            # 根据字段类型设置不同的显示样式
+            return f"🔧 {field_row.field_name}" if is_custom else f"📊 {field_row.field_name}"
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if field_row.is_selected else Qt.Unchecked
+        if role == Qt.ToolTipRole:
+            return "自定义字段" if is_custom else "原始字段"
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.EditRole) -> bool:
+        """用户切换勾选状态"""
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+
+        field_row = self._rows[index.row()]
+        selected = Qt.CheckState(value) == Qt.Checked
+        if selected == field_row.is_selected:
+            return True
+
+        self._rows[index.row()] = field_row._replace(is_selected=selected)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.selection_changed.emit(field_row.field_name, selected)
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        """字段可勾选"""
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
@@ -0,0 +1,108 @@
+"""
+批量处理测试
+"""
+import pandas as pd
+import pytest
+
+from src.models.data_model import CustomField, DataConfiguration
+from src.services.batch_processor import BatchProcessor, expand_input_paths, make_output_paths
+
+
+@pytest.fixture
+def configuration():
+    """只保留姓名并添加一个公式字段的配置"""
+    config = DataConfiguration(original_headers=['姓名', '薪资'])
+    config.add_original_field('姓名', selected=True)
+    config.add_original_field('薪资', selected=False)
+    config.add_custom_field(CustomField(name='年薪', default_value='[薪资] * 12',
+                                        field_type='formula'))
+    return config
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """创建三个分支机构的输入文件"""
+    directory = tmp_path / 'branches'
+    directory.mkdir()
+    for i, suffix in enumerate(['.csv', '.csv', '.xlsx']):
+        data = pd.DataFrame({'姓名': [f'员工{i}{j}' for j in range(i + 1)],
+                             '薪资': [1000 * (j + 1) for j in range(i + 1)]})
+        path = directory / f'branch{i}{suffix}'
+        if suffix == '.csv':
+            data.to_csv(path, index=False)
+        else:
+            data.to_excel(path, index=False)
+    # 不支持的文件不会被通配符匹配
+    (directory / 'readme.txt').write_text('ignored')
+    return directory
+
+
+def test_expand_input_paths(input_dir):
+    """通配符按支持的格式展开并去重"""
+    paths = expand_input_paths([str(input_dir / '*'), str(input_dir / 'branch0.csv')])
+    assert [p.split('/')[-1] for p in paths] == ['branch0.csv', 'branch1.csv', 'branch2.xlsx']
+
+
+def test_make_output_paths_avoids_collisions(tmp_path):
+    """不同目录下的同名文件输出到不同路径"""
+    output_paths = make_output_paths(['a/data.csv', 'b/data.xls'], str(tmp_path), None)
+    assert output_paths['a/data.csv'] == str(tmp_path / 'data.csv')
+    assert output_paths['b/data.xls'] == str(tmp_path / 'data.xlsx')
+
+    output_paths = make_output_paths(['a/data.csv', 'b/data.csv'], str(tmp_path), '.csv')
+    assert output_paths['b/data.csv'] == str(tmp_path / 'data_1.csv')
+
+
+def test_make_output_paths_never_overwrites_inputs(tmp_path, monkeypatch):
+    """输出目录即输入目录时，输出路径不会与任一输入文件相同"""
+    monkeypatch.chdir(tmp_path)
+    inputs = ['data.csv', str(tmp_path / 'data_1.csv'), 'report.xlsx']
+    output_paths = make_output_paths(inputs, str(tmp_path), '.csv')
+    assert output_paths['data.csv'] == str(tmp_path / 'data_2.csv')
+    assert output_paths[str(tmp_path / 'data_1.csv')] == str(tmp_path / 'data_1_1.csv')
+    assert output_paths['report.xlsx'] == str(tmp_path / 'report.csv')
+
+    output_paths = make_output_paths(inputs, '.', '.xlsx')
+    assert output_paths['report.xlsx'] == 'report_1.xlsx'
+
+
+def test_batch_run_into_input_dir(input_dir, configuration):
+    """输出到输入目录时保留输入文件"""
+    source = input_dir / 'branch0.csv'
+    original = source.read_bytes()
+    result = BatchProcessor(configuration, output_format='.csv', max_workers=1).run(
+        [str(source)], str(input_dir))
+
+    assert result.succeeded == 1
+    assert source.read_bytes() == original
+    assert (input_dir / 'branch0_1.csv').exists()
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_batch_run(tmp_path, input_dir, configuration, max_workers):
+    """批量处理返回每个文件的结果和汇总信息，失败的文件不影响其他文件"""
+    bad = input_dir / 'bad.csv'
+    pd.DataFrame({'其他': [1]}).to_csv(bad, index=False)
+    progress = []
+
+    processor = BatchProcessor(configuration, max_workers=max_workers, output_format='.csv')
+    result = processor.run([str(input_dir / 'branch*'), str(bad)], str(tmp_path / 'out'),
+                           progress_callback=lambda done, total, r: progress.append((done, total)))
+
+    assert [r.input_file_path.split('/')[-1] for r in result.results] == [
+        'branch0.csv', 'branch1.csv', 'branch2.xlsx', 'bad.csv']
+    assert [r.success for r in result.results] == [True, True, True, False]
+    assert result.succeeded == 3 and result.failed == 1
+    assert result.total_rows == 6
+    assert result.rows_per_second > 0
+    assert sorted(progress) == [(i, 4) for i in range(1, 5)]
+
+    output = pd.read_csv(tmp_path / 'out' / 'branch2.csv')
+    assert list(output.columns) == ['姓名', '年薪']
+    assert output['年薪'].tolist() == [12000, 24000, 36000]
+
+
+def test_invalid_output_format(configuration):
+    """不支持的输出格式立即报错"""
+    with pytest.raises(ValueError):
+        BatchProcessor(configuration, output_format='.json')
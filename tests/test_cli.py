@@ -0,0 +1,81 @@
+"""
+命令行入口测试
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.cli import main
+from src.models.data_model import DataConfiguration
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """保存只保留姓名字段的配置"""
+    config = DataConfiguration(original_headers=['姓名', '年龄'])
+    config.add_original_field('姓名', selected=True)
+    config.add_original_field('年龄', selected=False)
+    path = tmp_path / 'config.json'
+    config.save(str(path))
+    return path
+
+
+def test_configuration_save_and_load(config_path):
+    """配置保存为JSON后可以完整恢复"""
+    config = DataConfiguration.load(str(config_path))
+    assert config.get_selected_original_fields() == ['姓名']
+    assert config.is_field_name_exists('年龄')
+
+
+def test_cli_processes_files(tmp_path, config_path, capsys):
+    """命令行按配置处理输入文件并输出汇总"""
+    source = tmp_path / 'input.csv'
+    pd.DataFrame({'姓名': ['张三', '李四'], '年龄': [25, 30]}).to_csv(source, index=False)
+    output_dir = tmp_path / 'out'
+
+    exit_code = main([str(source), '-c', str(config_path), '-o', str(output_dir),
+                      '-f', 'xlsx', '-j', '1', '--json'])
+
+    assert exit_code == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary['succeeded'] == 1
+    assert summary['total_rows'] == 2
+    output = pd.read_excel(output_dir / 'input.xlsx')
+    assert list(output.columns) == ['姓名']
+
+
+def test_cli_reports_missing_inputs(tmp_path, config_path):
+    """没有匹配的输入文件时返回错误码"""
+    exit_code = main([str(tmp_path / '*.csv'), '-c', str(config_path), '-o', str(tmp_path)])
+    assert exit_code == 2
+
+
+def test_cli_does_not_import_qt():
+    """命令行入口不导入PySide6"""
+    code = ('import sys, src.cli, src.services.batch_processor; '
+            'print(any(name.startswith("PySide6") for name in sys.modules))')
+    output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+
+def test_cli_converts_parquet_to_feather(tmp_path, config_path):
+    """Parquet输入按配置选择字段后输出为Feather文件"""
+    pytest.importorskip('pyarrow')
+    source = tmp_path / 'input.parquet'
+    pd.DataFrame({'姓名': ['张三', '李四'], '年龄': [25, 30]}).to_parquet(source, index=False)
+    output_dir = tmp_path / 'out'
+
+    exit_code = main([str(source), '-c', str(config_path), '-o', str(output_dir),
+                      '-f', 'feather', '--compression', 'zstd', '-j', '1', '--json'])
+
+    assert exit_code == 0
+    output = pd.read_feather(output_dir / 'input.feather')
+    assert output['姓名'].tolist() == ['张三', '李四']
+    assert list(output.columns) == ['姓名']
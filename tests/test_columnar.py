@@ -0,0 +1,126 @@
+"""
+Parquet、Feather和Arrow IPC文件读写测试
+"""
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.services import columnar
+from src.services.columnar import ColumnarWriter, iter_batches, read_schema, read_table
+from src.services.export_service import ExportService
+from src.services.file_reader import (FileReadError, iter_file_chunks, read_columns, read_file,
+                                      read_preview)
+
+
+@pytest.fixture
+def sample_data():
+    """创建包含缺失值的测试数据"""
+    return pd.DataFrame({
+        '姓名': [f'员工{i}' for i in range(10)],
+        '城市': ['北京', '上海', None, '广州', '深圳'] * 2,
+        '薪资': [float(1000 * i) for i in range(10)],
+    })
+
+
+@pytest.fixture(params=['.parquet', '.feather', '.arrow'])
+def columnar_file(request, tmp_path, sample_data, monkeypatch):
+    """每个行组（记录批次）4行的测试文件"""
+    monkeypatch.setattr(columnar, 'DEFAULT_ROW_GROUP_SIZE', 4)
+    path = tmp_path / f'data{request.param}'
+    with ColumnarWriter(str(path)) as writer:
+        writer.write_frame(sample_data)
+    return path
+
+
+def test_round_trip(columnar_file, sample_data):
+    """写入后读取的数据与原数据一致"""
+    assert read_schema(str(columnar_file)) == (list(sample_data.columns), len(sample_data))
+    result = read_file(str(columnar_file))[0]
+    pd.testing.assert_frame_equal(result, sample_data, check_dtype=False)
+
+
+def test_read_projection(columnar_file, sample_data):
+    """只读取需要的列，并按指定顺序排列"""
+    result = read_columns(str(columnar_file), ['薪资', '姓名'])
+    assert list(result.columns) == ['薪资', '姓名']
+    assert result['姓名'].tolist() == sample_data['姓名'].tolist()
+
+    # 未选中任何列时仍保留行数
+    assert len(read_columns(str(columnar_file), [])) == len(sample_data)
+
+    with pytest.raises(FileReadError):
+        read_columns(str(columnar_file), ['不存在'])
+
+
+def test_iter_batches_by_row_group(columnar_file):
+    """按行组（记录批次）逐块读取"""
+    batches = list(iter_batches(str(columnar_file), ['姓名'], batch_size=4))
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+    assert batches[0].schema.names == ['姓名']
+
+    chunks = list(iter_file_chunks(str(columnar_file), columns=['城市'], chunksize=3))
+    assert sum(len(chunk) for chunk in chunks) == 10
+    assert all(list(chunk.columns) == ['城市'] for chunk in chunks)
+
+
+def test_read_preview_uses_metadata(columnar_file):
+    """预览只读取前几行，总行数来自文件元数据"""
+    preview, _, row_count = read_preview(str(columnar_file), rows=3)
+    assert len(preview) == 3
+    assert row_count == 10
+    assert len(read_table(str(columnar_file), nrows=0)) == 0
+
+
+@pytest.mark.parametrize('suffix, compression', [
+    ('.parquet', 'zstd'), ('.parquet', 'none'), ('.feather', 'zstd'), ('.arrow', 'none'),
+])
+def test_export_with_compression(tmp_path, sample_data, suffix, compression):
+    """导出列式文件时使用指定的压缩算法"""
+    output = tmp_path / f'out{suffix}'
+    rows = ExportService(compression=compression).write_data(sample_data, str(output))
+    assert rows == len(sample_data)
+    pd.testing.assert_frame_equal(read_file(str(output))[0], sample_data, check_dtype=False)
+
+    if suffix == '.parquet':
+        import pyarrow.parquet as pq
+        codec = pq.ParquetFile(output).metadata.row_group(0).column(0).compression
+        assert codec.lower() == ('uncompressed' if compression == 'none' else compression)
+
+
+def test_invalid_compression(tmp_path, sample_data):
+    """格式不支持的压缩算法在写入前报错，不留下输出文件"""
+    output = tmp_path / 'out.feather'
+    with pytest.raises(ValueError):
+        ExportService(compression='snappy').write_data(sample_data, str(output))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_chunks(tmp_path, sample_data):
+    """分块写入时每块写为一个行组"""
+    output = tmp_path / 'out.parquet'
+    chunks = [sample_data.iloc[:6], sample_data.iloc[6:]]
+    assert ExportService().write_chunks(iter(chunks), str(output)) == len(sample_data)
+
+    import pyarrow.parquet as pq
+    assert pq.ParquetFile(output).metadata.num_row_groups == 2
+    assert read_file(str(output))[0]['姓名'].tolist() == sample_data['姓名'].tolist()
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.feather'])
+def test_export_chunks_with_changing_types(tmp_path, suffix):
+    """后续数据块的类型不同时提升文件的类型：第一块全为空的列、整数变为浮点数或文本"""
+    chunks = [
+        pd.DataFrame({'备注': [float('nan')] * 2, '数量': [1, 2], '编号': [1, 2]}),
+        pd.DataFrame({'备注': ['加急', None], '数量': [2.5, 3.0], '编号': ['A3', 4]}),
+        pd.DataFrame({'备注': [float('nan'), '普通'], '数量': [4, 5], '编号': [5, 6]}),
+    ]
+    output = tmp_path / f'out{suffix}'
+    assert ExportService().write_chunks(iter(chunks), str(output)) == 6
+
+    result = read_file(str(output))[0]
+    assert result['备注'].fillna('').tolist() == ['', '', '加急', '', '', '普通']
+    assert result['数量'].tolist() == [1.0, 2.0, 2.5, 3.0, 4.0, 5.0]
+    assert result['编号'].tolist() == ['1', '2', 'A3', '4', '5', '6']
+    # 重写时的临时文件已删除
+    assert [path.name for path in tmp_path.iterdir()] == [output.name]
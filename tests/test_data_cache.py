@@ -0,0 +1,95 @@
+"""
+磁盘缓存测试
+"""
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.services.data_cache import DataCache
+from src.services.file_reader import read_columns, read_file
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    """创建测试用的CSV文件"""
+    path = tmp_path / 'source.csv'
+    pd.DataFrame({
+        '姓名': ['张三', '李四', '王五'],
+        '薪资': [8000, 12000, 15000]
+    }).to_csv(path, index=False, encoding='gbk')
+    return str(path)
+
+
+def test_read_file_uses_cache(tmp_path, source_file):
+    """第二次读取命中缓存，结果与解析结果一致"""
+    cache = DataCache(cache_dir=str(tmp_path / 'cache'))
+
+    parsed, encoding = read_file(source_file, cache=cache)
+    assert cache.get_size() > 0
+
+    key = cache.make_key(source_file, {'csv_engine': 'auto', 'excel_engine': 'auto'})
+    cached, cached_encoding = cache.get(key)
+
+    pd.testing.assert_frame_equal(cached, parsed)
+    assert cached_encoding == encoding == 'gbk'
+
+
+def test_cache_invalidated_when_file_changes(tmp_path, source_file):
+    """源文件修改后缓存键变化"""
+    key = DataCache.make_key(source_file)
+
+    with open(source_file, 'a', encoding='gbk') as f:
+        f.write('赵六,9000\n')
+
+    assert DataCache.make_key(source_file) != key
+
+
+def test_read_columns_skips_cache(tmp_path, source_file, monkeypatch):
+    """只读取部分列时不计算缓存键（需要读取整个文件），也不写入缓存"""
+    cache = DataCache(cache_dir=str(tmp_path / 'cache'))
+
+    def fail(*args, **kwargs):
+        raise AssertionError('不应计算缓存键')
+
+    monkeypatch.setattr(DataCache, 'make_key', fail)
+    data = read_columns(source_file, ['薪资'], cache=cache)
+
+    assert list(data.columns) == ['薪资']
+    assert data['薪资'].tolist() == [8000, 12000, 15000]
+    assert cache.get_size() == 0
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """超过大小上限时淘汰最久未使用的缓存"""
+    cache = DataCache(cache_dir=str(tmp_path / 'cache'))
+    data = pd.DataFrame({'值': range(1000)})
+
+    cache.put('old', data)
+    cache.put('new', data)
+    entry_size = cache.get_size() // 2
+    old_path = cache.cache_dir / 'old.arrow'
+    os.utime(old_path, (0, 0))
+
+    cache.max_size = entry_size * 2
+    cache.put('newest', data)
+
+    assert cache.get('old') is None
+    assert cache.get('new') is not None
+    assert cache.get('newest') is not None
+
+
+def test_concurrent_put_same_key(tmp_path):
+    """多个线程同时写入同一缓存键时都能成功，不留下临时文件"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = DataCache(cache_dir=str(tmp_path / 'cache'))
+    data = pd.DataFrame({'值': range(100000)})
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: cache.put('same', data), range(8)))
+
+    assert all(results)
+    assert [path.name for path in cache.cache_dir.iterdir()] == ['same.arrow']
+    assert cache.get('same')[0]['值'].tolist() == list(range(100000))
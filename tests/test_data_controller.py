@@ -0,0 +1,312 @@
+"""
+数据控制器测试，使用offscreen平台运行Qt
+"""
+import inspect
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('PySide6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+
+from src.controllers.data_controller import DataController
+from src.models.data_model import CustomField
+from src.services import data_cache, data_service, export_service
+from src.services.file_reader import DEFAULT_PREVIEW_ROWS, read_file
+
+
+def wait_until(qapp, condition, timeout=10.0):
+    """处理Qt事件直到条件成立，用于等待后台任务和定时器"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('等待超时')
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def record(signal):
+    """记录信号每次发出时的参数"""
+    emitted = []
+    signal.connect(lambda *args: emitted.append(args))
+    return emitted
+
+
+def gate_progress(monkeypatch, target, name):
+    """
+    第一次报告进度后暂停后台任务，直到测试放行，用于在确定的位置取消
+
+    Returns:
+        Tuple[threading.Event, threading.Event]: 已暂停事件和放行事件
+    """
+    paused, release = threading.Event(), threading.Event()
+    original = getattr(target, name)
+
+    def gated(*args, **kwargs):
+        arguments = inspect.signature(original).bind(*args, **kwargs).arguments
+        progress_callback = arguments.pop('progress_callback')
+
+        def report(value):
+            progress_callback(value)
+            paused.set()
+            release.wait(10)
+        return original(progress_callback=report, **arguments)
+
+    monkeypatch.setattr(target, name, gated)
+    return paused, release
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """整个模块共用一个QApplication"""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def controller(qapp, tmp_path, monkeypatch):
+    """缓存写入临时目录的数据控制器"""
+    monkeypatch.setattr(data_cache, 'DEFAULT_CACHE_DIR', tmp_path / 'cache')
+    return DataController()
+
+
+@pytest.fixture
+def sample_data():
+    """创建测试数据"""
+    return pd.DataFrame({
+        '姓名': [f'员工{i}' for i in range(120)],
+        '城市': ['北京', '上海', '广州'] * 40,
+        '薪资': [1000 * (i % 7) for i in range(120)],
+    })
+
+
+@pytest.mark.parametrize('output_suffix', ['.csv', '.xlsx', '.parquet'])
+def test_streaming_export_from_xlsx(controller, tmp_path, sample_data, monkeypatch, output_suffix):
+    """源文件超过阈值时从单个工作表的xlsx文件分块流式导出"""
+    if output_suffix == '.parquet':
+        pytest.importorskip('pyarrow')
+    source = tmp_path / 'source.xlsx'
+    sample_data.to_excel(source, index=False)
+    monkeypatch.setattr(DataController, 'STREAMING_THRESHOLD_BYTES', 1)
+    monkeypatch.setattr(DataController, 'STREAMING_CHUNK_SIZE', 50)
+
+    assert controller.open_file(str(source))
+    assert controller.get_selected_sheets() == ['Sheet1']
+    controller.set_field_selection('薪资', False)
+    controller.flush_pending_updates()
+
+    output = tmp_path / f'out{output_suffix}'
+    result = controller.process_data(str(output))
+
+    assert result.success, result.error_message
+    assert result.processed_rows == len(sample_data)
+    assert not controller.data_service.is_fully_loaded()
+    written, _ = read_file(str(output))
+    assert list(written.columns) == ['姓名', '城市']
+    assert written['姓名'].tolist() == sample_data['姓名'].tolist()
+
+
+def test_open_file_loads_full_data_in_background(controller, qapp, tmp_path, sample_data):
+    """打开文件时先读取表头，再在后台加载完整数据并优化列类型，字段选择保持不变"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+    progress = record(controller.load_progress)
+    loaded = record(controller.file_loaded)
+
+    assert controller.open_file(str(source))
+    assert controller.get_headers() == ['姓名', '城市', '薪资']
+    assert controller.is_loading()
+    controller.set_field_selection('城市', False)
+
+    wait_until(qapp, lambda: not controller.is_loading())
+    assert controller.data_service.is_fully_loaded()
+    assert progress and progress[-1] == (100,)
+    assert loaded == [(str(source),), (str(source),)]
+    assert controller.get_selected_field_names() == ['姓名', '薪资']
+
+    info = controller.get_data_info()
+    assert info['dtypes_optimized']
+    assert info['memory_after'] < info['memory_before']
+
+
+def test_open_file_peeks_headers(controller, qapp, tmp_path, sample_data, monkeypatch):
+    """只读取表头和预览行即可选择字段，不解析整个文件"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('不应读取整个文件')
+
+    monkeypatch.setattr(data_service, 'read_file', fail)
+    controller.defer_full_load = True
+    headers = record(controller.headers_updated)
+    previews = record(controller.preview_updated)
+
+    assert controller.open_file(str(source))
+    assert headers == [(['姓名', '城市', '薪资'],)]
+    assert [selection.field_name for selection in controller.get_field_selections()] == \
+        ['姓名', '城市', '薪资']
+    assert not controller.get_data_info()['fully_loaded']
+    assert not controller.is_loading()
+
+    wait_until(qapp, lambda: previews)
+    [(preview,)] = previews
+    assert len(preview) == DEFAULT_PREVIEW_ROWS
+    assert preview['姓名'].tolist() == sample_data['姓名'].tolist()[:DEFAULT_PREVIEW_ROWS]
+
+
+def test_large_file_is_not_loaded(controller, tmp_path, sample_data, monkeypatch):
+    """达到流式导出大小的文件只读取表头，导出时从源文件读取"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+    monkeypatch.setattr(DataController, 'STREAMING_THRESHOLD_BYTES', source.stat().st_size)
+
+    assert controller.open_file(str(source))
+    assert not controller.is_loading()
+    assert not controller.data_service.is_fully_loaded()
+
+
+def test_cancel_load_keeps_preview(controller, qapp, tmp_path, sample_data, monkeypatch):
+    """取消后台加载后保留已读取的表头，导出时从源文件读取"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+    paused, release = gate_progress(monkeypatch, data_service, 'read_file')
+    cancelled = record(controller.load_cancelled)
+    loaded = record(controller.file_loaded)
+
+    assert controller.open_file(str(source))
+    assert paused.wait(10)
+    controller.cancel_load()
+    release.set()
+    wait_until(qapp, lambda: not controller.is_loading())
+
+    assert cancelled == [(str(source),)]
+    assert loaded == [(str(source),)]
+    assert not controller.data_service.is_fully_loaded()
+    assert controller.get_headers() == ['姓名', '城市', '薪资']
+
+    result = controller.process_data(str(tmp_path / 'out.csv'))
+    assert result.success and result.processed_rows == len(sample_data)
+
+
+def test_invalid_full_load_keeps_preview(controller, qapp, tmp_path, sample_data, monkeypatch):
+    """完整数据验证失败时报告错误，保留表头预览，导出仍从源文件读取"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+    invalid = pd.DataFrame([[1, 2, 3]], columns=['姓名', '姓名', '薪资'])
+    monkeypatch.setattr(data_service, 'read_file', lambda *args, **kwargs: (invalid, 'utf-8'))
+    errors = record(controller.error_occurred)
+
+    assert controller.open_file(str(source))
+    peeked = controller.get_data_info()
+    wait_until(qapp, lambda: not controller.is_loading())
+    controller.flush_pending_updates()
+
+    assert len(errors) == 1 and '重复' in errors[0][0]
+    assert not controller.data_service.is_fully_loaded()
+    assert controller.get_data_info() == peeked
+    assert len(controller.generate_preview_data(None)) == DEFAULT_PREVIEW_ROWS
+
+    result = controller.process_data(str(tmp_path / 'out.csv'))
+    assert result.success and result.processed_rows == len(sample_data)
+
+
+@pytest.fixture
+def loaded_controller(controller, qapp, tmp_path, sample_data):
+    """已在后台加载完整数据的控制器"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+    assert controller.open_file(str(source))
+    wait_until(qapp, lambda: not controller.is_loading())
+    controller.flush_pending_updates()
+    return controller
+
+
+def test_export_async(loaded_controller, qapp, tmp_path, sample_data, monkeypatch):
+    """后台导出报告进度，完成后发出一次processing_completed"""
+    monkeypatch.setattr(export_service, 'EXPORT_CHUNK_SIZE', 50)
+    progress = record(loaded_controller.export_progress)
+    completed = record(loaded_controller.processing_completed)
+    output = tmp_path / 'out.csv'
+
+    assert loaded_controller.export_async(str(output))
+    assert not loaded_controller.export_async(str(tmp_path / 'other.csv'))
+    wait_until(qapp, lambda: not loaded_controller.is_exporting())
+
+    [(result,)] = completed
+    assert result.success and result.processed_rows == len(sample_data)
+    assert progress == [(50, 120), (100, 120), (120, 120)]
+    assert len(read_file(str(output))[0]) == len(sample_data)
+
+
+def test_cancel_export_keeps_existing_file(loaded_controller, qapp, tmp_path, monkeypatch):
+    """取消后台导出时目标文件保持原样，不留下临时文件"""
+    monkeypatch.setattr(export_service, 'EXPORT_CHUNK_SIZE', 50)
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+    output = output_dir / 'out.csv'
+    output.write_text('原有内容')
+    paused, release = gate_progress(monkeypatch, loaded_controller.export_service, 'write_data')
+    completed = record(loaded_controller.processing_completed)
+
+    assert loaded_controller.export_async(str(output))
+    assert paused.wait(10)
+    loaded_controller.cancel_export()
+    release.set()
+    wait_until(qapp, lambda: not loaded_controller.is_exporting())
+
+    [(result,)] = completed
+    assert result.cancelled and not result.success
+    assert output.read_text() == '原有内容'
+    assert list(output_dir.iterdir()) == [output]
+
+
+@pytest.mark.parametrize('threshold, streaming', [(10 ** 9, False), (1, True)])
+def test_streaming_threshold(controller, qapp, tmp_path, sample_data, monkeypatch,
+                             threshold, streaming):
+    """源文件达到阈值时分块流式导出，否则从内存中的数据导出"""
+    source = tmp_path / 'source.csv'
+    sample_data.to_csv(source, index=False)
+    monkeypatch.setattr(DataController, 'STREAMING_THRESHOLD_BYTES', threshold)
+    monkeypatch.setattr(DataController, 'STREAMING_CHUNK_SIZE', 50)
+    assert controller.open_file(str(source))
+    wait_until(qapp, lambda: not controller.is_loading())
+
+    chunks = []
+    iter_chunks = controller.data_service.iter_chunks
+    monkeypatch.setattr(controller.data_service, 'iter_chunks',
+                        lambda **kwargs: (chunks.append(len(chunk)) or chunk
+                                          for chunk in iter_chunks(**kwargs)))
+
+    result = controller.process_data(str(tmp_path / 'out.csv'))
+    assert result.success and result.processed_rows == len(sample_data)
+    assert controller.data_service.is_fully_loaded() != streaming
+    assert chunks == ([50, 50, 20] if streaming else [])
+
+
+def test_configuration_changes_are_debounced(loaded_controller, qapp):
+    """合并窗口内的多次配置变更只发出一次configuration_changed并只刷新一次预览"""
+    changed = record(loaded_controller.configuration_changed)
+    previews = record(loaded_controller.preview_updated)
+
+    loaded_controller.set_field_selection('城市', False)
+    loaded_controller.set_field_selection('薪资', False)
+    loaded_controller.add_custom_field(CustomField(name='部门', default_value='研发'))
+    loaded_controller.set_field_selection('薪资', True)
+    assert changed == [] and previews == []
+    assert loaded_controller.has_pending_updates()
+
+    wait_until(qapp, lambda: not loaded_controller.has_pending_updates())
+    assert len(changed) == 1
+    [(preview,)] = previews
+    assert list(preview.columns) == ['姓名', '薪资', '部门']
+
+    # 导出前立即执行等待中的刷新
+    loaded_controller.set_field_selection('姓名', False)
+    loaded_controller.flush_pending_updates()
+    assert len(changed) == 2 and len(previews) == 2
+    assert not loaded_controller.has_pending_updates()
@@ -0,0 +1,62 @@
+"""
+数据模型测试
+"""
+import pytest
+
+from src.models.data_model import CustomField, DataConfiguration
+
+
+@pytest.fixture
+def configuration():
+    """创建包含原始字段和自定义字段的配置"""
+    config = DataConfiguration(original_headers=['姓名', '年龄', '城市'])
+    for header in config.original_headers:
+        config.add_original_field(header, selected=True)
+    config.add_custom_field(CustomField(name='备注', default_value='无'))
+    return config
+
+
+def test_set_field_selections(configuration):
+    """批量设置字段选择状态"""
+    applied = configuration.set_field_selections({'姓名': False, '备注': False, '不存在': True})
+
+    assert applied == 2
+    assert configuration.get_selected_original_fields() == ['年龄', '城市']
+    assert configuration.get_selected_custom_fields() == []
+
+
+def test_set_field_selections_empty(configuration):
+    """空映射不改变任何字段"""
+    assert configuration.set_field_selections({}) == 0
+    assert configuration.get_all_selected_field_names() == ['姓名', '年龄', '城市', '备注']
+
+
+def test_index_tracks_custom_field_removal(configuration):
+    """移除自定义字段后名称索引同步更新"""
+    assert configuration.is_field_name_exists('备注')
+    assert configuration.remove_custom_field('备注')
+
+    assert not configuration.is_field_name_exists('备注')
+    assert configuration.get_field_selection('备注') is None
+    assert not configuration.set_field_selection('备注', True)
+    assert not configuration.remove_custom_field('备注')
+
+    # 原始字段不能作为自定义字段移除
+    assert not configuration.remove_custom_field('姓名')
+    assert configuration.get_field_selection('姓名') is not None
+
+
+def test_index_after_clear_and_from_dict(configuration):
+    """清除和反序列化后名称索引与字段列表一致"""
+    restored = DataConfiguration.from_dict(configuration.to_dict())
+
+    assert restored == configuration
+    assert restored.is_field_name_exists('年龄')
+    assert restored.set_field_selection('备注', False)
+    assert restored.get_selected_custom_fields() == []
+    with pytest.raises(ValueError):
+        restored.add_custom_field(CustomField(name='城市'))
+
+    configuration.clear()
+    assert not configuration.is_field_name_exists('姓名')
+    assert configuration.get_field_selection('姓名') is None
@@ -0,0 +1,98 @@
+"""
+列类型优化测试
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.dtype_optimizer import memory_usage, optimize_dtypes
+from src.services.formula import compile_formula
+
+
+@pytest.fixture
+def sample_data():
+    """包含重复文本、较小整数和带缺失值整数的测试数据"""
+    rows = 1000
+    return pd.DataFrame({
+        '姓名': [f'员工{i}' for i in range(rows)],
+        '城市': np.array(['北京', '上海', '广州', '深圳'], dtype=object)[np.arange(rows) % 4],
+        '年龄': 20 + np.arange(rows) % 40,
+        '余额': -np.arange(rows) * 100,
+        '奖金': [None if i % 10 == 0 else float(i * 100) for i in range(rows)],
+        '系数': [0.1 * i for i in range(rows)],
+        '备注': [1 if i % 2 else '无' for i in range(rows)],
+    })
+
+
+def test_optimize_dtypes(sample_data):
+    """数值缩小为最小类型，重复较多的文本转换为分类类型，值保持不变"""
+    result = optimize_dtypes(sample_data)
+
+    assert result['城市'].dtype == 'category'
+    assert result['年龄'].dtype == np.uint8
+    assert result['余额'].dtype == np.int32
+    assert result['奖金'].dtype == np.float32
+    # 带小数的浮点数和混合类型的列保持不变
+    assert result['系数'].dtype == np.float64
+    assert result['备注'].dtype == object
+    assert not isinstance(result['姓名'].dtype, pd.CategoricalDtype)
+
+    pd.testing.assert_frame_equal(result.astype(object), sample_data.astype(object),
+                                  check_dtype=False)
+    assert memory_usage(result) < memory_usage(sample_data)
+    # 原数据不会被修改
+    assert sample_data['年龄'].dtype == np.int64
+
+
+def test_optimized_export_is_unchanged(sample_data):
+    """优化前后导出的CSV内容相同"""
+    before, after = io.StringIO(), io.StringIO()
+    sample_data.to_csv(before, index=False)
+    optimize_dtypes(sample_data).to_csv(after, index=False)
+    assert before.getvalue() == after.getvalue()
+
+
+def test_arrow_columns_keep_storage():
+    """pyarrow存储的列优化后仍使用pyarrow存储"""
+    pytest.importorskip('pyarrow')
+    data = pd.DataFrame({
+        '数量': pd.array([1, 2, None, 4, 5], dtype='int64[pyarrow]'),
+        '部门': pd.array(['销售', '研发', '销售', '销售', None], dtype='string[pyarrow]'),
+    })
+    result = optimize_dtypes(data)
+    assert str(result['数量'].dtype) == 'uint8[pyarrow]'
+    assert result['部门'].dtype == 'category'
+    assert result['数量'].tolist() == data['数量'].tolist()
+
+
+def test_formula_on_optimized_columns(sample_data):
+    """公式在计算前恢复类型，缩小后的整数不会溢出，分类列可以拼接文本"""
+    result = optimize_dtypes(sample_data)
+    assert compile_formula('[年龄] * 100').evaluate(result).tolist() == \
+        (sample_data['年龄'] * 100).tolist()
+    assert compile_formula('[城市] + "市"').evaluate(result).iloc[0] == '北京市'
+
+
+def test_data_service_reports_memory(tmp_path, sample_data):
+    """加载完成后在数据信息中报告优化前后的内存占用"""
+    from src.services.data_service import DataService
+
+    path = tmp_path / 'data.csv'
+    sample_data.to_csv(path, index=False)
+
+    service = DataService(csv_engine='c', optimize_dtypes=True)
+    assert service.get_data_info()['memory_after'] is None
+    assert service.load_file(str(path))
+
+    info = service.get_data_info()
+    assert info['dtypes_optimized']
+    assert info['memory_after'] < info['memory_before']
+    assert service.get_full_data(copy=False)['城市'].dtype == 'category'
+
+    service = DataService(csv_engine='c')
+    assert service.load_file(str(path))
+    info = service.get_data_info()
+    assert not info['dtypes_optimized']
+    assert info['memory_after'] == info['memory_before']
@@ -0,0 +1,115 @@
+"""
+导出服务测试
+"""
+import pandas as pd
+import pytest
+
+from src.services import export_service
+from src.services.export_service import ExportCancelledError, ExportError, ExportService
+from src.services.file_reader import iter_file_chunks
+
+
+@pytest.fixture
+def sample_data():
+    """创建测试数据"""
+    return pd.DataFrame({
+        '姓名': ['张三', '李四', '王五', '赵六', '钱七'],
+        '年龄': [25, 30, None, 40, 45],
+        '城市': ['北京', '上海', '广州', '深圳', '杭州']
+    })
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_write_chunks_matches_write_data(tmp_path, sample_data, suffix):
+    """分块写入与整体写入的结果一致"""
+    service = ExportService()
+    whole_path = tmp_path / f'whole{suffix}'
+    chunked_path = tmp_path / f'chunked{suffix}'
+
+    service.write_data(sample_data, str(whole_path))
+    chunks = (sample_data.iloc[i:i + 2] for i in range(0, len(sample_data), 2))
+    rows = service.write_chunks(chunks, str(chunked_path))
+
+    read = pd.read_csv if suffix == '.csv' else pd.read_excel
+    assert rows == len(sample_data)
+    pd.testing.assert_frame_equal(read(whole_path), read(chunked_path))
+
+
+def test_write_chunks_rejects_mismatched_columns(tmp_path, sample_data):
+    """列不一致的数据块无法追加写入，也不会留下输出文件"""
+    chunks = [sample_data[['姓名']], sample_data[['城市']]]
+    with pytest.raises(ExportError):
+        ExportService().write_chunks(chunks, str(tmp_path / 'out.csv'))
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_write_data_reports_progress(tmp_path, sample_data, suffix, monkeypatch):
+    """指定进度回调时分块写入，并报告累计写入的行数"""
+    monkeypatch.setattr(export_service, 'EXPORT_CHUNK_SIZE', 2)
+    path = tmp_path / f'out{suffix}'
+    progress = []
+
+    rows = ExportService().write_data(sample_data, str(path), progress_callback=progress.append)
+
+    read = pd.read_csv if suffix == '.csv' else pd.read_excel
+    assert rows == len(sample_data)
+    assert progress == [2, 4, 5]
+    pd.testing.assert_frame_equal(read(path), sample_data)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_cancelled_export_keeps_existing_file(tmp_path, sample_data, suffix, monkeypatch):
+    """取消导出时目标文件保持原样，临时文件被删除"""
+    monkeypatch.setattr(export_service, 'EXPORT_CHUNK_SIZE', 2)
+    path = tmp_path / f'out{suffix}'
+    path.write_text('原有内容')
+    progress = []
+
+    with pytest.raises(ExportCancelledError):
+        ExportService().write_data(sample_data, str(path), progress_callback=progress.append,
+                                   is_cancelled=lambda: len(progress) >= 2)
+
+    assert progress == [2, 4]
+    assert path.read_text() == '原有内容'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_iter_file_chunks_projects_columns(tmp_path, sample_data, suffix):
+    """分块读取只返回指定的列，并保持列顺序"""
+    path = tmp_path / f'source{suffix}'
+    if suffix == '.csv':
+        sample_data.to_csv(path, index=False)
+    else:
+        sample_data.to_excel(path, index=False)
+
+    chunks = list(iter_file_chunks(str(path), columns=['城市', '姓名'], chunksize=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    combined = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(combined, sample_data[['城市', '姓名']])
+
+
+def test_write_sheets_excel(tmp_path, sample_data):
+    """Excel文件中每个工作表写为一个工作表，不合法的名称会被替换"""
+    output = tmp_path / 'sheets.xlsx'
+
+    paths = ExportService().write_sheets({'北京': sample_data, 'a/b': sample_data.head(2)},
+                                         str(output))
+
+    assert paths == [str(output)]
+    written = pd.read_excel(output, sheet_name=None)
+    assert list(written) == ['北京', 'a_b']
+    assert len(written['a_b']) == 2
+
+
+def test_write_sheets_csv(tmp_path, sample_data):
+    """CSV文件每个工作表写为一个文件"""
+    output = tmp_path / 'sheets.csv'
+
+    paths = ExportService().write_sheets({'北京': sample_data, '上海': sample_data.head(1)},
+                                         str(output))
+
+    assert [p.split('/')[-1] for p in paths] == ['sheets_北京.csv', 'sheets_上海.csv']
+    assert len(pd.read_csv(paths[1])) == 1
@@ -0,0 +1,97 @@
+"""
+字段选择列表模型测试
+"""
+import pytest
+
+pytest.importorskip('PySide6')
+
+from PySide6.QtCore import Qt
+
+from src.models.data_model import CustomField, DataConfiguration
+from src.views.field_list_model import FieldListModel
+
+
+@pytest.fixture
+def configuration():
+    """创建包含三个原始字段的配置"""
+    config = DataConfiguration(original_headers=['姓名', '年龄', '城市'])
+    for header in config.original_headers:
+        config.add_original_field(header, selected=True)
+    return config
+
+
+@pytest.fixture
+def model(configuration):
+    """创建已加载字段的模型，并记录模型信号"""
+    model = FieldListModel()
+    model.update_fields(configuration.field_selections)
+    model.events = []
+    model.dataChanged.connect(
+        lambda top, bottom, roles=None: model.events.append(('changed', top.row(), bottom.row())))
+    model.rowsInserted.connect(
+        lambda parent, first, last: model.events.append(('inserted', first, last)))
+    model.rowsRemoved.connect(
+        lambda parent, first, last: model.events.append(('removed', first, last)))
+    model.modelReset.connect(lambda: model.events.append(('reset',)))
+    return model
+
+
+def test_update_only_touches_changed_rows(model, configuration):
+    """只有选中状态变化的行发出dataChanged"""
+    configuration.set_field_selection('年龄', False)
+    model.update_fields(configuration.field_selections)
+
+    assert model.events == [('changed', 1, 1)]
+    assert model.data(model.index(1), Qt.CheckStateRole) == Qt.Unchecked
+
+    # 状态未变化时不发出任何信号
+    model.events.clear()
+    model.update_fields(configuration.field_selections)
+    assert model.events == []
+
+
+def test_add_and_remove_custom_field(model, configuration):
+    """增删自定义字段时只插入或移除对应的行"""
+    configuration.add_custom_field(CustomField(name='备注'))
+    model.update_fields(configuration.field_selections)
+    assert model.events == [('inserted', 3, 3)]
+    assert model.data(model.index(3)) == '🔧 备注'
+
+    model.events.clear()
+    configuration.remove_custom_field('备注')
+    model.update_fields(configuration.field_selections)
+    assert model.events == [('removed', 3, 3)]
+    assert model.rowCount() == 3
+
+
+def test_new_headers_reset_model(model):
+    """字段整体替换时重置模型"""
+    config = DataConfiguration(original_headers=['编号', '金额'])
+    for header in config.original_headers:
+        config.add_original_field(header)
+    model.update_fields(config.field_selections)
+
+    assert model.events == [('reset',)]
+    assert [model.field_name(row) for row in range(model.rowCount())] == ['编号', '金额']
+
+
+def test_user_toggle_emits_selection_changed(model, configuration):
+    """用户勾选只发出一次选择变更，随后的同步更新不再发出信号"""
+    toggled = []
+    model.selection_changed.connect(lambda name, selected: toggled.append((name, selected)))
+
+    assert model.setData(model.index(0), Qt.Unchecked, Qt.CheckStateRole)
+    assert toggled == [('姓名', False)]
+
+    configuration.set_field_selection('姓名', False)
+    model.events.clear()
+    model.update_fields(configuration.field_selections)
+    assert model.events == []
+
+
+def test_apply_bulk_selection(model):
+    """批量反选返回全部字段的新状态"""
+    selections = model.apply_bulk_selection(lambda checked: not checked)
+
+    assert selections == {'姓名': False, '年龄': False, '城市': False}
+    assert model.events == [('changed', 0, 2)]
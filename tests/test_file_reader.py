@@ -0,0 +1,233 @@
+"""
+文件读取工具测试
+"""
+import pandas as pd
+import pytest
+
+from src.services.file_reader import (
+    SHEET_COLUMN, FileReadError, combine_sheets, detect_encoding, list_sheets,
+    ENCODING_SAMPLE_SIZE, iter_file_chunks, read_columns, read_file, read_preview, read_sheets,
+    resolve_csv_engine
+)
+
+
+@pytest.fixture
+def wide_data():
+    """创建较宽的测试数据"""
+    return pd.DataFrame({f'列{i}': range(i, i + 20) for i in range(30)})
+
+
+def _write(data, path):
+    """按扩展名写入测试文件"""
+    if path.suffix == '.csv':
+        data.to_csv(path, index=False)
+    else:
+        data.to_excel(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_read_columns_only_returns_selected(tmp_path, wide_data, suffix):
+    """只读取选中的列，并按选择顺序排列"""
+    path = _write(wide_data, tmp_path / f'wide{suffix}')
+
+    data = read_columns(path, ['列7', '列2'])
+
+    pd.testing.assert_frame_equal(data, wide_data[['列7', '列2']], check_dtype=False)
+
+
+def test_read_columns_without_selection_keeps_rows(tmp_path, wide_data):
+    """未选择任何列时仍保留行数"""
+    path = _write(wide_data, tmp_path / 'wide.csv')
+
+    data = read_columns(path, [])
+
+    assert len(data) == len(wide_data)
+    assert list(data.columns) == []
+
+
+def test_read_columns_missing_column(tmp_path, wide_data):
+    """读取不存在的列时抛出FileReadError"""
+    path = _write(wide_data, tmp_path / 'wide.csv')
+
+    with pytest.raises(FileReadError):
+        read_columns(path, ['不存在'])
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.xlsx'])
+def test_read_preview_reads_first_rows(tmp_path, wide_data, suffix):
+    """预览只读取前几行"""
+    path = _write(wide_data, tmp_path / f'wide{suffix}')
+
+    preview, _, row_count = read_preview(path, rows=3)
+
+    pd.testing.assert_frame_equal(preview, wide_data.head(3))
+    assert row_count == (len(wide_data) if suffix == '.xlsx' else None)
+
+
+@pytest.mark.parametrize('encoding, expected', [
+    ('utf-8', 'utf-8'),
+    ('utf-8-sig', 'utf-8-sig'),
+    ('gbk', 'gbk'),
+])
+def test_detect_encoding(tmp_path, encoding, expected):
+    """根据字节顺序标记和样本检测编码"""
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'城市': ['北京', '上海'] * 50}).to_csv(path, index=False, encoding=encoding)
+
+    assert detect_encoding(str(path)) == expected
+
+
+def test_detect_encoding_ignores_truncated_sample(tmp_path):
+    """样本在多字节字符中间截断时仍能识别utf-8"""
+    path = tmp_path / 'data.csv'
+    path.write_bytes('北京'.encode('utf-8') * 100)
+
+    assert detect_encoding(str(path), sample_size=4) == 'utf-8'
+
+
+def test_read_file_reports_detected_encoding(tmp_path):
+    """读取CSV时返回检测到的编码，并正确解析列名"""
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'城市': ['北京', '上海']}).to_csv(path, index=False, encoding='utf-8-sig')
+
+    data, encoding = read_file(str(path))
+
+    assert encoding == 'utf-8-sig'
+    assert list(data.columns) == ['城市']
+
+
+def test_resolve_csv_engine_rejects_unknown():
+    """不支持的引擎名称抛出ValueError"""
+    with pytest.raises(ValueError):
+        resolve_csv_engine('python')
+
+
+def test_read_file_with_pyarrow_engine(tmp_path):
+    """pyarrow引擎生成Arrow类型的列，结果与C引擎一致"""
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'城市': ['北京', '上海'], '人数': [1, 2]}).to_csv(path, index=False, encoding='gbk')
+
+    arrow_data, _ = read_file(str(path), csv_engine='pyarrow')
+    c_data, _ = read_file(str(path), csv_engine='c')
+
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in arrow_data.dtypes)
+    assert arrow_data.astype(object).equals(c_data.astype(object))
+
+
+@pytest.mark.parametrize('engine', ['pyarrow', 'c'])
+def test_duplicate_and_blank_headers_match_preview(tmp_path, engine):
+    """重复和空白的列名与表头预览一样改写为a.1和Unnamed: N"""
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    path = tmp_path / 'duplicate.csv'
+    path.write_text('姓名,a,a,,城市\n张三,1,2,3,北京\n', encoding='utf-8')
+
+    preview, _, _ = read_preview(str(path))
+    data, _ = read_file(str(path), csv_engine=engine)
+    assert list(data.columns) == list(preview.columns) == ['姓名', 'a', 'a.1', 'Unnamed: 3', '城市']
+    assert read_columns(str(path), ['a.1', '城市'], csv_engine=engine).iloc[0].tolist() == [2, '北京']
+
+
+@pytest.fixture
+def gbk_after_ascii_prefix(tmp_path):
+    """GBK编码的CSV文件，编码检测样本内只有ASCII字符"""
+    path = tmp_path / 'late_gbk.csv'
+    prefix = [b'city,count'] + [b'abc,1'] * (ENCODING_SAMPLE_SIZE // 5 + 100)
+    lines = prefix + ['北京,2'.encode('gbk'), '上海,3'.encode('gbk')]
+    path.write_bytes(b'\n'.join(lines) + b'\n')
+    assert len(b'\n'.join(prefix)) > ENCODING_SAMPLE_SIZE
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ['pyarrow', 'c'])
+def test_read_file_retries_encoding_after_sample(gbk_after_ascii_prefix, engine):
+    """样本之后出现GBK字符时改用GBK解码，而不是读为二进制"""
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    data, encoding = read_file(gbk_after_ascii_prefix, csv_engine=engine)
+    assert encoding == 'gbk'
+    assert data['city'].tolist()[-2:] == ['北京', '上海']
+
+    assert read_columns(gbk_after_ascii_prefix, ['city'], csv_engine=engine)['city'].iloc[-1] == '上海'
+
+
+def test_iter_file_chunks_validates_encoding(gbk_after_ascii_prefix):
+    """分块读取前用整个文件验证编码，预览检测到的编码不完整时也能正确解码"""
+    _, preview_encoding, _ = read_preview(gbk_after_ascii_prefix)
+    assert preview_encoding == 'utf-8'
+
+    chunks = list(iter_file_chunks(gbk_after_ascii_prefix, chunksize=5000,
+                                   encoding=preview_encoding))
+    assert pd.concat(chunks)['city'].tolist()[-2:] == ['北京', '上海']
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """创建包含三个工作表的工作簿，第三个工作表多一列"""
+    path = tmp_path / 'branches.xlsx'
+    sheets = {
+        '北京': pd.DataFrame({'姓名': ['张三', '李四'], '薪资': [100, 200]}),
+        '上海': pd.DataFrame({'姓名': ['王五'], '薪资': [300]}),
+        '广州': pd.DataFrame({'姓名': ['赵六'], '薪资': [400], '备注': ['新']}),
+    }
+    with pd.ExcelWriter(path) as writer:
+        for name, data in sheets.items():
+            data.to_excel(writer, sheet_name=name, index=False)
+    return str(path), sheets
+
+
+def test_list_sheets(tmp_path, workbook, wide_data):
+    """列出工作表名称，CSV文件没有工作表"""
+    path, sheets = workbook
+
+    assert list_sheets(path) == list(sheets)
+    assert list_sheets(_write(wide_data, tmp_path / 'wide.csv')) == []
+
+
+def test_read_sheets_keeps_requested_order(workbook):
+    """按请求的顺序返回各工作表的数据"""
+    path, sheets = workbook
+    progress = []
+
+    result = read_sheets(path, ['广州', '北京'], progress_callback=progress.append)
+
+    assert list(result) == ['广州', '北京']
+    pd.testing.assert_frame_equal(result['北京'], sheets['北京'])
+    assert progress[0] == 0 and progress[-1] == 100
+
+
+def test_read_sheets_missing_sheet(workbook):
+    """工作表不存在时抛出FileReadError"""
+    path, _ = workbook
+
+    with pytest.raises(FileReadError):
+        read_sheets(path, ['深圳'])
+
+
+def test_combine_sheets_adds_source_column(workbook):
+    """合并后的列为各工作表的并集，来源工作表放在第一列"""
+    _, sheets = workbook
+
+    data = combine_sheets(sheets)
+
+    assert list(data.columns) == [SHEET_COLUMN, '姓名', '薪资', '备注']
+    assert list(data[SHEET_COLUMN]) == ['北京', '北京', '上海', '广州']
+    assert isinstance(data[SHEET_COLUMN].dtype, pd.CategoricalDtype)
+    assert data['备注'].isna().sum() == 3
+
+
+def test_read_file_and_preview_with_sheet_list(workbook):
+    """指定多个工作表时读取合并后的数据"""
+    path, _ = workbook
+
+    data, _ = read_file(path, sheet_name=['北京', '上海'])
+    preview, _, row_count = read_preview(path, rows=1, sheet_name=['北京', '上海'])
+    single, _ = read_file(path, sheet_name='上海')
+
+    assert list(data['姓名']) == ['张三', '李四', '王五']
+    assert list(preview.columns) == [SHEET_COLUMN, '姓名', '薪资']
+    assert len(preview) == 1
+    assert row_count == 3
+    assert list(single.columns) == ['姓名', '薪资']
@@ -0,0 +1,90 @@
+"""
+公式字段测试
+"""
+import pandas as pd
+import pytest
+
+from src.models.data_model import CustomField, DataConfiguration
+from src.services.formula import FormulaError, compile_formula
+from src.services.processing import apply_configuration, get_required_columns
+
+
+@pytest.fixture
+def sample_data():
+    """创建测试数据"""
+    return pd.DataFrame({
+        '姓名': ['张三', '李四', '王五'],
+        '薪资': [8000, 12000, 15000],
+        '奖金': [500, 1000, None]
+    })
+
+
+def test_formula_evaluates_whole_columns(sample_data):
+    """公式对整列计算，列名可以包含空格和运算符"""
+    formula = compile_formula('([薪资] + [奖金]) * 1.1 - [薪资]')
+
+    assert formula.columns == ['薪资', '奖金']
+    result = formula.evaluate(sample_data)
+    expected = (sample_data['薪资'] + sample_data['奖金']) * 1.1 - sample_data['薪资']
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_constant_formula_is_broadcast(sample_data):
+    """不引用列的公式扩展为整列"""
+    result = compile_formula('2 ** 10').evaluate(sample_data)
+    assert result.tolist() == [1024] * 3
+
+
+@pytest.mark.parametrize('expression', [
+    '',
+    '[薪资] *',
+    '薪资 * 2',
+    '__import__("os")',
+    '[薪资].sum()',
+    '[薪资][0]',
+    'lambda: 1',
+    '9 ** 9 ** 9',
+    '2 ** [薪资]',
+    '[薪资] ** 1000',
+    '"x" * 10 ** 10',
+    '1 < [薪资] < 10000',
+])
+def test_invalid_formulas_are_rejected(expression):
+    """语法错误、未加方括号的列名、函数调用、过大的乘方和连续比较等都会被拒绝"""
+    with pytest.raises(FormulaError):
+        compile_formula(expression)
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('[薪资] * (2 + 3)', [40000, 60000, 75000]),
+    ('10 ** 20 + [薪资] * 0', [1e20] * 3),
+    ('2 ** -1', [0.5] * 3),
+    ('((10 ** 100) ** 100) ** 100', [float('inf')] * 3),
+])
+def test_constant_expressions_use_fixed_width(sample_data, expression, expected):
+    """常量子表达式在编译时按float64计算，能精确表示的整数结果仍为整数"""
+    result = compile_formula(expression).evaluate(sample_data)
+    assert result.tolist() == expected
+    assert (result.dtype.kind == 'i') == all(isinstance(value, int) for value in expected)
+
+
+def test_missing_column_raises(sample_data):
+    """引用不存在的列时报错"""
+    with pytest.raises(FormulaError):
+        compile_formula('[年龄] + 1').evaluate(sample_data)
+
+
+def test_formula_field_in_configuration(sample_data):
+    """公式字段可以引用未选中的原始字段，并计入需要读取的列"""
+    config = DataConfiguration(original_headers=list(sample_data.columns))
+    config.add_original_field('姓名', selected=True)
+    config.add_original_field('薪资', selected=False)
+    config.add_original_field('奖金', selected=False)
+    config.add_custom_field(CustomField(name='调整后薪资', default_value='[薪资] * 1.1',
+                                        field_type='formula'))
+
+    assert get_required_columns(config) == ['姓名', '薪资']
+
+    result = apply_configuration(sample_data[['姓名', '薪资']], config)
+    assert list(result.columns) == ['姓名', '调整后薪资']
+    assert result['调整后薪资'].tolist() == pytest.approx([8800.0, 13200.0, 16500.0])
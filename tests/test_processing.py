@@ -0,0 +1,66 @@
+"""
+数据处理测试
+"""
+import warnings as warnings_module
+
+import pandas as pd
+import pytest
+
+from src.models.data_model import CustomField
+from src.services.processing import add_custom_fields
+
+
+@pytest.fixture
+def sample_data():
+    """创建测试数据"""
+    return pd.DataFrame({
+        '姓名': ['张三', '李四', '王五'],
+        '薪资': [8000, 12000, 15000]
+    })
+
+
+def test_custom_fields_have_typed_columns(sample_data):
+    """自定义字段按类型生成对应数据类型的列"""
+    custom_fields = [
+        CustomField(name='部门', default_value='研发', field_type='text'),
+        CustomField(name='奖金', default_value='500', field_type='number'),
+        CustomField(name='入职日期', default_value='2024-01-15', field_type='date'),
+    ]
+
+    result = add_custom_fields(sample_data, custom_fields)
+
+    assert list(result.columns) == ['姓名', '薪资', '部门', '奖金', '入职日期']
+    assert isinstance(result['部门'].dtype, pd.CategoricalDtype)
+    assert result['部门'].tolist() == ['研发'] * 3
+    assert result['奖金'].dtype == 'Float64'
+    assert result['奖金'].tolist() == [500.0] * 3
+    assert pd.api.types.is_datetime64_any_dtype(result['入职日期'])
+    assert (result['入职日期'] == pd.Timestamp('2024-01-15')).all()
+    # 原始数据不受影响
+    assert list(sample_data.columns) == ['姓名', '薪资']
+
+
+def test_invalid_defaults_produce_warnings(sample_data):
+    """无法转换的默认值使用缺省值并记录警告"""
+    custom_fields = [
+        CustomField(name='奖金', default_value='abc', field_type='number'),
+        CustomField(name='入职日期', default_value='不是日期', field_type='date'),
+    ]
+    messages = []
+
+    result = add_custom_fields(sample_data, custom_fields, messages)
+
+    assert result['奖金'].tolist() == [0.0] * 3
+    assert result['入职日期'].isna().all()
+    assert len(messages) == 2
+
+
+def test_many_custom_fields_do_not_fragment(sample_data):
+    """大量自定义字段一次性添加，不产生碎片化警告"""
+    custom_fields = [CustomField(name=f'字段{i}', default_value=str(i)) for i in range(200)]
+
+    with warnings_module.catch_warnings():
+        warnings_module.simplefilter('error', pd.errors.PerformanceWarning)
+        result = add_custom_fields(sample_data, custom_fields)
+
+    assert result.shape == (3, 202)
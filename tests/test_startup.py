@@ -0,0 +1,26 @@
+"""
+启动性能测试
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 界面启动时不应导入的重量级模块
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'pyarrow')
+
+
+def test_gui_modules_do_not_import_data_libraries():
+    """导入应用程序入口和界面模块时不导入pandas等数据处理库"""
+    code = (
+        'import sys, src.main; '
+        f'print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))'
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == ''
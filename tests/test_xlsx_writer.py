@@ -0,0 +1,141 @@
+"""
+xlsx流式写入测试
+"""
+import pandas as pd
+import pytest
+
+from src.services import export_service, xlsx_writer
+from src.services.export_service import ExportService
+from src.services.xlsx_writer import (
+    EXCEL_MAX_COLUMNS, XlsxStreamWriter, resolve_xlsx_writer, safe_sheet_name
+)
+
+
+@pytest.fixture
+def sample_data():
+    """创建包含缺失值和日期的测试数据"""
+    return pd.DataFrame({
+        '姓名': ['张三', '李四', None, '赵六', '=钱七'],
+        '年龄': [25, 30, None, 40, 45],
+        '入职日期': pd.to_datetime(['2020-01-01', '2021-06-30', None, '2022-03-15', '2023-12-31']),
+    })
+
+
+@pytest.fixture(params=['xlsxwriter', 'openpyxl'])
+def writer_name(request):
+    """两种写入引擎都需要测试"""
+    if request.param == 'xlsxwriter':
+        pytest.importorskip('xlsxwriter')
+    return request.param
+
+
+def test_resolve_xlsx_writer(monkeypatch):
+    """xlsxwriter未安装时退回openpyxl"""
+    assert resolve_xlsx_writer('openpyxl') == 'openpyxl'
+    monkeypatch.setattr(xlsx_writer, 'is_module_available', lambda name: False)
+    assert resolve_xlsx_writer('auto') == 'openpyxl'
+    assert resolve_xlsx_writer('xlsxwriter') == 'openpyxl'
+    with pytest.raises(ValueError):
+        resolve_xlsx_writer('xlwt')
+
+
+def test_safe_sheet_name():
+    """替换不允许的字符、截断过长的名称，并且不区分大小写去重"""
+    assert safe_sheet_name('a/b:c', set()) == 'a_b_c'
+    assert len(safe_sheet_name('长' * 40, set())) == 31
+    assert safe_sheet_name('Data', {'data'}) == 'Data_1'
+
+
+def test_stream_writer_round_trip(tmp_path, sample_data, writer_name):
+    """分块写入的结果与原数据一致，文本按原样保存"""
+    path = tmp_path / 'out.xlsx'
+
+    with XlsxStreamWriter(str(path), writer_name) as writer:
+        writer.write_frame(sample_data.iloc[:2])
+        writer.write_frame(sample_data.iloc[2:])
+
+    pd.testing.assert_frame_equal(pd.read_excel(path), sample_data, check_dtype=False)
+    assert writer.sheet_names == ['Sheet1']
+
+
+def test_stream_writer_writes_infinity_as_text(tmp_path, writer_name):
+    """Excel不支持无穷大，与to_excel一样写为文本inf和-inf"""
+    from openpyxl import load_workbook
+    from src.services.formula import compile_formula
+
+    data = pd.DataFrame({'奖金': [100.0, 50.0, -30.0, None], '人数': [2, 0, 0, 1]})
+    data['人均'] = compile_formula('[奖金] / [人数]').evaluate(data)
+    path = tmp_path / 'out.xlsx'
+
+    with XlsxStreamWriter(str(path), writer_name) as writer:
+        writer.write_frame(data)
+
+    rows = list(load_workbook(path).active.iter_rows(min_row=2, values_only=True))
+    assert [row[2] for row in rows] == [50, 'inf', '-inf', None]
+    assert [row[0] for row in rows] == [100, 50, -30, None]
+
+
+def test_stream_writer_splits_at_row_limit(tmp_path, sample_data, writer_name):
+    """超过每个工作表的行数上限时续写到新的工作表，并重复表头"""
+    path = tmp_path / 'out.xlsx'
+
+    with XlsxStreamWriter(str(path), writer_name, max_rows=3) as writer:
+        writer.start_sheet('数据')
+        writer.write_frame(sample_data)
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ['数据', '数据_2', '数据_3']
+    assert [len(data) for data in sheets.values()] == [2, 2, 1]
+    combined = pd.concat(sheets.values(), ignore_index=True)
+    pd.testing.assert_frame_equal(combined, sample_data, check_dtype=False)
+
+
+def test_stream_writer_discard_writes_nothing(tmp_path, sample_data, writer_name):
+    """出错时不保存工作簿"""
+    path = tmp_path / 'out.xlsx'
+
+    with pytest.raises(RuntimeError):
+        with XlsxStreamWriter(str(path), writer_name) as writer:
+            writer.write_frame(sample_data)
+            raise RuntimeError('中断')
+
+    assert not path.exists()
+
+
+def test_stream_writer_rejects_too_many_columns(tmp_path):
+    """列数超过上限时在写入任何行之前报错"""
+    data = pd.DataFrame([[0] * (EXCEL_MAX_COLUMNS + 1)])
+
+    with pytest.raises(ValueError):
+        with XlsxStreamWriter(str(tmp_path / 'out.xlsx')) as writer:
+            writer.write_frame(data)
+
+
+@pytest.mark.parametrize('max_cells, constant_memory', [(10 ** 6, False), (0, True)])
+def test_write_data_selects_constant_memory_by_size(tmp_path, sample_data, monkeypatch,
+                                                     max_cells, constant_memory):
+    """较大的输出逐行写出，较小的输出在内存中构建工作簿，两者结果一致"""
+    created = []
+
+    def recording_writer(*args, **kwargs):
+        created.append(kwargs['constant_memory'])
+        return XlsxStreamWriter(*args, **kwargs)
+
+    monkeypatch.setattr(export_service, 'IN_MEMORY_XLSX_MAX_CELLS', max_cells)
+    monkeypatch.setattr(export_service, 'XlsxStreamWriter', recording_writer)
+    path = tmp_path / 'out.xlsx'
+
+    rows = ExportService().write_data(sample_data, str(path))
+
+    assert rows == len(sample_data)
+    assert created == [constant_memory]
+    pd.testing.assert_frame_equal(pd.read_excel(path), sample_data, check_dtype=False)
+
+
+def test_row_limit_warning():
+    """只有xlsx输出超过行数上限时才提示拆分"""
+    limit = xlsx_writer.EXCEL_MAX_ROWS - 1
+
+    assert ExportService.row_limit_warning('out.xlsx', limit) is None
+    assert ExportService.row_limit_warning('out.csv', limit * 3) is None
+    assert '3 个工作表' in ExportService.row_limit_warning('out.xlsx', limit * 2 + 1)